@@ -1,11 +1,11 @@
 {
     "name": "BHZ-Cinema (Cineart)",
-    "version": "1.0.0",
+    "version": "1.2.0",
     "category": "Website",
     "summary": "Página /cineart com Em Cartaz, Em Breve e Estreias da Semana (sincroniza do site do Cineart).",
     "author": "BHZ Sistemas",
     "license": "LGPL-3",
-    "depends": ["base", "website"],
+    "depends": ["base", "website", "bhz_common"],
     "data": [
         "security/security.xml",
         "security/ir.model.access.csv",
@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
-import json
-
 from odoo import http
 from odoo.http import request
 
 
+def sitemap_cineart(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    company = env["website"].get_current_website().company_id
+    domain = [("active", "=", True), ("company_id", "in", [False, company.id])]
+    entry = Sitemap._bhz_entry("/cineart", Sitemap._bhz_lastmod("guiabh.cineart.movie", domain), qs)
+    if entry:
+        yield entry
+
+
 class GuiaBHCineartController(http.Controller):
 
     _CATEGORY_ALIASES = {
@@ -20,7 +27,7 @@ class GuiaBHCineartController(http.Controller):
             domain.append(("company_id", "in", [False, company_id]))
         return movie_model.search(domain, order="name asc")
 
-    @http.route(['/cineart'], type='http', auth='public', website=True, sitemap=True)
+    @http.route(['/cineart'], type='http', auth='public', website=True, sitemap=sitemap_cineart)
     def cineart_page(self, **kw):
         company = request.website.company_id
         company_id = company and company.id or False
@@ -42,58 +49,8 @@ class GuiaBHCineartController(http.Controller):
         website=True,
     )
     def snippet_movies_data(self, category_ids=None, limit=8, order_mode="recent"):
-        limit = self._sanitize_limit(limit)
-        order_mode = self._sanitize_order_mode(order_mode)
-        category_codes = self._map_category_codes(category_ids)
-        company = request.website.company_id
-        company_id = company and company.id or False
-        movies = (
-            request.env["guiabh.cineart.movie"]
-            .sudo()
-            .guiabh_get_movies(
-                categories=category_codes,
-                limit=limit,
-                order_mode=order_mode,
-                company_id=company_id,
-            )
+        html, has_movies = request.env["bhz.snippet.prerender"]._bhz_render_snippet(
+            "s_guiabh_cineart_movies",
+            {"category_ids": category_ids, "limit": limit, "order_mode": order_mode},
         )
-        html = request.env["ir.ui.view"]._render_template(
-            "bhz_cineart.guiabh_cineart_movie_cards",
-            {"movies": movies},
-        )
-        return {"html": html, "has_movies": bool(movies)}
-
-    def _sanitize_limit(self, limit):
-        try:
-            limit_value = int(limit)
-        except (ValueError, TypeError):
-            limit_value = 8
-        return max(1, min(limit_value, 24))
-
-    def _sanitize_order_mode(self, order_mode):
-        if isinstance(order_mode, str):
-            lowered = order_mode.lower()
-            if lowered in ("recent", "popular"):
-                return lowered
-        return "recent"
-
-    def _map_category_codes(self, category_ids):
-        ids = []
-        if isinstance(category_ids, str):
-            try:
-                category_ids = json.loads(category_ids)
-            except ValueError:
-                category_ids = []
-        for entry in category_ids or []:
-            try:
-                if isinstance(entry, dict):
-                    entry = entry.get("id")
-                entry_id = int(entry)
-            except (ValueError, TypeError):
-                continue
-            if entry_id:
-                ids.append(entry_id)
-        if not ids:
-            return []
-        categories = request.env["guiabh.cineart.category"].sudo().browse(ids)
-        return [item.code for item in categories if item.code]
+        return {"html": html, "has_movies": has_movies}
@@ -1,2 +1,3 @@
 from . import cineart_movie
 from . import cineart_category
+from . import snippet_prerender
@@ -15,7 +15,9 @@ _logger = logging.getLogger(__name__)
 
 class CineartMovie(models.Model):
     _name = "guiabh.cineart.movie"
+    _inherit = ["bhz.website.visit.mixin", "bhz.image.derivative.mixin"]
     _description = "Cineart - Filmes"
+    _bhz_image_derivative_fields = {"poster_image": (240, 480)}
     _order = "category, name"
     _cineart_url_unique = models.Constraint(
         'UNIQUE(cineart_url)',
@@ -97,7 +99,7 @@ class CineartMovie(models.Model):
     def _get_snippet_order(self, order_mode):
         allowed = (order_mode or "recent").lower()
         if allowed == "popular":
-            return "website_visit_count desc, category asc, name asc, id desc"
+            return "bhz_popularity_score desc, website_visit_count desc, category asc, name asc, id desc"
         return "category asc, name asc, id desc"
 
     @api.model
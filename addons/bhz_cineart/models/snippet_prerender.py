@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class BhzSnippetPrerender(models.AbstractModel):
+    _inherit = "bhz.snippet.prerender"
+
+    @api.model
+    def _bhz_snippet_renderers(self):
+        res = super()._bhz_snippet_renderers()
+        res["s_guiabh_cineart_movies"] = {
+            "params": {
+                "data-category-ids": "category_ids",
+                "data-limit": "limit",
+                "data-order-mode": "order_mode",
+            },
+            "prepare": "_bhz_snippet_params_cineart_movies",
+            "render": "_bhz_snippet_render_cineart_movies",
+            "grid": "js-guiabh-cineart-grid",
+            "empty": "js-guiabh-cineart-empty",
+        }
+        return res
+
+    @api.model
+    def _bhz_snippet_params_cineart_movies(self, params):
+        category_ids = self._bhz_snippet_parse_ids(params.get("category_ids"))
+        categories = self.env["guiabh.cineart.category"].sudo().browse(category_ids).exists()
+        return {
+            "categories": sorted({item.code for item in categories if item.code}),
+            "limit": self._bhz_snippet_parse_limit(params.get("limit"), 8, 24),
+            "order_mode": self._bhz_snippet_parse_order_mode(params.get("order_mode")),
+        }
+
+    @api.model
+    def _bhz_snippet_render_cineart_movies(self, params):
+        company = self.env["website"].get_current_website().company_id
+        movies = self.env["guiabh.cineart.movie"].sudo().guiabh_get_movies(company_id=company.id or False, **params)
+        html = self.env["ir.ui.view"]._render_template(
+            "bhz_cineart.guiabh_cineart_movie_cards",
+            {"movies": movies},
+        )
+        return html, bool(movies)
@@ -1,11 +1,11 @@
 {
     "name": "BHZ - Guia de Locais (Cidade)",
-    "version": "19.0.1.0.0",
+    "version": "19.0.1.1.0",
     "category": "Website",
     "summary": "Anuncie locais (bares, restaurantes, parques, museus etc.) no site com páginas públicas.",
     "author": "BHZ Sistemas",
     "license": "LGPL-3",
-    "depends": ["base", "website", "mail"],
+    "depends": ["base", "website", "mail", "bhz_common"],
     "data": [
         "security/security.xml",
         "security/ir.model.access.csv",
@@ -1,6 +1,35 @@
 # -*- coding: utf-8 -*-
 from odoo import http
 from odoo.http import request
+from odoo.tools import SQL
+
+
+def _public_places_domain(env):
+    website = env["website"].get_current_website()
+    domain = [
+        ("website_published", "=", True),
+        ("active", "=", True),
+        "|", ("website_id", "=", False), ("website_id", "=", website.id),
+    ]
+    if website.company_id:
+        domain.append(("company_id", "in", [False, website.company_id.id]))
+    return domain
+
+
+def sitemap_places(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    entry = Sitemap._bhz_entry("/lugares", Sitemap._bhz_lastmod("bhz.place", _public_places_domain(env)), qs)
+    if entry:
+        yield entry
+
+
+def sitemap_place_detail(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    write_date = SQL.identifier(env["bhz.place"]._table, "write_date")
+    for place_id, place_write_date in Sitemap._bhz_iter_rows("bhz.place", _public_places_domain(env), [write_date]):
+        entry = Sitemap._bhz_entry("/lugares/%s" % place_id, place_write_date, qs)
+        if entry:
+            yield entry
 
 
 class BhzPlacesWebsite(http.Controller):
@@ -10,7 +39,7 @@ class BhzPlacesWebsite(http.Controller):
         type="http",
         auth="public",
         website=True,
-        sitemap=True,
+        sitemap=sitemap_places,
     )
     def places_list(self, page=1, q=None, category=None, city=None, tag=None, **kw):
         website = request.website
@@ -70,7 +99,7 @@ class BhzPlacesWebsite(http.Controller):
         type="http",
         auth="public",
         website=True,
-        sitemap=True,
+        sitemap=sitemap_place_detail,
     )
     def place_detail(self, place_id, **kw):
         website = request.website
@@ -75,9 +75,10 @@ class BhzPlaceStage(models.Model):
 class BhzPlace(models.Model):
     _name = "bhz.place"
     _description = "Local"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["mail.thread", "mail.activity.mixin", "bhz.image.derivative.mixin"]
     _order = "sequence, name"
     _rec_name = "name"
+    _bhz_image_derivative_fields = {"image_1920": (480, 800, 1200)}
 
     _check_company_auto = True
 
@@ -0,0 +1 @@
+from . import test_image_derivative
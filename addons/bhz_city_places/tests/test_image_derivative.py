@@ -0,0 +1,34 @@
+import base64
+import io
+
+from PIL import Image
+
+from odoo.tests import HttpCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestPlaceImageDerivative(HttpCase):
+    def setUp(self):
+        super().setUp()
+        buffer = io.BytesIO()
+        Image.new("RGB", (1000, 600), (200, 40, 40)).save(buffer, format="PNG")
+        self.image = base64.b64encode(buffer.getvalue())
+
+    def _place(self, published):
+        place = self.env["bhz.place"].create(
+            {"name": "Local BHZ", "image_1920": self.image, "website_published": published}
+        )
+        place._bhz_generate_image_derivatives("image_1920")
+        return place
+
+    def test_published_place_derivative_for_anonymous(self):
+        place = self._place(published=True)
+        res = self.url_open("/bhz/image/bhz.place/%s/image_1920/480.webp" % place.id, allow_redirects=False)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["Content-Type"], "image/webp")
+
+    def test_unpublished_place_falls_back_to_web_image(self):
+        place = self._place(published=False)
+        res = self.url_open("/bhz/image/bhz.place/%s/image_1920/480.webp" % place.id, allow_redirects=False)
+        self.assertIn(res.status_code, (301, 302, 303))
+        self.assertIn("/web/image/bhz.place/%s/image_1920/480x0" % place.id, res.headers["Location"])
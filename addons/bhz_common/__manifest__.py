@@ -1,13 +1,22 @@
 {
     "name": "BHZ Common",
     "summary": "Componentes e utilitários compartilhados pelos módulos BHZ.",
-    "version": "19.0.1.0.0",
+    "version": "19.0.1.3.0",
     "author": "BHZ Sistemas",
     "website": "https://bhzsistemas.com.br",
     "category": "Technical",
     "license": "LGPL-3",
-    "depends": ["base"],
-    "data": [],
+    "depends": ["base", "web"],
+    "data": [
+        "security/ir.model.access.csv",
+        "data/ir_cron.xml",
+        "views/responsive_image.xml",
+    ],
+    "assets": {
+        "web.assets_frontend": [
+            "bhz_common/static/src/js/bhz_visit_beacon.js",
+        ],
+    },
     "installable": True,
     "application": True,
 }
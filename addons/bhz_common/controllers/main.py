@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import re
+
+from odoo import http
+from odoo.exceptions import AccessError, MissingError
+from odoo.http import request
+
+from ..models.image_derivative import DERIVATIVE_FORMATS
+
+_BOT_UA = re.compile(r"bot|crawl|spider|slurp|preview|monitor", re.IGNORECASE)
+
+
+class BhzCommonController(http.Controller):
+
+    @http.route("/bhz/visit", type="http", auth="public", methods=["POST"], csrf=False, sitemap=False)
+    def register_visit(self, model=None, res_id=None, **kwargs):
+        """Beacon de visita (navigator.sendBeacon). Sempre responde 204, sem corpo."""
+        if not self._is_bot() and model in request.env:
+            Model = request.env[model].sudo()
+            if hasattr(Model, "_bhz_register_visit"):
+                try:
+                    record_id = int(res_id)
+                except (TypeError, ValueError):
+                    record_id = 0
+                if record_id > 0:
+                    Model.browse(record_id)._bhz_register_visit()
+        return request.make_response("", status=204)
+
+    @http.route(
+        "/bhz/image/<string:model>/<int:res_id>/<string:field>/<int:width>.<any(webp,jpg):image_format>",
+        type="http",
+        auth="public",
+        methods=["GET"],
+        sitemap=False,
+    )
+    def image_derivative(self, model, res_id, field, width, image_format, unique=None, **kwargs):
+        """Derivado pré-gerado; sem ele, cai no redimensionamento do /web/image.
+
+        O acesso segue as regras do ``/web/image`` (``ir.binary._find_record``):
+        registros publicados no site valem para visitantes anônimos mesmo sem
+        ACL de leitura. Sem acesso, redireciona para o ``/web/image``, que
+        responde como responderia à imagem original.
+        """
+        fallback_url = "/web/image/%s/%s/%s/%sx0" % (model, res_id, field, width)
+        if model not in request.env:
+            raise request.not_found()
+        if field not in getattr(request.env[model], "_bhz_image_derivative_fields", {}):
+            raise request.not_found()
+        try:
+            request.env["ir.binary"]._find_record(
+                res_model=model, res_id=res_id, field=field, access_token=kwargs.get("access_token")
+            )
+        except (AccessError, MissingError):
+            return request.redirect(fallback_url)
+        derivative = request.env["bhz.image.derivative"].sudo().search(
+            [
+                ("res_model", "=", model),
+                ("res_id", "=", res_id),
+                ("res_field", "=", field),
+                ("width", "=", width),
+                ("image_format", "=", image_format),
+            ],
+            limit=1,
+        )
+        if not derivative:
+            return request.redirect(fallback_url)
+        stream = request.env["ir.binary"]._get_stream_from(
+            derivative,
+            "datas",
+            filename="%s-%s-%s.%s" % (model.replace(".", "_"), res_id, width, image_format),
+            mimetype=DERIVATIVE_FORMATS[image_format][1],
+        )
+        return stream.get_response(immutable=bool(unique))
+
+    def _is_bot(self):
+        user_agent = request.httprequest.headers.get("User-Agent") or ""
+        return not user_agent or bool(_BOT_UA.search(user_agent))
@@ -0,0 +1,6 @@
+from . import website_visit_mixin
+from . import image_derivative
+from . import rate_limiter
+from . import snippet_prerender
+from . import ir_qweb
+from . import sitemap
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import logging
+
+from PIL import Image
+
+from odoo import api, fields, models
+from odoo.tools.image import ImageProcess
+
+_logger = logging.getLogger(__name__)
+
+DERIVATIVE_QUALITY = 80
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+
+
+class BhzImageDerivative(models.Model):
+    """Versões reduzidas (WebP + JPEG) de um campo de imagem, geradas uma vez por imagem.
+
+    Servidas por ``/bhz/image/...`` (ver ``controllers/main.py``), que confere o
+    acesso ao registro de origem antes de entregar o arquivo.
+    """
+
+    _name = "bhz.image.derivative"
+    _description = "BHZ - Derivado de imagem"
+    _order = "res_model, res_id, res_field, width"
+
+    _derivative_unique = models.Constraint(
+        "UNIQUE(res_model, res_id, res_field, width, image_format)",
+        "Já existe um derivado para esta imagem, largura e formato.",
+    )
+
+    res_model = fields.Char(string="Modelo", required=True, index=True)
+    res_id = fields.Many2oneReference(string="Registro", model_field="res_model", required=True, index=True)
+    res_field = fields.Char(string="Campo", required=True)
+    width = fields.Integer(string="Largura", required=True)
+    image_format = fields.Selection(
+        [("webp", "WebP"), ("jpg", "JPEG")],
+        string="Formato",
+        required=True,
+    )
+    source_checksum = fields.Char(string="Checksum da origem", required=True)
+    datas = fields.Binary(string="Arquivo", attachment=True, required=True)
+
+    @api.model
+    def _render_variants(self, raw, widths):
+        """``[(largura, formato, bytes)]`` para ``raw``; sem ampliar imagens menores."""
+        try:
+            image = ImageProcess(raw).image
+        except Exception:
+            _logger.warning("[BHZ Images] imagem inválida, derivados não gerados", exc_info=True)
+            return []
+        if not image:
+            return []  # SVG/WebP de origem: segue servido por /web/image
+        sizes = sorted({min(width, image.width) for width in widths})
+        variants = []
+        for width in sizes:
+            resized = image
+            if width < image.width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for image_format in DERIVATIVE_FORMATS:
+                variants.append((width, image_format, self._encode(resized, image_format)))
+        return variants
+
+    @api.model
+    def _encode(self, image, image_format):
+        pil_format = DERIVATIVE_FORMATS[image_format][0]
+        if pil_format == "JPEG":
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        output = io.BytesIO()
+        options = {"quality": DERIVATIVE_QUALITY}
+        if pil_format == "JPEG":
+            options.update(optimize=True, progressive=True)
+        image.save(output, pil_format, **options)
+        return output.getvalue()
+
+    @api.model
+    def _cron_generate_missing(self, limit=200):
+        """Gera os derivados que faltam (imagens novas ou trocadas), em todos os modelos.
+
+        Disparado logo após o create/write que grava a imagem (``_trigger``), além
+        da execução periódica; se sobrar trabalho, agenda a si mesmo de novo.
+        """
+        more = False
+        for model_name in self.env.registry.descendants(["bhz.image.derivative.mixin"], "_inherit"):
+            Model = self.env[model_name]
+            if not Model._abstract and Model._bhz_image_derivative_fields:
+                more |= Model.sudo()._bhz_generate_missing_image_derivatives(limit=limit)
+        if more:
+            self.env.ref("bhz_common.ir_cron_bhz_image_derivatives")._trigger()
+
+    def _get_url(self):
+        self.ensure_one()
+        return "/bhz/image/%s/%s/%s/%s.%s?unique=%s" % (
+            self.res_model,
+            self.res_id,
+            self.res_field,
+            self.width,
+            self.image_format,
+            self.source_checksum[:8],
+        )
+
+
+class BhzImageDerivativeMixin(models.AbstractModel):
+    """Derivados dos campos de imagem gerados em segundo plano, e o ``srcset``.
+
+    Cada modelo declara em ``_bhz_image_derivative_fields`` os campos e as
+    larguras (breakpoints dos cards/carrosséis). O create/write só descarta os
+    derivados que deixaram de valer e dispara o cron de geração, sem codificar
+    imagens dentro do salvamento; até lá o site usa ``/web/image``. A geração só
+    refaz o trabalho quando o checksum da imagem de origem muda.
+    """
+
+    _name = "bhz.image.derivative.mixin"
+    _description = "BHZ - Derivados de imagem (WebP/JPEG)"
+
+    # {campo de imagem: (larguras em px)}
+    _bhz_image_derivative_fields = {}
+
+    bhz_image_variants = fields.Json(string="Derivados de imagem", compute="_compute_bhz_image_variants")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get(field_name) for vals in vals_list for field_name in self._bhz_image_derivative_fields):
+            self._bhz_schedule_image_derivatives()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        field_names = set(vals) & set(self._bhz_image_derivative_fields)
+        if field_names:
+            self._bhz_drop_stale_image_derivatives(field_names)
+            if any(vals.get(field_name) for field_name in field_names):
+                self._bhz_schedule_image_derivatives()
+        return result
+
+    def unlink(self):
+        self.env["bhz.image.derivative"].sudo().search(
+            [("res_model", "=", self._name), ("res_id", "in", self.ids)]
+        ).unlink()
+        return super().unlink()
+
+    # ------------------------------------------------------------------ Geração
+    @api.model
+    def _bhz_schedule_image_derivatives(self):
+        cron = self.env.ref("bhz_common.ir_cron_bhz_image_derivatives", raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def _bhz_drop_stale_image_derivatives(self, field_names):
+        """Remove derivados cuja imagem de origem mudou ou foi apagada."""
+        if not self.ids:
+            return
+        current = {
+            (attachment.res_id, attachment.res_field): attachment.checksum
+            for attachment in self.env["ir.attachment"].sudo().search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "in", list(field_names)),
+                    ("res_id", "in", self.ids),
+                ]
+            )
+        }
+        stale = self.env["bhz.image.derivative"].sudo().search(
+            [("res_model", "=", self._name), ("res_field", "in", list(field_names)), ("res_id", "in", self.ids)]
+        ).filtered(lambda derivative: current.get((derivative.res_id, derivative.res_field)) != derivative.source_checksum)
+        if stale:
+            stale.unlink()
+            self.invalidate_recordset(["bhz_image_variants"])
+
+    def _bhz_generate_image_derivatives(self, field_name):
+        """(Re)gera os derivados de ``field_name``; registros sem imagem perdem os seus."""
+        if not self.ids:
+            return
+        Derivative = self.env["bhz.image.derivative"].sudo()
+        sources = {
+            attachment.res_id: attachment
+            for attachment in self.env["ir.attachment"].sudo().search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", field_name),
+                    ("res_id", "in", self.ids),
+                ]
+            )
+        }
+        existing = Derivative.search(
+            [("res_model", "=", self._name), ("res_field", "=", field_name), ("res_id", "in", self.ids)]
+        )
+        checksums_by_record = {}
+        for derivative in existing:
+            checksums_by_record.setdefault(derivative.res_id, set()).add(derivative.source_checksum)
+        widths = self._bhz_image_derivative_fields[field_name]
+        stale_ids = set()
+        vals_list = []
+        for res_id in self.ids:
+            source = sources.get(res_id)
+            current = checksums_by_record.get(res_id)
+            if source and current == {source.checksum}:
+                continue
+            if current:
+                stale_ids.add(res_id)
+            if not source:
+                continue
+            for width, image_format, content in Derivative._render_variants(source.raw, widths):
+                vals_list.append(
+                    {
+                        "res_model": self._name,
+                        "res_id": res_id,
+                        "res_field": field_name,
+                        "width": width,
+                        "image_format": image_format,
+                        "source_checksum": source.checksum,
+                        "datas": base64.b64encode(content),
+                    }
+                )
+        if stale_ids:
+            existing.filtered(lambda derivative: derivative.res_id in stale_ids).unlink()
+        if vals_list:
+            Derivative.create(vals_list)
+        self.invalidate_recordset(["bhz_image_variants"])
+
+    @api.model
+    def _bhz_generate_missing_image_derivatives(self, limit=200):
+        """Gera os derivados que faltam; True se algum campo atingiu ``limit`` (há mais)."""
+        more = False
+        for field_name in self._bhz_image_derivative_fields:
+            self.env.cr.execute(
+                """
+                SELECT att.res_id
+                  FROM ir_attachment att
+                 WHERE att.res_model = %s
+                   AND att.res_field = %s
+                   AND att.res_id IS NOT NULL
+                   AND att.mimetype IN ('image/jpeg', 'image/png', 'image/gif')
+                   AND NOT EXISTS (
+                        SELECT 1
+                          FROM bhz_image_derivative der
+                         WHERE der.res_model = att.res_model
+                           AND der.res_id = att.res_id
+                           AND der.res_field = att.res_field
+                           AND der.source_checksum = att.checksum
+                   )
+                 ORDER BY att.res_id
+                 LIMIT %s
+                """,
+                (self._name, field_name, limit),
+            )
+            res_ids = [row[0] for row in self.env.cr.fetchall()]
+            if res_ids:
+                self.browse(res_ids).exists()._bhz_generate_image_derivatives(field_name)
+                _logger.info("[BHZ Images] %s.%s: derivados gerados para %s registros", self._name, field_name, len(res_ids))
+            more |= len(res_ids) >= limit
+        return more
+
+    # ------------------------------------------------------------------ srcset
+    def _compute_bhz_image_variants(self):
+        """``{campo: {formato: [[largura, url], ...]}}`` do lote numa única busca.
+
+        Campo não armazenado: o ORM calcula de uma vez para os registros do
+        prefetch, então o loop de cards não faz uma consulta por card.
+        """
+        by_record = {record.id: {} for record in self}
+        ids = [record_id for record_id in self.ids if isinstance(record_id, int)]
+        if ids and self._bhz_image_derivative_fields:
+            derivatives = self.env["bhz.image.derivative"].sudo().search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "in", list(self._bhz_image_derivative_fields)),
+                    ("res_id", "in", ids),
+                ]
+            )
+            for derivative in derivatives:
+                by_field = by_record[derivative.res_id].setdefault(derivative.res_field, {})
+                by_field.setdefault(derivative.image_format, []).append([derivative.width, derivative._get_url()])
+        for record in self:
+            record.bhz_image_variants = by_record.get(record.id, {})
+
+    def _bhz_image_srcset(self, field_name):
+        """``{"webp": srcset, "jpg": srcset, "src": url}`` ou ``{}`` se ainda não há derivados."""
+        self.ensure_one()
+        variants = (self.bhz_image_variants or {}).get(field_name) or {}
+        if not variants.get("jpg"):
+            return {}
+        srcset = {
+            image_format: ", ".join("%s %sw" % (url, width) for width, url in sorted(entries))
+            for image_format, entries in variants.items()
+        }
+        srcset["src"] = max(variants["jpg"])[1]
+        return srcset
+
+    def _bhz_image_url(self, field_name, image_format="webp"):
+        """URL do maior derivado em ``image_format``, ou False."""
+        self.ensure_one()
+        srcset = self._bhz_image_srcset(field_name)
+        if not srcset.get(image_format):
+            return False
+        return srcset[image_format].split(", ")[-1].rsplit(" ", 1)[0]
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class IrQweb(models.AbstractModel):
+    _inherit = "ir.qweb"
+
+    def _get_template(self, template):
+        element, document, ref = super()._get_template(template)
+        # No editor o HTML é salvo de volta na página: mantém o conteúdo original.
+        # Os dois flags fazem parte da chave do cache de compilação do QWeb.
+        if not (self.env.context.get("inherit_branding") or self.env.context.get("edit_translations")):
+            self.env["bhz.snippet.prerender"]._bhz_prepare_template(element)
+        return element, document, ref
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, models
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+RATE_LIMIT_TABLE = "bhz_rate_limit_bucket"
+
+
+class BhzRateLimiter(models.AbstractModel):
+    """Token bucket compartilhado entre workers, numa tabela UNLOGGED do PostgreSQL.
+
+    Cada chave (ex.: ``"bhz_event_api:1.2.3.4"``) é uma linha com os tokens
+    restantes; o consumo é um único ``INSERT ... ON CONFLICT DO UPDATE`` que
+    reabastece pelo tempo decorrido e desconta um token, então o custo é O(1) e
+    o limite vale para todos os workers juntos. A tabela não gera WAL e pode ser
+    perdida num crash do banco (os baldes simplesmente recomeçam cheios).
+
+    Uso nos controllers::
+
+        if not request.env["bhz.rate.limiter"].sudo()._allow_request("meu_escopo", 120, 300):
+            return ...429...
+    """
+
+    _name = "bhz.rate.limiter"
+    _description = "BHZ - Limite de requisições (token bucket)"
+
+    def init(self):
+        self.env.cr.execute(
+            f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {RATE_LIMIT_TABLE} (
+                bucket_key varchar PRIMARY KEY,
+                tokens double precision NOT NULL,
+                allowed boolean NOT NULL DEFAULT true,
+                updated_at timestamp NOT NULL,
+                expires_at timestamp NOT NULL
+            )
+            """
+        )
+        self.env.cr.execute(
+            f"CREATE INDEX IF NOT EXISTS {RATE_LIMIT_TABLE}_expires_idx ON {RATE_LIMIT_TABLE} (expires_at)"
+        )
+
+    @api.model
+    def _consume(self, key, capacity, refill_per_second, cost=1.0):
+        """Tenta retirar ``cost`` tokens do balde ``key``; retorna True se havia saldo.
+
+        Roda em cursor próprio, confirmado na hora: o lock da linha dura só o UPDATE,
+        e não a requisição inteira. Em caso de erro no banco, libera (fail-open).
+        """
+        capacity = float(capacity)
+        refill_per_second = float(refill_per_second)
+        # Balde ocioso por capacity/rate segundos já está cheio: pode ser descartado.
+        idle_seconds = capacity / refill_per_second if refill_per_second > 0 else 86400.0
+        refill = (
+            "LEAST(%(capacity)s, b.tokens + GREATEST(0, EXTRACT(EPOCH FROM "
+            "((clock_timestamp() AT TIME ZONE 'UTC') - b.updated_at))) * %(rate)s)"
+        )
+        params = {
+            "key": key,
+            "capacity": capacity,
+            "rate": refill_per_second,
+            "cost": float(cost),
+            "idle": idle_seconds,
+        }
+        try:
+            with self.env.registry.cursor() as cr:
+                cr.execute(
+                    f"""
+                    INSERT INTO {RATE_LIMIT_TABLE} AS b (bucket_key, tokens, allowed, updated_at, expires_at)
+                    VALUES (
+                        %(key)s,
+                        %(capacity)s - %(cost)s,
+                        %(capacity)s >= %(cost)s,
+                        clock_timestamp() AT TIME ZONE 'UTC',
+                        (clock_timestamp() AT TIME ZONE 'UTC') + make_interval(secs => %(idle)s)
+                    )
+                    ON CONFLICT (bucket_key) DO UPDATE
+                       SET tokens = CASE WHEN {refill} >= %(cost)s THEN {refill} - %(cost)s ELSE {refill} END,
+                           allowed = {refill} >= %(cost)s,
+                           updated_at = clock_timestamp() AT TIME ZONE 'UTC',
+                           expires_at = (clock_timestamp() AT TIME ZONE 'UTC') + make_interval(secs => %(idle)s)
+                    RETURNING allowed
+                    """,
+                    params,
+                )
+                return cr.fetchone()[0]
+        except Exception:
+            _logger.warning("[BHZ RateLimit] falha ao consultar o balde %s; liberando", key, exc_info=True)
+            return True
+
+    @api.model
+    def _allow_request(self, scope, limit, window_seconds, key=None):
+        """``limit`` requisições por ``window_seconds`` (com rajada de até ``limit``) por cliente.
+
+        ``key`` padrão: IP de origem da requisição HTTP atual.
+        """
+        if key is None:
+            key = (request and request.httprequest.remote_addr) or "0.0.0.0"
+        allowed = self._consume("%s:%s" % (scope, key), limit, float(limit) / float(window_seconds))
+        if not allowed:
+            _logger.warning("Rate limit exceeded scope=%s key=%s", scope, key)
+        return allowed
+
+    @api.model
+    def _gc_idle_buckets(self):
+        """Remove baldes ociosos (já estariam cheios de novo)."""
+        self.env.cr.execute(
+            f"DELETE FROM {RATE_LIMIT_TABLE} WHERE expires_at < clock_timestamp() AT TIME ZONE 'UTC'"
+        )
+        if self.env.cr.rowcount:
+            _logger.debug("[BHZ RateLimit] %s baldes ociosos removidos", self.env.cr.rowcount)
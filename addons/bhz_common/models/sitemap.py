@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+from odoo.tools import SQL
+
+# Linhas por consulta ao gerar o sitemap (paginação por id, memória constante).
+SITEMAP_CHUNK_SIZE = 2000
+
+
+class BhzSitemap(models.AbstractModel):
+    """Consultas enxutas para os provedores de sitemap (``sitemap=<função>`` nas rotas).
+
+    Sem ``sitemap=<função>``, o gerador do site percorre os registros pelos
+    conversores do ORM (ou ignora rotas com ``<int:...>``). Os provedores usam
+    estas consultas: só as colunas da URL e ``write_date`` (para ``lastmod``),
+    em blocos por ``id``.
+    """
+
+    _name = "bhz.sitemap"
+    _description = "BHZ - Consultas de sitemap"
+
+    @api.model
+    def _bhz_iter_rows(self, model_name, domain, columns, chunk_size=SITEMAP_CHUNK_SIZE):
+        """``(id, *columns)`` dos registros de ``domain``, por ordem de id, bloco a bloco."""
+        Model = self.env[model_name].sudo()
+        id_column = SQL.identifier(Model._table, "id")
+        last_id = 0
+        while True:
+            query = Model._search(domain, order="id", limit=chunk_size)
+            query.add_where(SQL("%s > %s", id_column, last_id))
+            self.env.cr.execute(query.select(id_column, *columns))
+            rows = self.env.cr.fetchall()
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    @api.model
+    def _bhz_lastmod(self, model_name, domain):
+        """Maior ``write_date`` de ``domain`` (data), para páginas de listagem."""
+        Model = self.env[model_name].sudo()
+        query = Model._search(domain)
+        self.env.cr.execute(query.select(SQL("MAX(%s)", SQL.identifier(Model._table, "write_date"))))
+        write_date = self.env.cr.fetchone()[0]
+        return write_date.date() if write_date else None
+
+    @api.model
+    def _bhz_entry(self, loc, write_date=None, qs=None):
+        """Entrada no formato do gerador do site; ``None`` se não casar com ``qs``."""
+        if qs and qs.lower() not in loc.lower():
+            return None
+        entry = {"loc": loc}
+        if write_date:
+            entry["lastmod"] = write_date.date() if hasattr(write_date, "date") else write_date
+        return entry
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from lxml import etree
+from markupsafe import Markup
+
+from odoo import api, models
+
+_logger = logging.getLogger(__name__)
+
+# Cache de fragmentos por processo (cada worker prefork tem o seu), com TTL curto:
+# {(dbname, snippet, params, website_id, lang): (expira_em, html, has_content)}
+_FRAGMENT_CACHE = OrderedDict()
+_FRAGMENT_LOCK = threading.Lock()
+_FRAGMENT_CACHE_SIZE = 256
+DEFAULT_FRAGMENT_TTL = 60  # segundos
+
+
+class BhzSnippetPrerender(models.AbstractModel):
+    """Pré-renderização server-side dos snippets dinâmicos do site.
+
+    O HTML salvo numa página guarda os cards do momento em que o snippet foi
+    arrastado; antes, o JS sempre buscava o conteúdo atual por JSON-RPC depois do
+    carregamento (duas requisições e salto de layout). Agora, ao compilar o
+    template da página, o ``ir.qweb`` liga a grade de cada snippet registrado ao
+    mesmo fragmento em cache usado pela rota JSON-RPC (``_bhz_prepare_template``),
+    sem pós-processar o HTML a cada render. O JS só atualiza quando o snippet não
+    veio pré-renderizado ou quando as opções mudam no editor.
+
+    Cada módulo registra seus snippets estendendo ``_bhz_snippet_renderers``::
+
+        res["s_meu_snippet"] = {
+            "params": {"data-limit": "limit"},   # atributo da <section> -> parâmetro
+            "prepare": "_bhz_snippet_params_meu", # (params brutos) -> params normalizados
+            "render": "_bhz_snippet_render_meu", # (params) -> (html, has_content)
+            "grid": "js-meu-grid",               # classe do container dos cards
+            "empty": "js-meu-empty",             # classe do aviso de "vazio"
+        }
+    """
+
+    _name = "bhz.snippet.prerender"
+    _description = "BHZ - Pré-renderização de snippets"
+
+    @api.model
+    def _bhz_snippet_renderers(self):
+        return {}
+
+    # ------------------------------------------------------------------ Fragmentos
+    @api.model
+    def _bhz_render_snippet(self, snippet, params):
+        """``(html, has_content)`` do snippet, do cache quando disponível."""
+        spec = self._bhz_snippet_renderers()[snippet]
+        if spec.get("prepare"):
+            params = getattr(self, spec["prepare"])(params or {})
+        ttl = self._bhz_fragment_ttl()
+        key = (
+            self.env.cr.dbname,
+            snippet,
+            json.dumps(params, sort_keys=True, default=str),
+            self.env.context.get("website_id"),
+            self.env.lang,
+        )
+        now = time.monotonic()
+        if ttl:
+            with _FRAGMENT_LOCK:
+                cached = _FRAGMENT_CACHE.get(key)
+                if cached and cached[0] > now:
+                    _FRAGMENT_CACHE.move_to_end(key)
+                    return Markup(cached[1]), cached[2]
+        html, has_content = getattr(self, spec["render"])(params)
+        html = str(html or "")
+        if ttl:
+            with _FRAGMENT_LOCK:
+                _FRAGMENT_CACHE[key] = (now + ttl, html, bool(has_content))
+                _FRAGMENT_CACHE.move_to_end(key)
+                while len(_FRAGMENT_CACHE) > _FRAGMENT_CACHE_SIZE:
+                    _FRAGMENT_CACHE.popitem(last=False)
+        return Markup(html), bool(has_content)
+
+    @api.model
+    def _bhz_snippet_parse_ids(self, raw_ids):
+        """Ids vindos do ``data-*`` (JSON) ou do RPC: ``[1, "2", {"id": 3}]``."""
+        if isinstance(raw_ids, str):
+            try:
+                raw_ids = json.loads(raw_ids)
+            except ValueError:
+                raw_ids = []
+        parsed = []
+        for entry in raw_ids if isinstance(raw_ids, list) else []:
+            if isinstance(entry, dict):
+                entry = entry.get("id")
+            try:
+                entry_id = int(entry)
+            except (ValueError, TypeError):
+                continue
+            if entry_id > 0:
+                parsed.append(entry_id)
+        return parsed
+
+    @api.model
+    def _bhz_snippet_parse_limit(self, limit, default, maximum):
+        try:
+            value = int(limit)
+        except (ValueError, TypeError):
+            value = default
+        return max(1, min(value, maximum))
+
+    @api.model
+    def _bhz_snippet_parse_order_mode(self, order_mode):
+        lowered = order_mode.lower() if isinstance(order_mode, str) else ""
+        return lowered if lowered in ("recent", "popular") else "recent"
+
+    @api.model
+    def _bhz_fragment_ttl(self):
+        value = self.env["ir.config_parameter"].sudo().get_param(
+            "bhz_common.snippet_fragment_ttl", DEFAULT_FRAGMENT_TTL
+        )
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            return DEFAULT_FRAGMENT_TTL
+
+    # ------------------------------------------------------------------ Templates
+    @api.model
+    def _bhz_prerender_fragment(self, snippet, params):
+        """Fragmento usado pelo template compilado; ``None`` mantém os cards salvos."""
+        try:
+            return self._bhz_render_snippet(snippet, params)
+        except Exception:
+            _logger.warning("[BHZ Snippet] falha ao pré-renderizar %s", snippet, exc_info=True)
+            return None
+
+    @api.model
+    def _bhz_prepare_template(self, element):
+        """Liga os snippets registrados de ``element`` ao fragmento atual.
+
+        Roda sobre a árvore do template antes da compilação do QWeb (o código
+        compilado fica em cache): cada ``<section>`` registrada ganha um
+        ``t-set`` com ``_bhz_prerender_fragment``, a grade passa a ter ``t-out``
+        (os cards salvos continuam como conteúdo padrão se o fragmento falhar) e
+        o aviso de "vazio" ganha ``t-att-class``.
+        """
+        renderers = self._bhz_snippet_renderers()
+        if not renderers:
+            return
+        for index, section in enumerate(list(element.iter("section"))):
+            classes = (section.get("class") or "").split()
+            snippet = next((cls for cls in classes if cls in renderers), None)
+            if not snippet or section.getparent() is None or section.get("t-att-data-bhz-prerendered"):
+                continue
+            spec = renderers[snippet]
+            grid = self._bhz_find_by_class(section, spec["grid"])
+            if grid is None:
+                continue
+            params = {
+                param: section.get(attr)
+                for attr, param in spec.get("params", {}).items()
+                if section.get(attr) is not None
+            }
+            var = "bhz_prerendered_%s" % index
+            section.addprevious(
+                etree.Element(
+                    "t",
+                    {
+                        "t-set": var,
+                        "t-value": "request and request.env['bhz.snippet.prerender']._bhz_prerender_fragment(%r, %r)"
+                        % (snippet, params),
+                    },
+                )
+            )
+            section.attrib.pop("data-bhz-prerendered", None)
+            section.set("t-att-data-bhz-prerendered", "%s and '1'" % var)
+            grid.set("t-out", "%s and %s[0]" % (var, var))
+            empty = self._bhz_find_by_class(section, spec.get("empty"))
+            if empty is not None:
+                base = " ".join(cls for cls in (empty.get("class") or "").split() if cls != "d-none")
+                empty.set(
+                    "t-att-class",
+                    "(%r if %s[1] else %r) if %s else %r" % (base + " d-none", var, base, var, empty.get("class") or ""),
+                )
+
+    @api.model
+    def _bhz_find_by_class(self, element, css_class):
+        if not css_class:
+            return None
+        found = element.xpath(
+            ".//*[contains(concat(' ', normalize-space(@class), ' '), $cls)]",
+            cls=" %s " % css_class,
+        )
+        return found[0] if found else None
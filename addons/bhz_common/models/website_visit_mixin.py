@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import atexit
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from odoo import SUPERUSER_ID, api, fields, models
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
+
+# Meia-vida da popularidade: uma visita de hoje vale o dobro de uma de 7 dias atrás.
+VISIT_HALF_LIFE_DAYS = 7.0
+VISIT_DECAY_RATE = math.log(2) / VISIT_HALF_LIFE_DAYS
+# Referência fixa do score. Não alterar: scores já gravados dependem dela.
+VISIT_EPOCH = datetime(2025, 1, 1)
+
+# Buffer por processo (cada worker prefork tem o seu): {(dbname, model): Counter(id -> hits)}
+_VISIT_BUFFER = defaultdict(Counter)
+_VISIT_LOCK = threading.Lock()
+_VISIT_LAST_FLUSH = {}
+# Timer de flush por banco: grava o buffer mesmo quando o tráfego para.
+_VISIT_TIMERS = {}
+
+
+def _flush_visit_buffer(registry, dbname):
+    """Grava o buffer de ``dbname`` em cursor próprio; em caso de erro, devolve ao buffer."""
+    with _VISIT_LOCK:
+        batches = {
+            model_name: _VISIT_BUFFER.pop((db, model_name))
+            for (db, model_name) in list(_VISIT_BUFFER)
+            if db == dbname
+        }
+        _VISIT_LAST_FLUSH[dbname] = time.monotonic()
+    if not batches:
+        return
+    try:
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            for model_name, counter in batches.items():
+                if model_name in env:
+                    env[model_name]._bhz_apply_visit_batch(counter)
+    except Exception:
+        _logger.warning("[BHZ Visits] falha ao gravar visitas; mantendo no buffer", exc_info=True)
+        with _VISIT_LOCK:
+            for model_name, counter in batches.items():
+                _VISIT_BUFFER[(dbname, model_name)].update(counter)
+
+
+def _flush_visit_buffer_timer(dbname):
+    with _VISIT_LOCK:
+        _VISIT_TIMERS.pop(dbname, None)
+    try:
+        _flush_visit_buffer(Registry(dbname), dbname)
+    except Exception:
+        _logger.warning("[BHZ Visits] flush agendado falhou para %s", dbname, exc_info=True)
+
+
+def _schedule_visit_flush(dbname, delay):
+    with _VISIT_LOCK:
+        if dbname in _VISIT_TIMERS:
+            return
+        timer = threading.Timer(delay, _flush_visit_buffer_timer, args=(dbname,))
+        timer.daemon = True
+        _VISIT_TIMERS[dbname] = timer
+    timer.start()
+
+
+@atexit.register
+def _flush_visit_buffers_at_exit():
+    """Worker reciclado (limite de requisições/memória): grava o que ainda está no buffer."""
+    for dbname in {db for (db, _model) in list(_VISIT_BUFFER)}:
+        try:
+            _flush_visit_buffer(Registry(dbname), dbname)
+        except Exception:
+            _logger.warning("[BHZ Visits] falha ao gravar visitas na saída do worker", exc_info=True)
+
+
+class BhzWebsiteVisitMixin(models.AbstractModel):
+    """Contador de visitas em lote, sem UPDATE por visualização.
+
+    As visitas ficam acumuladas em memória no worker e são gravadas de tempos em
+    tempos com um único ``UPDATE ... FROM (VALUES ...)`` agregado: ao atingir o
+    tamanho máximo, por um timer do próprio worker (mesmo sem novas visitas) e na
+    saída do processo. Além do
+    contador absoluto, mantém ``bhz_popularity_score``: o logaritmo da soma das
+    visitas ponderadas por ``exp(taxa * tempo)``. Ordenar por esse campo equivale
+    a ordenar pela popularidade com decaimento exponencial, sem precisar
+    recalcular registros que não foram visitados.
+    """
+
+    _name = "bhz.website.visit.mixin"
+    _description = "BHZ - Contador de visitas no site"
+
+    # Coluna do contador absoluto no modelo que herda o mixin.
+    _bhz_visit_count_field = "website_visit_count"
+    _bhz_visit_flush_interval = 60  # segundos
+    _bhz_visit_flush_size = 500  # registros distintos no buffer
+
+    bhz_popularity_score = fields.Float(
+        string="Popularidade (com decaimento)",
+        default=0.0,
+        readonly=True,
+        copy=False,
+        index=True,
+        help="Score logarítmico das visitas com meia-vida de 7 dias. Usado na ordenação 'mais acessados'.",
+    )
+
+    # ------------------------------------------------------------------ Buffer
+    def _bhz_register_visit(self):
+        """Conta uma visita para cada registro (somente em memória)."""
+        ids = [rid for rid in self.ids if rid]
+        if not ids:
+            return
+        dbname = self.env.cr.dbname
+        key = (dbname, self._name)
+        with _VISIT_LOCK:
+            _VISIT_BUFFER[key].update(ids)
+            pending = sum(len(counter) for (db, _model), counter in _VISIT_BUFFER.items() if db == dbname)
+            last_flush = _VISIT_LAST_FLUSH.setdefault(dbname, time.monotonic())
+            due = (
+                pending >= self._bhz_visit_flush_size
+                or time.monotonic() - last_flush >= self._bhz_visit_flush_interval
+            )
+        if due:
+            self._bhz_flush_visits()
+        elif not self.env.registry.in_test_mode():
+            _schedule_visit_flush(dbname, self._bhz_visit_flush_interval)
+
+    @api.model
+    def _bhz_flush_visits(self):
+        """Grava o buffer deste banco em cursor próprio (não depende da transação da requisição)."""
+        _flush_visit_buffer(self.env.registry, self.env.cr.dbname)
+
+    def _bhz_apply_visit_batch(self, counter):
+        if not counter:
+            return
+        elapsed_days = (fields.Datetime.now() - VISIT_EPOCH).total_seconds() / 86400.0
+        boost = VISIT_DECAY_RATE * elapsed_days
+        rows = sorted(counter.items())  # ordem fixa de ids evita deadlock entre workers
+        params = []
+        for res_id, hits in rows:
+            params += [res_id, hits, boost + math.log(hits)]
+        values_sql = ", ".join(["(%s, %s, %s)"] * len(rows))
+        count_col = self._bhz_visit_count_field
+        # log(exp(a) + exp(b)) sem overflow; LEAST evita underflow do EXP no PostgreSQL.
+        self.env.cr.execute(
+            f"""
+            UPDATE {self._table} AS t
+               SET {count_col} = COALESCE(t.{count_col}, 0) + v.hits,
+                   bhz_popularity_score = GREATEST(COALESCE(t.bhz_popularity_score, 0), v.score)
+                       + LN(1 + EXP(-LEAST(ABS(COALESCE(t.bhz_popularity_score, 0) - v.score), 700)))
+              FROM (VALUES {values_sql}) AS v(id, hits, score)
+             WHERE t.id = v.id
+            """,
+            params,
+        )
+        _logger.debug("[BHZ Visits] %s: %s registros, %s visitas", self._name, len(rows), sum(counter.values()))
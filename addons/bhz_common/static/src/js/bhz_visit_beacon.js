@@ -0,0 +1,47 @@
+/** @odoo-module **/
+
+import { Interaction } from "@web/public/interaction";
+import { registry } from "@web/core/registry";
+
+/**
+ * Conta um clique em qualquer link dentro de um elemento marcado com
+ * data-bhz-visit-model / data-bhz-visit-id. O envio é um beacon: não bloqueia
+ * a navegação e o servidor só acumula o hit em memória.
+ */
+export class BhzVisitBeacon extends Interaction {
+    static selector = "[data-bhz-visit-model][data-bhz-visit-id]";
+    dynamicContent = {
+        "a[href]": { "t-on-click": this.onLinkClick },
+    };
+
+    onLinkClick() {
+        if (!navigator.sendBeacon) {
+            return;
+        }
+        const data = new FormData();
+        data.append("model", this.el.dataset.bhzVisitModel);
+        data.append("res_id", this.el.dataset.bhzVisitId);
+        navigator.sendBeacon("/bhz/visit", data);
+    }
+}
+
+/**
+ * Conta a visualização da página assim que ela carrega. Usado nas páginas
+ * servidas de cache (proxy/Odoo), em que o controller não chega a contar.
+ */
+export class BhzPageviewBeacon extends Interaction {
+    static selector = "[data-bhz-pageview-model][data-bhz-pageview-id]";
+
+    start() {
+        if (!navigator.sendBeacon) {
+            return;
+        }
+        const data = new FormData();
+        data.append("model", this.el.dataset.bhzPageviewModel);
+        data.append("res_id", this.el.dataset.bhzPageviewId);
+        navigator.sendBeacon("/bhz/visit", data);
+    }
+}
+
+registry.category("public.interactions").add("bhz_common.visit_beacon", BhzVisitBeacon);
+registry.category("public.interactions").add("bhz_common.pageview_beacon", BhzPageviewBeacon);
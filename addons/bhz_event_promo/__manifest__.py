@@ -1,6 +1,6 @@
 {
     "name": "GuiaBH - Eventos (Agenda + Terceiros + Botão custom)",
-    "version": "19.0.1.0.1",
+    "version": "19.0.1.7.0",
     "category": "Website",
     "summary": "Agenda de eventos com suporte a eventos de terceiros, link externo e botão personalizável.",
     "author": "BHZ Sistemas",
@@ -12,6 +12,7 @@
         "event",
         "website_event",
         "event_sale",
+        "bhz_common",
     ],
     "data": [
         "security/security.xml",
@@ -28,6 +29,7 @@
         "views/bhz_event_import_views.xml",
         "views/portalbh_carnaval_import_views.xml",
         "views/portalbh_carnaval_job_views.xml",
+        "views/api_job_views.xml",
     ],
     "assets": {
         "web.assets_frontend": [
@@ -1,33 +1,28 @@
 import base64
+import json
 import logging
-import time
 
-from odoo import http, fields
-from odoo.http import request
+from odoo import api, http, fields
+from odoo.http import request, Response
 
 _logger = logging.getLogger(__name__)
 
 
 class BhzEventApiController(http.Controller):
-    _rate_bucket = {}
+    _RATE_SCOPE = "bhz_event_api"
     _RATE_LIMIT = 120  # requests per 5 minutes per IP
     _RATE_WINDOW = 300
+    _NDJSON_CHUNK_SIZE = 500
 
     # --------------------------- Utils
     def _get_client_ip(self):
         return request.httprequest.remote_addr or "0.0.0.0"
 
     def _check_rate_limit(self):
-        ip = self._get_client_ip()
-        now = time.time()
-        bucket = self._rate_bucket.get(ip, [])
-        bucket = [ts for ts in bucket if now - ts < self._RATE_WINDOW]
-        if len(bucket) >= self._RATE_LIMIT:
-            _logger.warning("API rate limit exceeded for ip=%s", ip)
-            return False
-        bucket.append(now)
-        self._rate_bucket[ip] = bucket
-        return True
+        # Token bucket compartilhado entre workers (bhz_common).
+        return request.env["bhz.rate.limiter"].sudo()._allow_request(
+            self._RATE_SCOPE, self._RATE_LIMIT, self._RATE_WINDOW, key=self._get_client_ip()
+        )
 
     def _get_token(self):
         headers = request.httprequest.headers
@@ -110,12 +105,109 @@ class BhzEventApiController(http.Controller):
         events = payload.get("events") or []
         if not isinstance(events, list):
             return self._bad_request("Payload deve conter uma lista 'events'")
-        results = []
-        for item in events:
-            try:
-                rec = request.env["event.event"].bhz_api_upsert_event(item)
-                results.append({"external_source": rec.external_source, "external_id": rec.external_id, "id": rec.id, "status": "ok"})
-            except Exception as err:
-                _logger.warning("API bulk item failed: %s", err)
-                results.append({"external_source": item.get("external_source"), "external_id": item.get("external_id"), "status": "error", "message": str(err)})
+        if payload.get("async"):
+            # Lotes grandes: grava e responde na hora; o cron processa em background.
+            job = request.env["bhz.event.api.job"].sudo()._enqueue(events)
+            return {"job_id": job.id, "state": job.state, "status_url": "/api/events/jobs/%s" % job.id}
+        try:
+            results = request.env["event.event"].bhz_api_bulk_upsert_events(events)
+        except Exception as err:
+            _logger.exception("API bulk upsert failed")
+            return self._server_error(str(err))
         return {"results": results}
+
+    @http.route("/api/events/jobs/<int:job_id>", type="jsonrpc", auth="public", cors="*", csrf=False)
+    def job_status(self, job_id=None, offset=0, limit=None, **kwargs):
+        if not self._validate_token():
+            return self._unauthorized()
+        if not self._check_rate_limit():
+            return request.make_json_response({"error": "rate_limited"}, status=429)
+        job = request.env["bhz.event.api.job"].sudo().search(
+            [("id", "=", job_id), ("company_id", "=", request.env.company.id)],
+            limit=1,
+        )
+        if not job:
+            return request.make_json_response({"error": "not_found"}, status=404)
+        try:
+            offset = max(0, int(offset or 0))
+            limit = int(limit) if limit else None
+        except (TypeError, ValueError):
+            return self._bad_request("offset/limit inválidos")
+        return job._get_status(offset=offset, limit=limit)
+
+    @http.route("/api/events/ndjson", type="http", auth="public", methods=["POST"], cors="*", csrf=False, sitemap=False)
+    def ndjson_upsert(self, **kwargs):
+        """Upsert em streaming: um evento JSON por linha, um resultado JSON por linha.
+
+        O corpo é lido linha a linha e processado em lotes de ``_NDJSON_CHUNK_SIZE``;
+        cada lote é confirmado e seus resultados são enviados antes de ler o
+        próximo, então a memória fica limitada a um lote, seja qual for o feed.
+        """
+        if not self._validate_token():
+            return self._ndjson_error("Unauthorized", 401)
+        if not self._check_rate_limit():
+            return self._ndjson_error("rate_limited", 429)
+        content_type = request.httprequest.mimetype
+        if content_type not in ("application/x-ndjson", "application/jsonl", "application/json-seq"):
+            return self._ndjson_error("Content-Type deve ser application/x-ndjson", 415)
+
+        # O gerador roda depois que o dispatch fecha o cursor da requisição:
+        # captura o necessário e abre um cursor próprio.
+        stream = request.httprequest.stream
+        registry = request.env.registry
+        uid = request.env.uid
+        company_id = request.env.company.id
+        context = dict(request.env.context, allowed_company_ids=[company_id])
+        chunk_size = self._NDJSON_CHUNK_SIZE
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                Event = env["event.event"].sudo().with_company(company_id)
+                chunk = []
+                for line_no, payload, error in self._iter_ndjson(stream):
+                    if error:
+                        yield self._ndjson_line({"line": line_no, "status": "error", "message": error})
+                        continue
+                    chunk.append((line_no, payload))
+                    if len(chunk) >= chunk_size:
+                        yield from self._ndjson_flush(cr, Event, chunk)
+                        chunk = []
+                if chunk:
+                    yield from self._ndjson_flush(cr, Event, chunk)
+
+        return Response(generate(), status=200, mimetype="application/x-ndjson", direct_passthrough=True)
+
+    def _iter_ndjson(self, stream):
+        """``(linha, payload, erro)`` lendo o corpo incrementalmente."""
+        line_no = 0
+        while True:
+            raw = stream.readline()
+            if not raw:
+                break
+            line_no += 1
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                yield line_no, json.loads(raw), None
+            except ValueError as err:
+                yield line_no, None, "JSON inválido: %s" % err
+
+    def _ndjson_flush(self, cr, Event, chunk):
+        try:
+            results = Event.bhz_api_bulk_upsert_events([payload for _line, payload in chunk])
+            cr.commit()
+            Event.env.invalidate_all()  # não acumula o cache dos lotes anteriores
+        except Exception as err:
+            cr.rollback()
+            _logger.exception("API ndjson: lote falhou")
+            results = [{"status": "error", "message": str(err)}] * len(chunk)
+        for (line_no, _payload), result in zip(chunk, results):
+            yield self._ndjson_line(dict(result, line=line_no))
+
+    def _ndjson_line(self, data):
+        return (json.dumps(data, default=str) + "\n").encode()
+
+    def _ndjson_error(self, message, status):
+        return Response(self._ndjson_line({"error": message}), status=status, mimetype="application/x-ndjson")
@@ -1,19 +1,51 @@
 # -*- coding: utf-8 -*-
+import base64
 import calendar
+import hashlib
 import json
 import logging
 from collections import defaultdict, OrderedDict
 from datetime import date, datetime, time, timedelta
 
 from babel.dates import format_date
+from werkzeug.http import http_date
 from urllib.parse import urlencode as py_urlencode
 
-from odoo import fields, http
-from odoo.http import request
+from odoo import api, fields, http
+from odoo.http import request, Response
+
+from ..models.event import EVENT_PAGE_CSRF_PLACEHOLDER
 
 _logger = logging.getLogger(__name__)
 
 
+def sitemap_agenda(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    domain = env["event.event"]._prepare_public_events_domain()
+    entry = Sitemap._bhz_entry("/agenda", Sitemap._bhz_lastmod("event.event", domain), qs)
+    if entry:
+        yield entry
+
+
+def sitemap_agenda_categories(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    slug = env["ir.http"]._slug
+    lastmod = env["event.event"]._bhz_sitemap_category_lastmod()
+    for category in env["event.type"].sudo().browse(sorted(lastmod)):
+        entry = Sitemap._bhz_entry("/agenda/c/%s" % slug(category), lastmod[category.id], qs)
+        if entry:
+            yield entry
+
+
+def sitemap_agenda_events(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    slug = env["ir.http"]._slug
+    for event_id, name, write_date in env["event.event"]._bhz_sitemap_rows():
+        entry = Sitemap._bhz_entry("/agenda/event/%s" % slug((event_id, name or "")), write_date, qs)
+        if entry:
+            yield entry
+
+
 class GuiaBHAgendaController(http.Controller):
 
     LIST_VIEW = "list"
@@ -21,7 +53,7 @@ class GuiaBHAgendaController(http.Controller):
     WEEK_VIEW = "week"
     VALID_VIEWS = {LIST_VIEW, MONTH_VIEW, WEEK_VIEW}
 
-    @http.route(["/agenda"], type="http", auth="public", website=True, sitemap=True)
+    @http.route(["/agenda"], type="http", auth="public", website=True, sitemap=sitemap_agenda)
     def guiabh_agenda(self, **kw):
         return self._render_agenda_page(category_record=None, **kw)
 
@@ -35,7 +67,7 @@ class GuiaBHAgendaController(http.Controller):
         type="http",
         auth="public",
         website=True,
-        sitemap=True,
+        sitemap=sitemap_agenda_categories,
     )
     def guiabh_agenda_category(self, category_record, **kw):
         return self._render_agenda_page(category_record=category_record, **kw)
@@ -46,7 +78,7 @@ class GuiaBHAgendaController(http.Controller):
         base_domain = self._base_agenda_domain()
         domain = self._build_domain(filters, base_domain=base_domain)
         events_model = request.env["event.event"].sudo()
-        events = events_model.search(domain, order="date_begin asc")
+        events = events_model._bhz_search_public_events(domain, filters["search"], order="date_begin asc")
         snapshot = [(ev.id, ev.name) for ev in events[:5]]
         _logger.info("Agenda domain used: %s -> %s eventos | sample=%s", domain, len(events), snapshot)
         if not events:
@@ -56,15 +88,14 @@ class GuiaBHAgendaController(http.Controller):
                 self._serialize_for_log(fallback),
             )
 
-        venues = self._get_available_venues(base_domain)
-        categories = request.env["event.type"].sudo().search([], order="name asc")
+        facets = self._get_agenda_facets(filters, base_domain)
         base_path = request.httprequest.path
         base_params, multi_params = self._build_base_query(filters)
         view_urls = self._build_view_urls(base_path, base_params, multi_params, filters)
 
         context = {
             "events": events,
-            "categories": categories,
+            "categories": facets["categories"],
             "active_category": filters["category_id"],
             "search": filters["search"],
             "view_mode": filters["view"],
@@ -72,7 +103,8 @@ class GuiaBHAgendaController(http.Controller):
             "featured_filter": filters["featured"],
             "neighborhood_filter": filters["neighborhood"],
             "venue_filter": filters["venue_id"],
-            "available_venues": venues,
+            "available_venues": facets["venues"],
+            "available_neighborhoods": facets["neighborhoods"],
             "filter_action": base_path,
             "view_urls": view_urls,
             "base_query": base_params,
@@ -96,7 +128,7 @@ class GuiaBHAgendaController(http.Controller):
         type="http",
         auth="public",
         website=True,
-        sitemap=True,
+        sitemap=sitemap_agenda_events,
     )
     def guiabh_event_detail(self, event, **kwargs):
         return self._render_event_detail(event)
@@ -109,7 +141,8 @@ class GuiaBHAgendaController(http.Controller):
         type="http",
         auth="public",
         website=True,
-        sitemap=True,
+        # URLs legadas: o sitemap lista só /agenda/event/...
+        sitemap=False,
     )
     def odoo_event_detail_override(self, event, **kwargs):
         """Override standard website_event page to use Guia BH layout."""
@@ -195,13 +228,77 @@ class GuiaBHAgendaController(http.Controller):
 
     def _render_event_detail(self, event):
         event = event.sudo()
-        return request.render(
-            "bhz_event_promo.bhz_event_detail",
-            {
-                "event": event,
-            },
+        ttl = event._bhz_page_cache_ttl()
+        if not ttl or not self._event_page_cacheable():
+            event._bhz_register_visit()
+            response = request.render(
+                "bhz_event_promo.bhz_event_detail",
+                {
+                    "event": event,
+                },
+            )
+            # Página da sessão (usuário logado, debug...): nenhum proxy pode guardá-la.
+            response.headers["Cache-Control"] = "private, no-cache"
+            response.headers["Vary"] = "Accept-Language, Cookie"
+            return response
+        return self._render_event_detail_cached(event, ttl)
+
+    def _event_page_cacheable(self):
+        """Só visitantes anônimos, GET simples, sem parâmetros nem modo debug."""
+        httprequest = request.httprequest
+        return (
+            httprequest.method in ("GET", "HEAD")
+            and not httprequest.args
+            and not request.session.debug
+            and request.env.user._is_public()
         )
 
+    def _render_event_detail_cached(self, event, ttl):
+        """Página de detalhe com cache por evento/site/idioma e ETag para o proxy.
+
+        Com ``Cache-Control: public, s-maxage`` um proxy reverso serve as visitas
+        repetidas sem chegar ao Odoo; por isso a contagem de visitas passa a vir
+        do beacon de página (``data-bhz-pageview-*``) em vez do servidor.
+        O HTML guardado é renderizado com ``EVENT_PAGE_CSRF_PLACEHOLDER`` no
+        lugar do token CSRF, trocado pelo token da sessão atual a cada hit (o
+        que o proxy guardar mantém o do primeiro visitante; a página não tem
+        formulários POST). ``Vary: Cookie`` impede o proxy de servir essa cópia
+        a quem chega com sessão.
+        """
+        website_id = request.website.id if getattr(request, "website", False) else False
+        lang = request.lang.code if getattr(request, "lang", False) else request.env.lang
+        etag = event._bhz_page_cache_etag(website_id, lang)
+        headers = [
+            ("Cache-Control", "public, max-age=0, s-maxage=%d" % ttl),
+            ("ETag", '"%s"' % etag),
+            ("Vary", "Accept-Language, Cookie"),
+        ]
+        if etag in request.httprequest.if_none_match:
+            return Response(status=304, headers=headers)
+
+        html = event._bhz_page_cache_get(website_id, lang, etag)
+        if html is None:
+            # O token CSRF leva timestamp: em vez de procurá-lo no HTML pronto, o
+            # layout já é renderizado com o marcador (ver ir.qweb._prepare_environment).
+            response = request.render(
+                "bhz_event_promo.bhz_event_detail",
+                {
+                    "event": event,
+                    "bhz_page_cache": True,
+                    "bhz_csrf_placeholder": EVENT_PAGE_CSRF_PLACEHOLDER,
+                },
+                lazy=False,
+            )
+            if response.status_code != 200:
+                response.set_data(
+                    response.get_data(as_text=True).replace(EVENT_PAGE_CSRF_PLACEHOLDER, request.csrf_token())
+                )
+                return response
+            html = response.get_data(as_text=True)
+            event._bhz_page_cache_set(website_id, lang, etag, html, ttl)
+        html = html.replace(EVENT_PAGE_CSRF_PLACEHOLDER, request.csrf_token())
+        return request.make_response(html, headers=headers + [("Content-Type", "text/html; charset=utf-8")])
+
     @http.route(
         "/bhz_event_promo/snippet/announced_events",
         type="jsonrpc",
@@ -209,19 +306,11 @@ class GuiaBHAgendaController(http.Controller):
         website=True,
     )
     def snippet_announced_events_data(self, category_ids=None, limit=12, order_mode="recent"):
-        limit = self._sanitize_limit(limit)
-        order_mode = self._sanitize_order_mode(order_mode)
-        parsed_category_ids = self._parse_category_ids(category_ids)
-        events = (
-            request.env["event.event"]
-            .sudo()
-            .guiabh_get_announced_events(limit=limit, category_ids=parsed_category_ids, order_mode=order_mode)
-        )
-        html = request.env["ir.ui.view"]._render_template(
-            "bhz_event_promo.guiabh_announced_events_cards",
-            {"events": events},
+        html, has_events = request.env["bhz.snippet.prerender"]._bhz_render_snippet(
+            "s_guiabh_announced_events",
+            {"category_ids": category_ids, "limit": limit, "order_mode": order_mode},
         )
-        return {"html": html, "has_events": bool(events)}
+        return {"html": html, "has_events": has_events}
 
     @http.route(
         "/bhz_event_promo/snippet/featured_events",
@@ -322,38 +411,10 @@ class GuiaBHAgendaController(http.Controller):
             limit_value = 12
         return max(1, min(limit_value, 24))
 
-    def _sanitize_order_mode(self, order_mode):
-        if isinstance(order_mode, str):
-            lowered = order_mode.lower()
-            if lowered in ("recent", "popular"):
-                return lowered
-        return "recent"
-
-    def _parse_category_ids(self, category_ids):
-        raw_ids = category_ids or []
-        if isinstance(raw_ids, str):
-            try:
-                raw_ids = json.loads(raw_ids)
-            except ValueError:
-                raw_ids = []
-        parsed = []
-        for entry in raw_ids:
-            if isinstance(entry, dict):
-                entry = entry.get("id")
-            try:
-                entry_id = int(entry)
-            except (ValueError, TypeError):
-                continue
-            if entry_id:
-                parsed.append(entry_id)
-        return parsed
-
     def _build_domain(self, filters, base_domain=None):
         domain = list(base_domain or self._base_agenda_domain())
         if filters["category_id"]:
             domain.append(("promo_category_id", "=", filters["category_id"]))
-        if filters["search"]:
-            domain += ["|", ("name", "ilike", filters["search"]), ("promo_short_description", "ilike", filters["search"])]
         if filters["price"] == "free":
             domain.append(("ticket_kind", "=", "free"))
         elif filters["price"] == "paid":
@@ -598,8 +659,304 @@ class GuiaBHAgendaController(http.Controller):
         except Exception:
             return None
 
-    def _get_available_venues(self, domain):
-        Event = request.env["event.event"].sudo()
-        grouped = Event.read_group(domain, ["venue_partner_id"], ["venue_partner_id"])
-        venue_ids = [res["venue_partner_id"][0] for res in grouped if res.get("venue_partner_id")]
-        return request.env["res.partner"].sudo().browse(venue_ids).sorted(lambda p: p.name or "")
+    def _get_agenda_facets(self, filters, base_domain):
+        """Filtros da agenda com contagens, servidos pelo cache de facetas."""
+        website = getattr(request, "website", False)
+        facets = request.env["bhz.event.agenda.facet"].sudo()._get_facets(
+            website,
+            filters,
+            lambda facet_filters: self._build_domain(facet_filters, base_domain=base_domain),
+        )
+        categories = list(facets.get("categories") or [])
+        venues = list(facets.get("venues") or [])
+        # Mantém a opção escolhida no select mesmo quando ela não tem eventos.
+        if filters["category_id"] and filters["category_id"] not in {cat["id"] for cat in categories}:
+            category = request.env["event.type"].sudo().browse(filters["category_id"]).exists()
+            if category:
+                categories.insert(0, {"id": category.id, "name": category.name, "count": 0})
+        if filters["venue_id"] and filters["venue_id"] not in {venue["id"] for venue in venues}:
+            venue = request.env["res.partner"].sudo().browse(filters["venue_id"]).exists()
+            if venue:
+                venues.insert(0, {"id": venue.id, "name": venue.name, "count": 0})
+        return {
+            "categories": categories,
+            "venues": venues,
+            "neighborhoods": facets.get("neighborhoods") or [],
+        }
+
+    # ------------------------------------------------------------ Public feed
+    _FEED_PAGE_SIZE = 500
+    _FEED_MAX_PAGE_SIZE = 2000
+
+    @http.route("/api/agenda/events", type="http", auth="public", methods=["GET"], website=True, cors="*", sitemap=False)
+    def agenda_feed_json(self, **kwargs):
+        """Agenda pública em JSON, paginada por cursor e com deltas.
+
+        Primeira carga: sem parâmetros, seguindo ``next_cursor`` enquanto
+        ``has_more``. Depois basta chamar com o último ``cursor``: só vem o que
+        mudou, e eventos que saíram da agenda voltam com ``"public": false``.
+        """
+        if not request.env["bhz.rate.limiter"].sudo()._allow_request("bhz_agenda_feed", 300, 300):
+            return self._feed_json_error("rate_limited", 429)
+        try:
+            feed = self._parse_feed_args(kwargs)
+        except ValueError as err:
+            return self._feed_json_error(str(err), 400)
+        limit = feed["limit"]
+        rows, not_modified, headers = self._run_feed_query(feed, limit=limit)
+        if not_modified:
+            return not_modified
+        base_url = request.website.get_base_url() if request.website else request.httprequest.url_root.rstrip("/")
+        next_cursor = self._encode_feed_cursor(rows[-1]) if rows else feed["cursor_raw"]
+
+        def generate():
+            yield b'{"events": ['
+            for index, row in enumerate(rows):
+                item = self._feed_row_to_json(row, base_url)
+                yield (", " if index else "").encode() + json.dumps(item, default=str).encode()
+            tail = {"count": len(rows), "has_more": bool(limit and len(rows) >= limit), "next_cursor": next_cursor}
+            yield b"], " + json.dumps(tail)[1:].encode()
+
+        return Response(generate(), status=200, headers=headers, mimetype="application/json", direct_passthrough=True)
+
+    @http.route("/agenda/feed.ics", type="http", auth="public", methods=["GET"], website=True, sitemap=False)
+    def agenda_feed_ics(self, **kwargs):
+        """Agenda pública assinável (iCalendar), com os mesmos filtros do JSON."""
+        try:
+            feed = self._parse_feed_args(kwargs, allow_cursor=False)
+        except ValueError as err:
+            return request.make_response(str(err), status=400)
+        _rows, not_modified, headers = self._run_feed_query(feed, public_only=True, fetch_rows=False)
+        if not_modified:
+            return not_modified
+        base_url = request.website.get_base_url() if request.website else request.httprequest.url_root.rstrip("/")
+        host = (request.httprequest.host or "guiabh").split(":")[0]
+        calendar_name = "%s - Agenda" % (request.website.name if request.website else "GuiaBH")
+        public_domain, scope_domain = self._feed_domains(feed)
+        registry = request.env.registry
+        uid, context = request.env.uid, dict(request.env.context)
+        page_size = self._FEED_MAX_PAGE_SIZE
+
+        def generate():
+            yield self._ics_lines(
+                [
+                    "BEGIN:VCALENDAR",
+                    "VERSION:2.0",
+                    "PRODID:-//BHZ Sistemas//GuiaBH Agenda//PT",
+                    "CALSCALE:GREGORIAN",
+                    "METHOD:PUBLISH",
+                    "X-WR-CALNAME:%s" % self._ics_escape(calendar_name),
+                    "X-PUBLISHED-TTL:PT1H",
+                ]
+            )
+            # O corpo é enviado depois que o cursor da requisição fecha: pagina
+            # por (write_date, id) num cursor próprio, uma página por vez.
+            with registry.cursor(readonly=True) as cr:
+                Event = api.Environment(cr, uid, context)["event.event"]
+                after = None
+                while True:
+                    rows_sql, _summary_sql = Event._bhz_public_feed_sql(
+                        public_domain,
+                        scope_domain,
+                        updated_since=feed["updated_since"],
+                        after=after,
+                        limit=page_size,
+                        public_only=True,
+                    )
+                    cr.execute(rows_sql)
+                    rows = cr.dictfetchall()
+                    for row in rows:
+                        yield self._ics_lines(self._feed_row_to_vevent(row, base_url, host))
+                    if len(rows) < page_size:
+                        break
+                    after = (rows[-1]["write_date"], rows[-1]["id"])
+            yield self._ics_lines(["END:VCALENDAR"])
+
+        return Response(
+            generate(),
+            status=200,
+            headers=headers,
+            content_type="text/calendar; charset=utf-8",
+            direct_passthrough=True,
+        )
+
+    def _parse_feed_args(self, args, allow_cursor=True):
+        category_id = self._parse_int(args.get("category"))
+        neighborhood = (args.get("neighborhood") or "").strip()
+        updated_since = None
+        if args.get("updated_since"):
+            try:
+                updated_since = fields.Datetime.to_datetime(args["updated_since"].replace("T", " ").rstrip("Z"))
+            except ValueError:
+                raise ValueError("updated_since inválido (use ISO 8601, UTC)")
+        cursor = None
+        cursor_raw = (args.get("cursor") or "").strip() if allow_cursor else ""
+        if cursor_raw:
+            cursor = self._decode_feed_cursor(cursor_raw)
+        limit = self._parse_int(args.get("limit")) or self._FEED_PAGE_SIZE
+        return {
+            "category_id": category_id,
+            "neighborhood": neighborhood,
+            "updated_since": updated_since,
+            "cursor": cursor,
+            "cursor_raw": cursor_raw or None,
+            "limit": max(1, min(limit, self._FEED_MAX_PAGE_SIZE)),
+        }
+
+    def _encode_feed_cursor(self, row):
+        raw = "%s|%s" % (row["write_date"].isoformat(), row["id"])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode_feed_cursor(self, value):
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+            write_date, record_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(write_date), int(record_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("cursor inválido")
+
+    def _feed_domains(self, feed):
+        """``(domínio público, domínio de escopo)`` do feed com os filtros pedidos."""
+        public_domain = self._base_agenda_domain()
+        scope_domain = []
+        if "website_id" in request.env["event.event"]._fields and request.website:
+            scope_domain += ["|", ("website_id", "=", False), ("website_id", "=", request.website.id)]
+        for domain in (public_domain, scope_domain):
+            if feed["category_id"]:
+                domain.append(("promo_category_id", "=", feed["category_id"]))
+            if feed["neighborhood"]:
+                domain.append(("neighborhood", "ilike", feed["neighborhood"]))
+        return public_domain, scope_domain
+
+    def _run_feed_query(self, feed, limit=None, public_only=False, fetch_rows=True):
+        """Executa resumo (ETag) e linhas; devolve ``(linhas, resposta_304 | None, headers)``.
+
+        Com ``fetch_rows=False`` só calcula o resumo; quem chama lê as linhas.
+        """
+        Event = request.env["event.event"]
+        public_domain, scope_domain = self._feed_domains(feed)
+        rows_sql, summary_sql = Event._bhz_public_feed_sql(
+            public_domain,
+            scope_domain,
+            updated_since=feed["updated_since"],
+            after=feed["cursor"],
+            limit=limit,
+            public_only=public_only,
+        )
+        cr = request.env.cr
+        cr.execute(summary_sql)
+        count, last_write, id_sum = cr.fetchone()
+        etag_source = "|".join(
+            str(part)
+            for part in (
+                request.httprequest.path,
+                request.website.id if request.website else 0,
+                request.env.lang,
+                feed["category_id"],
+                feed["neighborhood"],
+                feed["updated_since"],
+                feed["cursor_raw"],
+                limit,
+                count,
+                last_write,
+                id_sum,
+            )
+        )
+        etag = hashlib.sha1(etag_source.encode()).hexdigest()
+        headers = [("ETag", '"%s"' % etag), ("Cache-Control", "public, max-age=60")]
+        if last_write:
+            headers.append(("Last-Modified", http_date(last_write)))
+        if etag in request.httprequest.if_none_match:
+            return [], Response(status=304, headers=headers), headers
+        if not fetch_rows:
+            return [], None, headers
+        cr.execute(rows_sql)
+        return cr.dictfetchall(), None, headers
+
+    def _feed_row_to_json(self, row, base_url):
+        updated_at = self._feed_iso(row["write_date"])
+        if not row["is_public"]:
+            return {"id": row["id"], "public": False, "updated_at": updated_at}
+        return {
+            "id": row["id"],
+            "public": True,
+            "updated_at": updated_at,
+            "name": row["name"],
+            "date_begin": self._feed_iso(row["date_begin"]),
+            "date_end": self._feed_iso(row["date_end"]),
+            "short_description": row["promo_short_description"] or None,
+            "category": {"id": row["promo_category_id"], "name": row["category_name"]}
+            if row["promo_category_id"]
+            else None,
+            "venue": row["venue_name"] or None,
+            "neighborhood": row["neighborhood"] or None,
+            "url": "%s/agenda/event/%s" % (base_url, row["id"]),
+            "tickets_url": row["registration_external_url"] or None,
+            "image_url": "%s/web/image/event.event/%s/promo_cover_image" % (base_url, row["id"])
+            if row["has_public_image"]
+            else None,
+        }
+
+    def _feed_iso(self, value):
+        if not value:
+            return None
+        return value.replace(microsecond=0).isoformat() + "Z"
+
+    def _feed_row_to_vevent(self, row, base_url, host):
+        def ics_dt(value):
+            return value.strftime("%Y%m%dT%H%M%SZ")
+
+        url = "%s/agenda/event/%s" % (base_url, row["id"])
+        date_begin = row["date_begin"]
+        date_end = row["date_end"] or (date_begin + timedelta(hours=2) if date_begin else None)
+        location = ", ".join(filter(None, [row["venue_name"], row["neighborhood"]]))
+        lines = [
+            "BEGIN:VEVENT",
+            "UID:event-%s@%s" % (row["id"], host),
+            "DTSTAMP:%s" % ics_dt(row["write_date"]),
+            "LAST-MODIFIED:%s" % ics_dt(row["write_date"]),
+            "SUMMARY:%s" % self._ics_escape(row["name"] or ""),
+            "URL:%s" % url,
+        ]
+        if date_begin:
+            lines.append("DTSTART:%s" % ics_dt(date_begin))
+        if date_end:
+            lines.append("DTEND:%s" % ics_dt(date_end))
+        if location:
+            lines.append("LOCATION:%s" % self._ics_escape(location))
+        if row["category_name"]:
+            lines.append("CATEGORIES:%s" % self._ics_escape(row["category_name"]))
+        description = "\n\n".join(filter(None, [row["promo_short_description"], url]))
+        lines.append("DESCRIPTION:%s" % self._ics_escape(description))
+        lines.append("END:VEVENT")
+        return lines
+
+    def _ics_escape(self, text):
+        return (
+            str(text)
+            .replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\r\n", "\\n")
+            .replace("\n", "\\n")
+        )
+
+    def _ics_lines(self, lines):
+        """Linhas iCalendar com CRLF e dobra em 75 octetos (RFC 5545)."""
+        output = []
+        for line in lines:
+            encoded = line.encode("utf-8")
+            width = 75
+            while len(encoded) > width:
+                cut = width
+                # não corta no meio de um caractere UTF-8
+                while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+                    cut -= 1
+                output.append(encoded[:cut] + b"\r\n ")
+                encoded = encoded[cut:]
+                width = 74  # a linha de continuação começa com espaço
+            output.append(encoded + b"\r\n")
+        return b"".join(output)
+
+    def _feed_json_error(self, message, status):
+        return Response(json.dumps({"error": message}), status=status, mimetype="application/json")
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Copia descrições de colunas legadas para ``promo_description_html`` (uma única vez).
+
+Antes rodava no ``init()`` do ``event.event`` a cada atualização do módulo,
+consultando ``information_schema`` e varrendo ``event_event`` inteira.
+"""
+import logging
+
+from odoo.tools import SQL
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+LEGACY_DESCRIPTION_COLUMNS = (
+    "public_description_html",
+    "promo_html_description",
+    "third_party_description_html",
+    "third_party_description",
+    "organizer_description",
+)
+
+
+def migrate(cr, version):
+    if not version or not column_exists(cr, "event_event", "promo_description_html"):
+        return
+    for source in LEGACY_DESCRIPTION_COLUMNS:
+        if not column_exists(cr, "event_event", source):
+            continue
+        cr.execute(
+            SQL(
+                """
+                UPDATE event_event
+                   SET promo_description_html = %(source)s
+                 WHERE (promo_description_html IS NULL OR promo_description_html = '')
+                   AND %(source)s IS NOT NULL
+                   AND %(source)s != ''
+                """,
+                source=SQL.identifier(source),
+            )
+        )
+        _logger.info("[BHZ EVENT PROMO] promo_description_html preenchida a partir de %s em %s eventos", source, cr.rowcount)
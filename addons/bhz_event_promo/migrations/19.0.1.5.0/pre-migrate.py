@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Valores antigos de ``registration_mode`` ('promo'/'none') viram 'disclosure_only'.
+
+Antes rodava no ``init()`` do ``event.event`` a cada atualização do módulo.
+"""
+import logging
+
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version or not column_exists(cr, "event_event", "registration_mode"):
+        return
+    cr.execute(
+        """
+        UPDATE event_event
+           SET registration_mode = 'disclosure_only'
+         WHERE registration_mode IN ('promo', 'none')
+        """
+    )
+    _logger.info("[BHZ EVENT PROMO] registration_mode legado migrado em %s eventos", cr.rowcount)
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Esvazia o cache de facetas da agenda antes do índice único por combinação de filtros.
+
+As linhas antigas podem ter chaves repetidas e não têm os filtros estruturados;
+são recalculadas na próxima visita.
+"""
+import logging
+
+from odoo.tools.sql import table_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version or not table_exists(cr, "bhz_event_agenda_facet"):
+        return
+    cr.execute("DELETE FROM bhz_event_agenda_facet")
+    _logger.info("[BHZ EVENT PROMO] cache de facetas da agenda esvaziado (%s linhas)", cr.rowcount)
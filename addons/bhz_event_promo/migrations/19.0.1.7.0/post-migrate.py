@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Passa os jobs de ingestão legados (itens/resultados no próprio job) para lotes.
+
+Os campos ``payload``/``results`` de ``bhz.event.api.job`` saíram do modelo:
+os resultados já gravados viram um lote processado e os itens pendentes viram
+lotes de ``chunk_size`` a partir de ``processed_count``. Depois as colunas são
+removidas.
+"""
+import logging
+
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    if column_exists(cr, "bhz_event_api_job", "results"):
+        cr.execute(
+            """
+            INSERT INTO bhz_event_api_job_chunk (job_id, sequence, item_count, results, state)
+            SELECT id, 0, jsonb_array_length(results), results, 'done'
+              FROM bhz_event_api_job
+             WHERE jsonb_typeof(results) = 'array' AND jsonb_array_length(results) > 0
+            """
+        )
+        _logger.info("[BHZ EVENT PROMO] resultados legados movidos para lotes em %s jobs", cr.rowcount)
+        cr.execute("ALTER TABLE bhz_event_api_job DROP COLUMN results")
+    if column_exists(cr, "bhz_event_api_job", "payload"):
+        cr.execute(
+            """
+            INSERT INTO bhz_event_api_job_chunk (job_id, sequence, item_count, payload, state)
+            SELECT job.id,
+                   COALESCE(job.processed_count, 0) + part.start,
+                   LEAST(part.size, jsonb_array_length(job.payload) - part.start),
+                   jsonb_path_query_array(
+                       job.payload,
+                       format('$[%s to %s]', part.start, part.start + part.size - 1)::jsonpath
+                   ),
+                   'pending'
+              FROM bhz_event_api_job job
+             CROSS JOIN LATERAL (
+                   SELECT generate_series(0, jsonb_array_length(job.payload) - 1, GREATEST(COALESCE(job.chunk_size, 1), 1)) AS start,
+                          GREATEST(COALESCE(job.chunk_size, 1), 1) AS size
+             ) part
+             WHERE jsonb_typeof(job.payload) = 'array' AND jsonb_array_length(job.payload) > 0
+            """
+        )
+        _logger.info("[BHZ EVENT PROMO] %s lotes criados a partir de itens pendentes legados", cr.rowcount)
+        cr.execute("ALTER TABLE bhz_event_api_job DROP COLUMN payload")
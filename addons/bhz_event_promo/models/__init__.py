@@ -1,5 +1,10 @@
 from . import event
+from . import agenda_facet
 from . import res_company
 from . import website
 from . import res_config_settings
 from . import portalbh_import_job
+from . import api_import_job
+from . import ir_binary
+from . import ir_qweb
+from . import snippet_prerender
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+import psycopg2
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Filtros da agenda que mudam as contagens (view/mês/semana não entram).
+FACET_FILTER_KEYS = ("category_id", "search", "price", "featured", "neighborhood", "venue_id")
+# Eventos passam a data de término sem nenhum write; o TTL cobre essa expiração.
+FACET_TTL = timedelta(hours=1)
+# Agenda sem nenhum filtro: suas facetas são a lista de valores aceitos no cache.
+FACET_EMPTY_FILTERS = {
+    "category_id": None,
+    "search": "",
+    "price": "all",
+    "featured": False,
+    "neighborhood": "",
+    "venue_id": None,
+}
+
+
+class BhzEventAgendaFacet(models.Model):
+    """Cache das facetas (categorias, locais e bairros) da agenda pública.
+
+    Uma linha por website/empresa e combinação de filtros estruturados. Só
+    entram no cache valores que existem nas facetas da agenda sem filtros
+    (categorias, locais e bairros com eventos), então o número de linhas é
+    limitado pelos dados e não pelo que chega na URL; busca textual e valores
+    arbitrários são calculados sem cache. Quando um evento
+    público muda (ver ``event.event.write``), só as linhas cujas contagens ele
+    pode alterar são descartadas e recalculadas na próxima visita, de modo que a
+    renderização comum dos filtros é uma única leitura indexada, sem agregações.
+    """
+
+    _name = "bhz.event.agenda.facet"
+    _description = "Cache de facetas da Agenda (GuiaBH)"
+
+    website_id = fields.Many2one("website", string="Website", ondelete="cascade", index=True)
+    company_id = fields.Many2one("res.company", string="Empresa", ondelete="cascade", index=True)
+    filters_key = fields.Char(string="Chave dos filtros", required=True, index=True)
+    payload = fields.Json(string="Facetas")
+    computed_at = fields.Datetime(string="Calculado em", required=True)
+    # Filtros da linha, para a invalidação saber quais eventos a afetam.
+    filter_category = fields.Integer(string="Filtro: categoria", index=True)
+    filter_venue = fields.Integer(string="Filtro: local", index=True)
+    filter_neighborhood = fields.Char(string="Filtro: bairro")
+    filter_price = fields.Char(string="Filtro: preço")
+    filter_featured = fields.Boolean(string="Filtro: destaque")
+
+    _filters_key_unique = models.UniqueIndex("(company_id, COALESCE(website_id, 0), filters_key)")
+
+    @api.model
+    def _filters_key(self, filters):
+        relevant = {key: filters.get(key) or None for key in FACET_FILTER_KEYS}
+        raw = json.dumps(relevant, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @api.model
+    def _get_facets(self, website, filters, domain_builder):
+        """Facetas para ``filters``; ``domain_builder(filters)`` monta o domínio da agenda.
+
+        Cada faceta é contada com todos os filtros ativos, exceto o da própria
+        dimensão, para o visitante poder trocar de categoria/local/bairro.
+        """
+        if not self._is_unfiltered(filters) and not self._filters_whitelisted(website, filters, domain_builder):
+            return self._compute_facets(filters, domain_builder)
+
+        company = website.company_id if website else self.env.company
+        key = self._filters_key(filters)
+        cached = self.search(
+            [
+                ("website_id", "=", website.id if website else False),
+                ("company_id", "=", company.id),
+                ("filters_key", "=", key),
+            ],
+            order="computed_at desc",
+            limit=1,
+        )
+        now = fields.Datetime.now()
+        if cached and cached.computed_at >= now - FACET_TTL:
+            return cached.payload
+
+        payload = self._compute_facets(filters, domain_builder)
+        vals = {"payload": payload, "computed_at": now}
+        if cached:
+            cached.write(vals)
+            return payload
+        try:
+            with self.env.cr.savepoint():
+                self.create(
+                    dict(
+                        vals,
+                        website_id=website.id if website else False,
+                        company_id=company.id,
+                        filters_key=key,
+                        filter_category=self._filter_int(filters.get("category_id")),
+                        filter_venue=self._filter_int(filters.get("venue_id")),
+                        filter_neighborhood=filters.get("neighborhood") or False,
+                        filter_price=filters.get("price") or False,
+                        filter_featured=bool(filters.get("featured")),
+                    )
+                )
+        except psycopg2.IntegrityError:
+            # outra requisição calculou a mesma combinação ao mesmo tempo
+            pass
+        return payload
+
+    @api.model
+    def _is_unfiltered(self, filters):
+        return all((filters.get(key) or None) == (empty or None) for key, empty in FACET_EMPTY_FILTERS.items())
+
+    @api.model
+    def _filters_whitelisted(self, website, filters, domain_builder):
+        """Os filtros só usam valores presentes nas facetas da agenda sem filtros?"""
+        if filters.get("search") or filters.get("price") not in (None, "", "all", "free", "paid"):
+            return False
+        base = self._get_facets(website, dict(filters, **FACET_EMPTY_FILTERS), domain_builder)
+        if filters.get("category_id") and filters["category_id"] not in {
+            category["id"] for category in base.get("categories") or []
+        }:
+            return False
+        if filters.get("venue_id") and filters["venue_id"] not in {venue["id"] for venue in base.get("venues") or []}:
+            return False
+        neighborhood = " ".join((filters.get("neighborhood") or "").split()).lower()
+        if neighborhood and neighborhood not in {
+            item["name"].lower() for item in base.get("neighborhoods") or []
+        }:
+            return False
+        return True
+
+    @api.model
+    def _filter_int(self, value):
+        try:
+            return int(value or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    @api.model
+    def _compute_facets(self, filters, domain_builder):
+        Event = self.env["event.event"].sudo()
+        term = filters.get("search")
+
+        category_counts = dict(
+            Event._bhz_count_public_events_by(
+                domain_builder(dict(filters, category_id=None)), term, "promo_category_id"
+            )
+        )
+        venue_counts = dict(
+            Event._bhz_count_public_events_by(
+                domain_builder(dict(filters, venue_id=None)), term, "venue_partner_id"
+            )
+        )
+        neighborhood_counts = {}
+        for name, count in Event._bhz_count_public_events_by(
+            domain_builder(dict(filters, neighborhood="")), term, "neighborhood"
+        ):
+            label = " ".join(name.split())
+            if label:
+                neighborhood_counts[label] = neighborhood_counts.get(label, 0) + count
+
+        categories = self.env["event.type"].sudo().browse(list(category_counts)).exists()
+        venues = self.env["res.partner"].sudo().browse(list(venue_counts)).exists()
+        return {
+            "categories": [
+                {"id": cat.id, "name": cat.name, "count": category_counts[cat.id]}
+                for cat in categories.sorted(lambda c: (c.name or "").lower())
+            ],
+            "venues": [
+                {"id": venue.id, "name": venue.name, "count": venue_counts[venue.id]}
+                for venue in venues.sorted(lambda p: (p.name or "").lower())
+            ],
+            "neighborhoods": [
+                {"name": name, "count": count}
+                for name, count in sorted(neighborhood_counts.items(), key=lambda item: item[0].lower())
+            ],
+        }
+
+    @api.model
+    def _invalidate_for_events(self, events):
+        """Descarta, num único DELETE, as linhas cujas contagens os eventos podem alterar.
+
+        Chamado com o estado do evento antes e depois da escrita. Cada faceta é
+        contada sem o filtro da própria dimensão: a linha fica velha quando o
+        evento falha em no máximo um dos seus filtros. Evento sem empresa afeta
+        todas as empresas.
+        """
+        if not events:
+            return
+        states = {
+            (
+                event.company_id.id or None,
+                event.promo_category_id.id or 0,
+                event.venue_partner_id.id or 0,
+                event.neighborhood or "",
+                event.ticket_kind or "",
+                bool(event.is_featured),
+            )
+            for event in events
+        }
+        values = SQL(", ").join(
+            SQL("(%s::int, %s::int, %s::int, %s::varchar, %s::varchar, %s::bool)", *state) for state in states
+        )
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                DELETE FROM bhz_event_agenda_facet f
+                 USING (VALUES %s) AS e(company_id, category_id, venue_id, neighborhood, ticket_kind, featured)
+                 WHERE (e.company_id IS NULL OR f.company_id = e.company_id)
+                   AND CASE WHEN COALESCE(f.filter_category, 0) NOT IN (0, e.category_id) THEN 1 ELSE 0 END
+                     + CASE WHEN COALESCE(f.filter_venue, 0) NOT IN (0, e.venue_id) THEN 1 ELSE 0 END
+                     + CASE WHEN strpos(lower(e.neighborhood), lower(COALESCE(f.filter_neighborhood, ''))) = 0
+                            THEN 1 ELSE 0 END
+                     + CASE WHEN f.filter_price IN ('free', 'paid') AND f.filter_price != e.ticket_kind
+                            THEN 1 ELSE 0 END
+                     + CASE WHEN f.filter_featured AND NOT e.featured THEN 1 ELSE 0 END <= 1
+                """,
+                values,
+            )
+        )
+        if self.env.cr.rowcount:
+            _logger.debug("Agenda facets invalidated: %s linhas (eventos %s)", self.env.cr.rowcount, events.ids[:20])
+            self.invalidate_model()
+
+    @api.model
+    def _gc_expired(self):
+        """Remove linhas vencidas (combinações de filtros que ninguém mais visitou)."""
+        self.search([("computed_at", "<", fields.Datetime.now() - FACET_TTL)]).unlink()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import _, api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class BhzEventApiJob(models.Model):
+    """Job de ingestão assíncrona da API (``/api/events/bulk_upsert`` com ``async``).
+
+    O endpoint só grava o payload e devolve o id do job; o cron processa os
+    itens em lotes com ``bhz_api_bulk_upsert_events`` e o parceiro acompanha em
+    ``/api/events/jobs/<id>``. Assim um lote grande não depende do timeout do
+    proxy nem do worker HTTP.
+
+    Itens e resultados ficam em ``bhz.event.api.job.chunk`` (um registro por
+    lote): cada execução lê e grava só os lotes que processa, em vez de
+    regravar o JSON inteiro do job.
+    """
+
+    _name = "bhz.event.api.job"
+    _description = "Job de ingestão da API de eventos"
+    _order = "create_date desc"
+
+    name = fields.Char(default=lambda self: _("Ingestão API"), required=True)
+    state = fields.Selection(
+        [
+            ("pending", "Pendente"),
+            ("running", "Executando"),
+            ("done", "Concluído"),
+            ("failed", "Falhou"),
+        ],
+        default="pending",
+        required=True,
+        index=True,
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        string="Empresa",
+        index=True,
+        default=lambda self: self.env.company,
+    )
+
+    chunk_ids = fields.One2many("bhz.event.api.job.chunk", "job_id", string="Lotes")
+    total_count = fields.Integer(string="Total de itens", default=0)
+    processed_count = fields.Integer(string="Processados", default=0)
+    created_count = fields.Integer(string="Criados", default=0)
+    updated_count = fields.Integer(string="Atualizados", default=0)
+    error_count = fields.Integer(string="Erros", default=0)
+
+    chunk_size = fields.Integer(string="Itens por lote", default=200)
+    chunks_per_cron = fields.Integer(string="Lotes por execução", default=5)
+    last_run = fields.Datetime(string="Última execução")
+    log = fields.Text(string="Log")
+
+    # ---------------------------------------------------------------------
+    # Enfileiramento / consulta (API)
+    # ---------------------------------------------------------------------
+    @api.model
+    def _enqueue(self, events):
+        job = self.create({"total_count": len(events)})
+        job._split_payload(events)
+        cron = self.env.ref("bhz_event_promo.ir_cron_bhz_event_api_jobs", raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        _logger.info("API bulk upsert assíncrono: job %s com %s itens", job.id, len(events))
+        return job
+
+    def _split_payload(self, events):
+        """Cria os lotes pendentes do job a partir dos itens recebidos."""
+        self.ensure_one()
+        size = max(1, int(self.chunk_size or 1))
+        self.env["bhz.event.api.job.chunk"].create(
+            [
+                {
+                    "job_id": self.id,
+                    "sequence": index,
+                    "item_count": len(events[index:index + size]),
+                    "payload": events[index:index + size],
+                }
+                for index in range(0, len(events), size)
+            ]
+        )
+
+    def _get_status(self, offset=0, limit=None):
+        """Resumo do job para ``/api/events/jobs/<id>``; ``results`` pode ser paginado."""
+        self.ensure_one()
+        end = offset + limit if limit else None
+        results = []
+        Chunk = self.env["bhz.event.api.job.chunk"]
+        domain = [("job_id", "=", self.id), ("state", "=", "done")]
+        if end is not None:
+            domain.append(("sequence", "<", end))
+        # Só as colunas de posição primeiro: os resultados lidos são apenas os da página.
+        wanted = [
+            row["id"]
+            for row in Chunk.search_read(domain, ["sequence", "item_count"], order="sequence")
+            if row["sequence"] + row["item_count"] > offset
+        ]
+        for chunk in Chunk.browse(wanted):
+            start = max(0, offset - chunk.sequence)
+            stop = end - chunk.sequence if end is not None else None
+            results.extend((chunk.results or [])[start:stop])
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "total": self.total_count,
+            "processed": self.processed_count,
+            "created": self.created_count,
+            "updated": self.updated_count,
+            "errors": self.error_count,
+            "progress": round(100.0 * self.processed_count / self.total_count, 1) if self.total_count else 100.0,
+            "results": results,
+            "results_offset": offset,
+            "results_total": self.processed_count,
+        }
+
+    # ---------------------------------------------------------------------
+    # Cron entrypoint
+    # ---------------------------------------------------------------------
+    @api.model
+    def _cron_run_pending_jobs(self, limit=3):
+        jobs = self.search([("state", "in", ("pending", "running"))], order="create_date asc, id asc", limit=limit)
+        for job in jobs:
+            try:
+                # Savepoint: um erro de banco não deixa a transação abortada para marcar o job.
+                with self.env.cr.savepoint():
+                    job.with_company(job.company_id)._run_batch()
+            except Exception as err:
+                _logger.exception("[API Job] job %s falhou: %s", job.id, err)
+                job.invalidate_recordset()
+                job._append_log(f"ERRO FATAL: {err}")
+                job.state = "failed"
+        remaining = self.search_count([("state", "in", ("pending", "running"))])
+        if remaining:
+            self.env.ref("bhz_event_promo.ir_cron_bhz_event_api_jobs")._trigger()
+
+    # ---------------------------------------------------------------------
+    # Core runner
+    # ---------------------------------------------------------------------
+    def _run_batch(self):
+        self.ensure_one()
+        if self.state in ("done", "failed"):
+            return
+        self = self.with_company(self.company_id)
+        self.state = "running"
+        self.last_run = fields.Datetime.now()
+
+        Chunk = self.env["bhz.event.api.job.chunk"]
+        chunks = Chunk.search(
+            [("job_id", "=", self.id), ("state", "=", "pending")],
+            order="sequence",
+            limit=max(1, int(self.chunks_per_cron or 1)),
+        )
+        Event = self.env["event.event"].sudo()
+        counts = {"created": 0, "updated": 0, "error": 0}
+        processed = 0
+        for chunk in chunks:
+            chunk_results = Event.bhz_api_bulk_upsert_events(chunk.payload or [])
+            for result in chunk_results:
+                key = result.get("action") if result["status"] == "ok" else "error"
+                counts[key] = counts.get(key, 0) + 1
+            chunk.write({"results": chunk_results, "payload": False, "state": "done"})
+            processed += len(chunk_results)
+
+        vals = {
+            "processed_count": self.processed_count + processed,
+            "created_count": self.created_count + counts["created"],
+            "updated_count": self.updated_count + counts["updated"],
+            "error_count": self.error_count + counts["error"],
+        }
+        if not Chunk.search_count([("job_id", "=", self.id), ("state", "=", "pending")], limit=1):
+            vals["state"] = "done"
+        self.write(vals)
+        self._append_log(
+            f"{processed} itens: {counts['created']} criados, {counts['updated']} atualizados, {counts['error']} erros"
+        )
+
+    # ---------------------------------------------------------------------
+    # Logging
+    # ---------------------------------------------------------------------
+    def _append_log(self, line):
+        self.ensure_one()
+        prefix = fields.Datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_line = f"[{prefix}] {line}"
+        self.log = (self.log or "") + ("\n" if self.log else "") + new_line
+
+
+class BhzEventApiJobChunk(models.Model):
+    """Lote de itens de um job de ingestão, com os resultados depois de processado."""
+
+    _name = "bhz.event.api.job.chunk"
+    _description = "Lote de job de ingestão da API de eventos"
+    _order = "job_id, sequence"
+
+    job_id = fields.Many2one("bhz.event.api.job", string="Job", required=True, ondelete="cascade", index=True)
+    sequence = fields.Integer(string="Posição do primeiro item", required=True)
+    item_count = fields.Integer(string="Itens")
+    payload = fields.Json(string="Itens", copy=False)
+    results = fields.Json(string="Resultados", copy=False)
+    state = fields.Selection(
+        [("pending", "Pendente"), ("done", "Processado")],
+        default="pending",
+        required=True,
+        index=True,
+    )
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 import logging
 import base64
+import hashlib
 import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
 
@@ -9,12 +15,61 @@ import pytz
 import requests
 from odoo import api, fields, models
 from odoo.http import request
+from odoo.tools import SQL, escape_psql
 
 _logger = logging.getLogger(__name__)
 
+# Campos padrão de imagem servidos a partir de promo_cover_image quando vazios (sem cópia gravada).
+LAZY_COVER_FIELDS = ("image_1920", "image_1024", "image_512", "image_256", "image_128", "cover_image")
+# Downloads simultâneos de imagem no bulk_upsert da API.
+API_IMAGE_DOWNLOAD_WORKERS = 8
+# Eventos gravados por vez no bulk; as imagens de cada lote só são baixadas na hora de gravá-lo.
+API_BULK_CHUNK_SIZE = 100
+# Cache de página do detalhe do evento para anônimos (por worker):
+# {(dbname, event_id, website_id, lang): (expira_em, etag, html)}
+_EVENT_PAGE_CACHE = OrderedDict()
+_EVENT_PAGE_LOCK = threading.Lock()
+EVENT_PAGE_CACHE_SIZE = 512
+# Marcador gravado no lugar do token CSRF do primeiro visitante.
+EVENT_PAGE_CSRF_PLACEHOLDER = "__bhz_csrf_token__"
+# Campos de imagem aceitos como capa pública (nem todos existem em todas as instalações).
+PUBLIC_IMAGE_FIELDS = ("promo_cover_image", "image_1920", "image_1024", "image_512")
+
+# Campos que entram no domínio/filtros da agenda; alterá-los invalida as facetas em cache.
+AGENDA_FACET_FIELDS = {
+    "active",
+    "company_id",
+    "date_begin",
+    "date_end",
+    "is_featured",
+    "is_published",
+    "name",
+    "neighborhood",
+    "promo_category_id",
+    "promo_short_description",
+    "show_on_public_agenda",
+    "stage_id",
+    "state",
+    "ticket_kind",
+    "venue_partner_id",
+    "website_id",
+    "website_published",
+}
+
+
+def normalize_search_text(*parts):
+    """Texto de busca sem acentos e em minúsculas ("São João" -> "sao joao")."""
+    text = " ".join(part for part in parts if part)
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
 
 class EventEvent(models.Model):
-    _inherit = "event.event"
+    _inherit = ["event.event", "bhz.website.visit.mixin", "bhz.image.derivative.mixin"]
+    _bhz_visit_count_field = "bhz_website_visit_count"
+    # Cards da agenda/snippet (~400px) e carrossel de destaques (largura total).
+    _bhz_image_derivative_fields = {"promo_cover_image": (480, 800, 1200)}
 
     is_third_party = fields.Boolean(string="Evento de terceiro", default=False)
     third_party_name = fields.Char(string="Organizador / Fonte (texto livre)")
@@ -107,6 +162,20 @@ class EventEvent(models.Model):
         default=0,
         help="Usado para ordenar os eventos mais acessados nos blocos do site.",
     )
+    has_public_image = fields.Boolean(
+        string="Tem imagem pública",
+        compute="_compute_has_public_image",
+        store=True,
+        index=True,
+        help="Marcado quando o evento tem capa de divulgação ou imagem padrão. Usado nos blocos do site.",
+    )
+    bhz_search_text = fields.Char(
+        string="Texto de busca (Agenda)",
+        compute="_compute_bhz_search_text",
+        store=True,
+        index="trigram",
+        help="Nome, chamada curta, local e bairro sem acentos. Usado na busca da agenda pública.",
+    )
     external_source = fields.Char(string="Fonte externa", index=True)
     external_id = fields.Char(string="ID externo", index=True)
     external_url = fields.Char(string="URL do evento externo")
@@ -117,6 +186,26 @@ class EventEvent(models.Model):
         "UNIQUE(external_source, external_id, company_id)",
         "A combinação de Fonte externa, ID externo e Empresa deve ser única.",
     )
+    # Busca da agenda: full-text em português sobre o texto já sem acentos.
+    _bhz_search_text_fts_idx = models.Index(
+        "USING gin (to_tsvector('portuguese', COALESCE(bhz_search_text, '')))"
+    )
+    # Índices parciais da agenda pública: só cobrem eventos com show_on_public_agenda,
+    # então o histórico despublicado não pesa nas páginas/blocos do site.
+    # Agenda: "date_end IS NULL OR date_end >= agora", ordenada por date_begin.
+    _bhz_public_upcoming_idx = models.Index("(date_end, date_begin) WHERE show_on_public_agenda")
+    # Blocos de anunciados (com imagem), ordenados por date_begin.
+    _bhz_public_image_begin_idx = models.Index(
+        "(date_begin) WHERE show_on_public_agenda AND has_public_image"
+    )
+    # Carrossel de destaques.
+    _bhz_public_featured_idx = models.Index(
+        "(date_end, date_begin) WHERE show_on_public_agenda AND is_featured AND has_public_image"
+    )
+    # Filtro por categoria (bloco de anunciados e /agenda/c/<categoria>).
+    _bhz_public_category_idx = models.Index(
+        "(promo_category_id, date_begin) WHERE show_on_public_agenda"
+    )
     auto_remove_after_event = fields.Selection(
         [
             ("none", "Não fazer nada"),
@@ -137,58 +226,22 @@ class EventEvent(models.Model):
                 # raise ValidationError("Informe o Link externo quando o modo for 'Redirecionar'.")
                 pass
 
-    def init(self):
-        super().init()
-        self._migrate_promo_description_html()
-        self._migrate_registration_mode_values()
-
-    def _existing_columns(self):
-        self.env.cr.execute(
-            """
-            SELECT column_name
-              FROM information_schema.columns
-             WHERE table_name = 'event_event'
-               AND table_schema = current_schema()
-            """
-        )
-        return {row[0] for row in self.env.cr.fetchall()}
-
-    def _migrate_promo_description_html(self):
-        columns = self._existing_columns()
-        target_col = "promo_description_html"
-        if target_col not in columns:
-            return
-
-        for source in (
-            "public_description_html",
-            "promo_html_description",
-            "third_party_description_html",
-            "third_party_description",
-            "organizer_description",
-        ):
-            if source not in columns:
-                continue
-            self.env.cr.execute(
-                f"""
-                UPDATE event_event
-                   SET {target_col} = {source}
-                 WHERE ({target_col} IS NULL OR {target_col} = '')
-                   AND {source} IS NOT NULL
-                   AND {source} != ''
-                """
-            )
+    @api.depends(lambda self: [fname for fname in PUBLIC_IMAGE_FIELDS if fname in self._fields])
+    def _compute_has_public_image(self):
+        image_fields = [fname for fname in PUBLIC_IMAGE_FIELDS if fname in self._fields]
+        # bin_size: só precisamos saber se existe, sem carregar o conteúdo do anexo.
+        for event in self.with_context(bin_size=True):
+            event.has_public_image = any(event[fname] for fname in image_fields)
 
-    def _migrate_registration_mode_values(self):
-        columns = self._existing_columns()
-        if "registration_mode" not in columns:
-            return
-        self.env.cr.execute(
-            """
-            UPDATE event_event
-               SET registration_mode = 'disclosure_only'
-             WHERE registration_mode IN ('promo', 'none')
-            """
-        )
+    @api.depends("name", "promo_short_description", "venue_partner_id.name", "neighborhood")
+    def _compute_bhz_search_text(self):
+        for event in self:
+            event.bhz_search_text = normalize_search_text(
+                event.name,
+                event.promo_short_description,
+                event.venue_partner_id.name,
+                event.neighborhood,
+            ) or False
 
     def _prepare_public_events_domain(
         self,
@@ -203,28 +256,7 @@ class EventEvent(models.Model):
             domain.append(("is_featured", "=", True))
 
         if require_image:
-            # Build a resilient OR domain with the image fields that actually exist on event.event
-            image_candidates = [
-                fname
-                for fname in [
-                    "promo_cover_image",
-                    "image_1920",
-                    "image_1024",
-                    "image_512",
-                ]
-                if fname in self._fields
-            ]
-            if image_candidates:
-                if len(image_candidates) == 1:
-                    domain.append((image_candidates[0], "!=", False))
-                else:
-                    # Build nested OR: (field1 != False) OR (field2 != False) OR ...
-                    or_domain = []
-                    for idx, field_name in enumerate(image_candidates):
-                        if idx:
-                            or_domain.append("|")
-                        or_domain.append((field_name, "!=", False))
-                    domain += or_domain
+            domain.append(("has_public_image", "=", True))
 
         if category_ids and "promo_category_id" in self._fields:
             category_ids = [int(cid) for cid in category_ids if cid]
@@ -272,6 +304,47 @@ class EventEvent(models.Model):
 
         return domain
 
+    def _bhz_apply_search_term(self, query, term):
+        """Restringe ``query`` à busca textual da agenda, ignorando acentos.
+
+        Casa por full-text (português, com stemming) ou por trecho (trigram),
+        os dois atendidos pelos índices GIN de ``bhz_search_text``. Devolve a
+        expressão de relevância, ou None quando não há termo.
+        """
+        needle = normalize_search_text(term)
+        if not needle:
+            return None
+        column = SQL.identifier(self._table, "bhz_search_text")
+        document = SQL("to_tsvector('portuguese', COALESCE(%s, ''))", column)
+        ts_query = SQL("plainto_tsquery('portuguese', %s)", needle)
+        query.add_where(
+            SQL("(%s @@ %s OR %s ILIKE %s)", document, ts_query, column, f"%{escape_psql(needle)}%")
+        )
+        return SQL("ts_rank(%s, %s)", document, ts_query)
+
+    @api.model
+    def _bhz_search_public_events(self, domain, term, order="date_begin asc"):
+        """Busca da agenda ordenada por relevância (quando há termo) e depois por ``order``."""
+        query = self._search(domain, order=order)
+        rank = self._bhz_apply_search_term(query, term)
+        if rank is not None:
+            query.order = SQL("%s DESC, %s", rank, query.order)
+        return self.browse(query)
+
+    @api.model
+    def _bhz_count_public_events_by(self, domain, term, field_name):
+        """Contagem agrupada por ``field_name`` (facetas da agenda), com a busca textual aplicada."""
+        query = self._search(domain)
+        self._bhz_apply_search_term(query, term)
+        column = SQL.identifier(self._table, field_name)
+        self.env.cr.execute(
+            SQL(
+                "SELECT dim, COUNT(*) FROM (%s) AS sub WHERE dim IS NOT NULL GROUP BY dim",
+                query.select(SQL("%s AS dim", column)),
+            )
+        )
+        return self.env.cr.fetchall()
+
     @api.model
     def guiabh_get_featured_events(self, limit=12, order="write_date desc, date_begin asc, id desc"):
         """Featured events for website snippets.
@@ -293,47 +366,66 @@ class EventEvent(models.Model):
     def _get_announced_events_order(self, order_mode):
         allowed = (order_mode or "recent").lower()
         if allowed == "popular":
-            return "bhz_website_visit_count desc, date_begin asc, id desc"
+            return "bhz_popularity_score desc, bhz_website_visit_count desc, date_begin asc, id desc"
         return "date_begin asc, id desc"
 
     @api.model
-    def cron_auto_cleanup_events(self):
-        now_utc = fields.Datetime.now()
+    def cron_auto_cleanup_events(self, batch_size=1000):
+        """Aplica a ação pós-evento (despublicar/excluir) aos eventos que já terminaram.
+
+        Só considera eventos ainda na agenda pública: quem já foi despublicado sai
+        do conjunto (e do índice parcial), então o custo acompanha o que venceu
+        desde a última execução, e não o histórico inteiro.
+        """
+        now = fields.Datetime.now()
         domain = [
+            ("show_on_public_agenda", "=", True),
+            ("auto_remove_after_event", "!=", "none"),
             "|",
-            "&",
-            ("date_end", "!=", False),
-            ("date_end", "<", now_utc),
+            ("date_end", "<", now),
             "&",
             ("date_end", "=", False),
-            ("date_begin", "<", now_utc),
+            ("date_begin", "<", now),
         ]
-        events = self.search(domain)
-        processed = 0
-        tz_name = self.env.user.tz or "UTC"
-        tz_env = self.with_context(tz=tz_name)
-        now_local = fields.Datetime.context_timestamp(tz_env, now_utc)
-        for event in events.sudo():
-            deadline = event.date_end or event.date_begin
-            if not deadline:
-                continue
-            deadline_local = fields.Datetime.context_timestamp(tz_env, deadline)
-            if deadline_local and now_local and deadline_local > now_local:
-                continue
-            vals = {}
-            if event.show_on_public_agenda:
-                vals["show_on_public_agenda"] = False
-            if "is_published" in event._fields and event.is_published:
-                vals["is_published"] = False
-            elif "website_published" in event._fields and event.website_published:
-                vals["website_published"] = False
-            if "active" in event._fields and event.active:
-                vals["active"] = False
-            if not vals:
-                continue
-            event.write(vals)
-            processed += 1
-        _logger.info("BHZ Event Promo cleanup executed: %s candidates, %s updated", len(events), processed)
+        Event = self.sudo()
+        unpublish_vals = self._prepare_cleanup_unpublish_vals()
+        unpublished = deleted = 0
+        while True:
+            events = Event.search(domain, limit=batch_size, order="id")
+            if not events:
+                break
+            to_delete = events.filtered(lambda ev: ev.auto_remove_after_event == "delete")
+            to_unpublish = events - to_delete
+            if to_delete:
+                try:
+                    with self.env.cr.savepoint():
+                        to_delete.unlink()
+                    deleted += len(to_delete)
+                except Exception as err:
+                    _logger.warning(
+                        "BHZ Event Promo cleanup: falha ao excluir %s eventos, despublicando (%s)",
+                        len(to_delete),
+                        err,
+                    )
+                    to_unpublish |= to_delete
+            if to_unpublish:
+                to_unpublish.write(unpublish_vals)
+                unpublished += len(to_unpublish)
+            if len(events) < batch_size:
+                break
+        _logger.info("BHZ Event Promo cleanup executed: %s unpublished, %s deleted", unpublished, deleted)
+        self.env["bhz.event.agenda.facet"].sudo()._gc_expired()
+        Event._gc_duplicated_cover_images()
+
+    def _prepare_cleanup_unpublish_vals(self):
+        vals = {"show_on_public_agenda": False}
+        if "is_published" in self._fields:
+            vals["is_published"] = False
+        elif "website_published" in self._fields:
+            vals["website_published"] = False
+        if "active" in self._fields:
+            vals["active"] = False
+        return vals
 
     # ------------------------------------------------------------------ Publish
     def _prepare_announced_publication_vals(self):
@@ -386,6 +478,10 @@ class EventEvent(models.Model):
                 return True
         return False
 
+    def _get_announced_stage_ids(self, stages):
+        """Ids dos estágios de ``stages`` que publicam o evento (uma checagem por estágio distinto)."""
+        return {stage.id for stage in stages if self._is_announced_stage(stage)}
+
     def _publish_announced_events(self, events):
         if not events:
             return
@@ -406,19 +502,91 @@ class EventEvent(models.Model):
             events.ids,
         )
 
+    # ------------------------------------------------------------- Agenda facets
+    def _bhz_agenda_facet_scope(self, vals):
+        """Eventos cuja alteração muda as facetas da agenda pública."""
+        if not set(vals) & AGENDA_FACET_FIELDS:
+            return self.browse()
+        if vals.get("show_on_public_agenda"):
+            return self
+        return self.filtered("show_on_public_agenda")
+
+    def _bhz_invalidate_agenda_facets(self):
+        if not self:
+            return
+        self.env["bhz.event.agenda.facet"].sudo()._invalidate_for_events(self)
+
+    # ---------------------------------------------------------- Cache de página
+    @api.model
+    def _bhz_page_cache_ttl(self):
+        """TTL do cache da página de detalhe; 0 (padrão) desliga o cache."""
+        value = self.env["ir.config_parameter"].sudo().get_param("bhz_event_promo.event_page_cache_ttl", 0)
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            return 0
+
+    def _bhz_page_cache_etag(self, website_id, lang):
+        """ETag da página: muda quando o evento, o local, a categoria ou templates/menus são alterados."""
+        self.ensure_one()
+        templates_seq = getattr(self.env.registry, "cache_sequences", {}).get("templates")
+        raw = "%s|%s|%s|%s|%s|%s|%s" % (
+            self.id,
+            self.write_date,
+            self.venue_partner_id.sudo().write_date,
+            self.promo_category_id.sudo().write_date,
+            website_id,
+            lang,
+            templates_seq,
+        )
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _bhz_page_cache_get(self, website_id, lang, etag):
+        self.ensure_one()
+        key = (self.env.cr.dbname, self.id, website_id, lang)
+        with _EVENT_PAGE_LOCK:
+            cached = _EVENT_PAGE_CACHE.get(key)
+            if not cached or cached[0] <= time.monotonic() or cached[1] != etag:
+                return None
+            _EVENT_PAGE_CACHE.move_to_end(key)
+            return cached[2]
+
+    def _bhz_page_cache_set(self, website_id, lang, etag, html, ttl):
+        self.ensure_one()
+        key = (self.env.cr.dbname, self.id, website_id, lang)
+        with _EVENT_PAGE_LOCK:
+            _EVENT_PAGE_CACHE[key] = (time.monotonic() + ttl, etag, html)
+            _EVENT_PAGE_CACHE.move_to_end(key)
+            while len(_EVENT_PAGE_CACHE) > EVENT_PAGE_CACHE_SIZE:
+                _EVENT_PAGE_CACHE.popitem(last=False)
+
+    def _bhz_page_cache_invalidate(self):
+        """Descarta as páginas em cache destes eventos neste worker.
+
+        Os outros workers percebem a mudança pelo ``write_date`` no ETag (ou,
+        no pior caso de duas escritas no mesmo segundo, pelo TTL).
+        """
+        if not self.ids or not _EVENT_PAGE_CACHE:
+            return
+        dbname = self.env.cr.dbname
+        ids = set(self.ids)
+        with _EVENT_PAGE_LOCK:
+            for key in [key for key in _EVENT_PAGE_CACHE if key[0] == dbname and key[1] in ids]:
+                del _EVENT_PAGE_CACHE[key]
+
     @api.model_create_multi
     def create(self, vals_list):
-        stage_model = self.env["event.stage"]
+        stage_ids = {vals["stage_id"] for vals in vals_list if vals.get("stage_id")}
+        announced_stage_ids = self._get_announced_stage_ids(self.env["event.stage"].browse(stage_ids))
+        publication_vals = self._prepare_announced_publication_vals()
         for vals in vals_list:
-            self._sync_cover_images(vals)
-            stage_id = vals.get("stage_id")
-            if stage_id:
-                stage = stage_model.browse(stage_id)
-                if self._is_announced_stage(stage):
-                    vals.update(self._prepare_announced_publication_vals())
+            if vals.get("stage_id") in announced_stage_ids:
+                vals.update(publication_vals)
         records = super().create(vals_list)
-        records._propagate_promo_to_standard()
-        announced_records = records.filtered(lambda ev: self._is_announced_stage(ev.stage_id))
+        # Estágio padrão (sem stage_id nos vals) também conta.
+        default_stages = records.stage_id - self.env["event.stage"].browse(stage_ids)
+        announced_stage_ids |= self._get_announced_stage_ids(default_stages)
+        announced_records = records.filtered(lambda ev: ev.stage_id.id in announced_stage_ids)
         if announced_records:
             self._log_announced_publication(announced_records, source="create")
         non_compliant = announced_records.filtered(
@@ -428,15 +596,21 @@ class EventEvent(models.Model):
         )
         if non_compliant:
             self._publish_announced_events(non_compliant)
+        records.filtered("show_on_public_agenda")._bhz_invalidate_agenda_facets()
         return records
 
     def write(self, vals):
+        # Mesma transação: o cache só some de fato quando a escrita for confirmada.
+        # Estado anterior aqui; o novo estado é invalidado depois do write.
+        facet_scope = self._bhz_agenda_facet_scope(vals)
+        facet_scope._bhz_invalidate_agenda_facets()
+        self._bhz_page_cache_invalidate()
         if self.env.context.get("_bhz_skip_announced_auto_publish"):
-            return super().write(vals)
+            result = super().write(vals)
+            facet_scope._bhz_invalidate_agenda_facets()
+            return result
 
         vals_to_write = dict(vals)
-        if not self.env.context.get("_bhz_skip_promo_sync"):
-            self._sync_cover_images(vals_to_write)
         publish_stage = False
         if "stage_id" in vals_to_write and vals_to_write.get("stage_id"):
             stage = self.env["event.stage"].browse(vals_to_write["stage_id"])
@@ -444,12 +618,16 @@ class EventEvent(models.Model):
                 vals_to_write.update(self._prepare_announced_publication_vals())
                 publish_stage = stage
         result = super().write(vals_to_write)
-        if not self.env.context.get("_bhz_skip_promo_sync"):
-            self._propagate_promo_to_standard()
+        facet_scope._bhz_invalidate_agenda_facets()
         if publish_stage:
             self._log_announced_publication(self, stage=publish_stage, source="write")
         return result
 
+    def unlink(self):
+        self.filtered("show_on_public_agenda")._bhz_invalidate_agenda_facets()
+        self._bhz_page_cache_invalidate()
+        return super().unlink()
+
     # ---------------------------------------------------------- Registration URL
     def _normalize_external_url(self, url):
         if not url:
@@ -465,28 +643,54 @@ class EventEvent(models.Model):
         self.ensure_one()
         return self._normalize_external_url(self.registration_external_url)
 
-    def _sync_cover_images(self, vals):
-        """Copy promo cover image into standard fields for generic snippets."""
-        promo = vals.get("promo_cover_image")
-        if not promo:
-            return
-        for field_name in ("image_1920", "cover_image"):
-            if field_name in self._fields and field_name not in vals:
-                vals[field_name] = promo
+    # -------------------------------------------------------------- Cover image
+    def _bhz_lazy_cover_source(self, field_name):
+        """Campo que serve ``field_name`` quando ele está vazio (ver ``ir.binary``).
 
-    def _propagate_promo_to_standard(self):
-        """Ensure existing records without image get promo cover pushed to defaults."""
-        if not self:
+        A capa de divulgação não é mais copiada para ``image_1920``/``cover_image``:
+        os snippets genéricos pedem ``/web/image/event.event/<id>/image_*`` e
+        recebem a ``promo_cover_image`` redimensionada na hora.
+        """
+        self.ensure_one()
+        if field_name not in LAZY_COVER_FIELDS or field_name not in self._fields:
+            return False
+        record = self.sudo().with_context(bin_size=True)
+        if record[field_name] or not record.promo_cover_image:
+            return False
+        return "promo_cover_image"
+
+    @api.model
+    def _gc_duplicated_cover_images(self, batch_size=1000):
+        """Apaga cópias antigas da capa (mesmo checksum) gravadas em image_1920/cover_image."""
+        targets = tuple(name for name in ("image_1920", "cover_image") if name in self._fields)
+        if not targets:
             return
-        for record in self:
-            if not record.promo_cover_image:
-                continue
-            updates = {}
-            for field_name in ("image_1920", "cover_image"):
-                if field_name in record._fields and not getattr(record, field_name):
-                    updates[field_name] = record.promo_cover_image
-            if updates:
-                record.with_context(_bhz_skip_promo_sync=True).write(updates)
+        self.env.cr.execute(
+            """
+            SELECT dup.res_id, array_agg(dup.res_field)
+              FROM ir_attachment dup
+              JOIN ir_attachment promo
+                ON promo.res_model = dup.res_model
+               AND promo.res_id = dup.res_id
+               AND promo.res_field = 'promo_cover_image'
+               AND promo.checksum = dup.checksum
+             WHERE dup.res_model = %s
+               AND dup.res_field IN %s
+             GROUP BY dup.res_id
+             LIMIT %s
+            """,
+            (self._name, targets, batch_size),
+        )
+        groups = defaultdict(list)
+        for res_id, field_names in self.env.cr.fetchall():
+            groups[tuple(sorted(field_names))].append(res_id)
+        for field_names, event_ids in groups.items():
+            self.browse(event_ids).with_context(active_test=False).write(dict.fromkeys(field_names, False))
+        if groups:
+            _logger.info(
+                "BHZ Event Promo: cópias da capa removidas de %s eventos",
+                sum(len(ids) for ids in groups.values()),
+            )
 
     # ---------------------------------------------------------- Datetime helper
     def _get_display_timezone(self):
@@ -508,6 +712,95 @@ class EventEvent(models.Model):
         localized = self._localize_datetime(dt)
         return localized.strftime(fmt) if localized else ""
 
+    # ------------------------------------------------------------ Public feed
+    @api.model
+    def _bhz_sql_text(self, model_name, alias, field_name):
+        """Coluna de texto no idioma atual (campos traduzíveis são JSONB)."""
+        column = SQL.identifier(alias, field_name)
+        if not self.env[model_name]._fields[field_name].translate:
+            return column
+        return SQL("COALESCE(%s->>%s, %s->>'en_US')", column, self.env.lang or "en_US", column)
+
+    @api.model
+    def _bhz_sitemap_rows(self):
+        """``(id, nome, write_date)`` dos eventos públicos, em blocos por id (sitemap)."""
+        table = self._table
+        return self.env["bhz.sitemap"]._bhz_iter_rows(
+            "event.event",
+            self._prepare_public_events_domain(),
+            [self._bhz_sql_text("event.event", table, "name"), SQL.identifier(table, "write_date")],
+        )
+
+    @api.model
+    def _bhz_sitemap_category_lastmod(self):
+        """``{categoria_id: último write_date}`` das categorias com eventos públicos."""
+        domain = self._prepare_public_events_domain() + [("promo_category_id", "!=", False)]
+        query = self.sudo()._search(domain)
+        category_column = SQL.identifier(self._table, "promo_category_id")
+        query.order = None
+        query.groupby = category_column
+        self.env.cr.execute(
+            query.select(category_column, SQL("MAX(%s)", SQL.identifier(self._table, "write_date")))
+        )
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _bhz_public_feed_sql(
+        self, public_domain, scope_domain, updated_since=None, after=None, limit=None, public_only=False
+    ):
+        """``(linhas, resumo)``: SQL enxuto do feed público e do seu resumo (ETag).
+
+        Ordena por ``(write_date, id)`` para paginar por cursor. Em modo delta
+        (``updated_since``/``after``) percorre tudo o que mudou no escopo e marca
+        com ``is_public = false`` quem saiu da agenda, para o consumidor remover;
+        ``public_only`` usa o cursor só para paginar, sem as remoções (ICS).
+        """
+        table = self._table
+        public_query = self.sudo()._search(public_domain)
+        delta = bool(updated_since or after) and not public_only
+        if delta:
+            query = self.sudo().with_context(active_test=False)._search(
+                scope_domain, order="write_date asc, id asc", limit=limit
+            )
+            is_public = SQL("%s IN %s", SQL.identifier(table, "id"), public_query.subselect())
+        else:
+            query = self.sudo()._search(public_domain, order="write_date asc, id asc", limit=limit)
+            is_public = SQL("TRUE")
+        if updated_since:
+            query.add_where(SQL("%s > %s", SQL.identifier(table, "write_date"), updated_since))
+        if after:
+            query.add_where(
+                SQL("(%s, %s) > (%s, %s)", SQL.identifier(table, "write_date"), SQL.identifier(table, "id"), *after)
+            )
+
+        def column(field_name):
+            return SQL("%s AS %s", SQL.identifier(table, field_name), SQL.identifier(field_name))
+
+        rows = query.select(
+            column("id"),
+            column("write_date"),
+            SQL("%s AS is_public", is_public),
+            SQL("%s AS name", self._bhz_sql_text(self._name, table, "name")),
+            column("date_begin"),
+            column("date_end"),
+            column("promo_short_description"),
+            column("neighborhood"),
+            column("registration_external_url"),
+            column("has_public_image"),
+            column("promo_category_id"),
+            SQL(
+                "(SELECT %s FROM event_type t WHERE t.id = %s) AS category_name",
+                self._bhz_sql_text("event.type", "t", "name"),
+                SQL.identifier(table, "promo_category_id"),
+            ),
+            SQL(
+                "(SELECT p.name FROM res_partner p WHERE p.id = %s) AS venue_name",
+                SQL.identifier(table, "venue_partner_id"),
+            ),
+        )
+        summary = SQL("SELECT COUNT(*), MAX(f.write_date), COALESCE(SUM(f.id), 0) FROM (%s) f", rows)
+        return rows, summary
+
     # ---------------------------------------------------------- API helpers
     @api.model
     def _api_parse_datetime(self, value, tz_name="UTC"):
@@ -547,7 +840,19 @@ class EventEvent(models.Model):
             return False
 
     @api.model
-    def _api_extract_image(self, payload):
+    def _api_download_images(self, urls):
+        """Baixa várias imagens em paralelo; retorna ``{url: base64 | False}``."""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+        workers = min(API_IMAGE_DOWNLOAD_WORKERS, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # _api_download_image só usa requests; não toca no env/cursor fora da thread principal.
+            return dict(zip(urls, executor.map(self._api_download_image, urls)))
+
+    @api.model
+    def _api_extract_image(self, payload, downloaded=None):
+        """Imagem do payload; ``downloaded`` traz as URLs já baixadas (bulk)."""
         image_b64 = payload.get("image_base64") or False
         if image_b64:
             try:
@@ -557,7 +862,10 @@ class EventEvent(models.Model):
                 raise ValueError("image_base64 inválida")
         image_url = payload.get("image_url")
         if image_url:
-            downloaded = self._api_download_image(image_url)
+            if downloaded is not None:
+                downloaded = downloaded.get(image_url)
+            else:
+                downloaded = self._api_download_image(image_url)
             if downloaded:
                 return downloaded.decode() if isinstance(downloaded, bytes) else downloaded
         return False
@@ -573,18 +881,68 @@ class EventEvent(models.Model):
         return Type.create({"name": name}).id
 
     @api.model
-    def _api_prepare_vals(self, payload):
+    def _api_find_categories(self, names):
+        """Versão em lote de ``_api_find_category``: uma busca e um create para os nomes novos."""
+        names = list(dict.fromkeys(name for name in names if name))
+        if not names:
+            return {}
+        Type = self.env["event.type"].sudo()
+        category_ids = {}
+        for category in Type.search([("name", "in", names)], order="id"):
+            category_ids.setdefault(category.name, category.id)
+        missing = [name for name in names if name not in category_ids]
+        if missing:
+            for category in Type.create([{"name": name} for name in missing]):
+                category_ids[category.name] = category.id
+        return category_ids
+
+    @api.model
+    def _api_validate_payload(self, payload):
+        """Valida o payload sem efeitos colaterais; retorna ``(date_begin, date_end)``."""
+        if not isinstance(payload, dict):
+            raise ValueError("Payload inválido")
         required = ["title", "start_datetime", "external_source", "external_id"]
         for key in required:
             if not payload.get(key):
                 raise ValueError(f"Campo obrigatório ausente: {key}")
 
         timezone = payload.get("timezone") or "UTC"
-        date_begin = self._api_parse_datetime(payload.get("start_datetime"), timezone)
+        try:
+            date_begin = self._api_parse_datetime(payload.get("start_datetime"), timezone)
+        except ValueError:
+            date_begin = False
         if not date_begin:
             raise ValueError("start_datetime inválido")
         date_end_raw = payload.get("end_datetime")
-        date_end = self._api_parse_datetime(date_end_raw, timezone) if date_end_raw else False
+        try:
+            date_end = self._api_parse_datetime(date_end_raw, timezone) if date_end_raw else False
+        except ValueError:
+            raise ValueError("end_datetime inválido")
+        if payload.get("image_base64"):
+            try:
+                base64.b64decode(payload["image_base64"])
+            except Exception:
+                raise ValueError("image_base64 inválida")
+        return date_begin, date_end
+
+    @api.model
+    def _api_get_announced_stage(self):
+        """Estágio usado em ``published`` (o bulk resolve uma vez e repassa aos itens)."""
+        stage = self.env["event.stage"].sudo()
+        announced_stage = self._get_announced_stage_sequence()
+        if announced_stage:
+            stage = stage.search([("sequence", ">=", announced_stage)], limit=1, order="sequence asc, id asc")
+        return stage
+
+    @api.model
+    def _api_prepare_vals(self, payload, category_ids=None, downloaded=None, announced_stage=None):
+        """Vals do evento; ``category_ids``/``downloaded``/``announced_stage`` vêm pré-resolvidos no bulk."""
+        date_begin, date_end = self._api_validate_payload(payload)
+        category_name = payload.get("category")
+        if category_ids is not None:
+            category_id = category_ids.get(category_name, False)
+        else:
+            category_id = self._api_find_category(category_name)
 
         vals = {
             "name": payload.get("title"),
@@ -592,7 +950,7 @@ class EventEvent(models.Model):
             "date_end": date_end,
             "promo_short_description": payload.get("short_description"),
             "promo_description_html": payload.get("description_html"),
-            "promo_category_id": self._api_find_category(payload.get("category")),
+            "promo_category_id": category_id,
             "producer_name": payload.get("organizer_name"),
             "external_source": payload.get("external_source"),
             "external_id": payload.get("external_id"),
@@ -609,21 +967,17 @@ class EventEvent(models.Model):
 
         vals["is_featured"] = bool(payload.get("featured"))
 
-        image_val = self._api_extract_image(payload)
+        image_val = self._api_extract_image(payload, downloaded=downloaded)
         if image_val:
             vals["promo_cover_image"] = image_val
 
         if payload.get("published"):
             vals.update(self._prepare_announced_publication_vals())
 
-        if payload.get("published"):
-            announced_stage = self._get_announced_stage_sequence()
-            if announced_stage and "stage_id" in self._fields and not payload.get("stage_id"):
-                stage = self.env["event.stage"].sudo().search(
-                    [("sequence", ">=", announced_stage)], limit=1, order="sequence asc, id asc"
-                )
-                if stage:
-                    vals["stage_id"] = stage.id
+        if payload.get("published") and "stage_id" in self._fields and not payload.get("stage_id"):
+            stage = announced_stage if announced_stage is not None else self._api_get_announced_stage()
+            if stage:
+                vals["stage_id"] = stage.id
 
         return vals
 
@@ -659,3 +1013,161 @@ class EventEvent(models.Model):
             record.id,
         )
         return record
+
+    @api.model
+    def bhz_api_bulk_upsert_events(self, payloads):
+        """Upsert em lote, com o mesmo contrato de ``bhz_api_upsert_event`` por item.
+
+        Valida tudo antes de escrever. Categorias e eventos existentes saem de uma
+        busca cada; a gravação é feita em lotes de ``API_BULK_CHUNK_SIZE`` e as
+        imagens de cada lote são baixadas em paralelo logo antes dele, para não
+        manter em memória as imagens da requisição inteira. Um item com erro não
+        derruba os demais: se a operação agrupada falhar, ela é refeita item a
+        item para isolar o culpado. Retorna um resultado por item, na ordem recebida.
+        """
+        results = [None] * len(payloads)
+
+        def _error(index, payload, err):
+            payload = payload if isinstance(payload, dict) else {}
+            results[index] = {
+                "external_source": payload.get("external_source"),
+                "external_id": payload.get("external_id"),
+                "status": "error",
+                "message": str(err),
+            }
+
+        valid = []
+        for index, payload in enumerate(payloads):
+            try:
+                self._api_validate_payload(payload)
+            except ValueError as err:
+                _error(index, payload, err)
+                continue
+            valid.append((index, payload))
+        if not valid:
+            return results
+
+        category_ids = self._api_find_categories(payload.get("category") for _index, payload in valid)
+        announced_stage = None
+        if "stage_id" in self._fields and any(payload.get("published") for _index, payload in valid):
+            announced_stage = self._api_get_announced_stage()
+        company_id = self.env.company.id
+        Event = self.with_company(company_id).sudo()
+
+        # Mesmo external_source/external_id repetido no lote: vale o último.
+        indexes_by_key = defaultdict(list)
+        vals_by_key = {}
+        image_urls = {}
+        for index, payload in valid:
+            try:
+                # Imagens por URL ficam para o lote de gravação (ver _apply_chunked).
+                vals = self._api_prepare_vals(
+                    payload, category_ids=category_ids, downloaded={}, announced_stage=announced_stage
+                )
+            except ValueError as err:
+                _error(index, payload, err)
+                continue
+            if "company_id" in self._fields:
+                vals.setdefault("company_id", company_id)
+            key = (vals["external_source"], vals["external_id"])
+            indexes_by_key[key].append(index)
+            vals_by_key[key] = vals
+            if payload.get("image_url") and not payload.get("image_base64"):
+                image_urls[key] = payload["image_url"]
+            else:
+                image_urls.pop(key, None)
+
+        existing = {}
+        if vals_by_key:
+            sources = {source for source, _ext_id in vals_by_key}
+            ext_ids = {ext_id for _source, ext_id in vals_by_key}
+            for record in Event.search(
+                [
+                    ("external_source", "in", list(sources)),
+                    ("external_id", "in", list(ext_ids)),
+                    ("company_id", "=", company_id),
+                ],
+                order="id",
+            ):
+                existing.setdefault((record.external_source, record.external_id), record)
+
+        def _ok(key, record, action):
+            for index in indexes_by_key[key]:
+                results[index] = {
+                    "external_source": key[0],
+                    "external_id": key[1],
+                    "id": record.id,
+                    "status": "ok",
+                    "action": action,
+                }
+
+        def _fail(key, err):
+            for index in indexes_by_key[key]:
+                _error(index, payloads[index], err)
+
+        def _apply_chunked(keys, operation, on_success):
+            for start in range(0, len(keys), API_BULK_CHUNK_SIZE):
+                chunk = keys[start:start + API_BULK_CHUNK_SIZE]
+                downloaded = self._api_download_images(image_urls[key] for key in chunk if key in image_urls)
+                for key in chunk:
+                    image = downloaded.get(image_urls.get(key))
+                    if image:
+                        vals_by_key[key]["promo_cover_image"] = image.decode()
+                self._api_bulk_apply(chunk, operation, on_success, _fail)
+                # Já gravadas: libera as imagens antes do próximo lote.
+                for key in chunk:
+                    if key in image_urls:
+                        vals_by_key[key].pop("promo_cover_image", None)
+
+        to_create = [key for key in vals_by_key if key not in existing]
+        to_update = [key for key in vals_by_key if key in existing]
+        _apply_chunked(
+            to_create,
+            lambda keys: Event.create([vals_by_key[key] for key in keys]),
+            lambda key, record: _ok(key, record, "created"),
+        )
+        _apply_chunked(
+            to_update,
+            lambda keys: self._api_bulk_write(existing, vals_by_key, keys),
+            lambda key, record: _ok(key, record, "updated"),
+        )
+        _logger.info(
+            "API bulk upsert: %s itens, %s criados, %s atualizados, %s erros",
+            len(payloads),
+            len(to_create),
+            len(to_update),
+            sum(1 for result in results if result and result["status"] == "error"),
+        )
+        return results
+
+    @api.model
+    def _api_bulk_write(self, existing, vals_by_key, keys):
+        """Atualiza os eventos já existentes (vals diferem por evento: um write cada)."""
+        records = [existing[key] for key in keys]
+        for key, record in zip(keys, records):
+            record.write(vals_by_key[key])
+        return self.browse([record.id for record in records])
+
+    @api.model
+    def _api_bulk_apply(self, keys, operation, on_success, on_failure):
+        """Roda ``operation(keys)`` num savepoint; se falhar, refaz item a item."""
+        if not keys:
+            return
+        try:
+            with self.env.cr.savepoint():
+                records = operation(keys)
+        except Exception:
+            _logger.warning("API bulk upsert: lote de %s falhou, reprocessando item a item", len(keys), exc_info=True)
+        else:
+            for key, record in zip(keys, records):
+                on_success(key, record)
+            return
+        for key in keys:
+            try:
+                with self.env.cr.savepoint():
+                    record = operation([key])[:1]
+            except Exception as err:
+                _logger.warning("API bulk item failed: %s (%s)", key, err)
+                on_failure(key, err)
+            else:
+                on_success(key, record)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class IrBinary(models.AbstractModel):
+    _inherit = "ir.binary"
+
+    def _get_image_stream_from(self, record, field_name="raw", **kwargs):
+        """Serve os campos padrão de imagem do evento a partir da capa de divulgação.
+
+        Quando ``image_1920``/``image_512``/``cover_image`` estão vazios, usa
+        ``promo_cover_image`` no tamanho máximo do campo pedido.
+        """
+        if record._name == "event.event" and len(record) == 1:
+            source = record._bhz_lazy_cover_source(field_name)
+            if source:
+                field = record._fields[field_name]
+                if not (kwargs.get("width") or kwargs.get("height")):
+                    kwargs["width"] = getattr(field, "max_width", 0) or 0
+                    kwargs["height"] = getattr(field, "max_height", 0) or 0
+                field_name = source
+        return super()._get_image_stream_from(record, field_name, **kwargs)
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class _CsrfPlaceholderRequest:
+    """``request`` visto pelo template: repassa tudo, mas o token CSRF vira o marcador."""
+
+    def __init__(self, request, placeholder):
+        self._request = request
+        self._placeholder = placeholder
+
+    def csrf_token(self, *args, **kwargs):
+        return self._placeholder
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+class IrQweb(models.AbstractModel):
+    _inherit = "ir.qweb"
+
+    def _prepare_environment(self, values):
+        """Com ``bhz_csrf_placeholder`` nos valores, o render só desse template usa o marcador.
+
+        Usado pelo cache da página de evento: o HTML guardado não pode levar o
+        token da sessão de quem o gerou. Nada é alterado no ``request`` real.
+        """
+        irQweb = super()._prepare_environment(values)
+        placeholder = values.get("bhz_csrf_placeholder")
+        if placeholder and values.get("request"):
+            values["request"] = _CsrfPlaceholderRequest(values["request"], placeholder)
+        return irQweb
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class BhzSnippetPrerender(models.AbstractModel):
+    _inherit = "bhz.snippet.prerender"
+
+    @api.model
+    def _bhz_snippet_renderers(self):
+        res = super()._bhz_snippet_renderers()
+        res["s_guiabh_announced_events"] = {
+            "params": {
+                "data-category-ids": "category_ids",
+                "data-limit": "limit",
+                "data-order-mode": "order_mode",
+            },
+            "prepare": "_bhz_snippet_params_announced_events",
+            "render": "_bhz_snippet_render_announced_events",
+            "grid": "js-guiabh-announced-grid",
+            "empty": "js-guiabh-announced-empty",
+        }
+        return res
+
+    @api.model
+    def _bhz_snippet_params_announced_events(self, params):
+        return {
+            "category_ids": self._bhz_snippet_parse_ids(params.get("category_ids")),
+            "limit": self._bhz_snippet_parse_limit(params.get("limit"), 12, 24),
+            "order_mode": self._bhz_snippet_parse_order_mode(params.get("order_mode")),
+        }
+
+    @api.model
+    def _bhz_snippet_render_announced_events(self, params):
+        events = self.env["event.event"].sudo().guiabh_get_announced_events(**params)
+        html = self.env["ir.ui.view"]._render_template(
+            "bhz_event_promo.guiabh_announced_events_cards",
+            {"events": events},
+        )
+        return html, bool(events)
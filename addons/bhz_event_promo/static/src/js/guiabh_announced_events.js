@@ -44,6 +44,10 @@ export class GuiabhAnnouncedEvents extends Interaction {
                 attributeFilter: ["data-category-ids", "data-limit", "data-order-mode"],
             });
         }
+        if (this.el.dataset.bhzPrerendered) {
+            // Conteúdo já veio renderizado no HTML da página; só atualiza quando as opções mudarem.
+            return;
+        }
         return this.fetchAndRender();
     }
 
@@ -0,0 +1,3 @@
+from . import test_api
+from . import test_public_indexes_benchmark
+from . import test_visit_buffer
@@ -2,6 +2,7 @@ import json
 import base64
 
 from odoo.tests import HttpCase, tagged
+from odoo.tools import mute_logger
 
 
 @tagged("post_install", "-at_install")
@@ -14,9 +15,17 @@ class TestEventApi(HttpCase):
     def _headers(self):
         return {"Content-Type": "application/json", "X-BHZ-Token": self.token}
 
+    def _jsonrpc(self, path, params):
+        """Chama uma rota ``type="jsonrpc"`` e devolve o ``result`` do envelope."""
+        body = {"jsonrpc": "2.0", "method": "call", "id": 1, "params": params}
+        res = self.url_open(path, data=json.dumps(body).encode(), headers=self._headers())
+        self.assertEqual(res.status_code, 200)
+        payload = res.json()
+        self.assertNotIn("error", payload)
+        return payload["result"]
+
     def test_ping_requires_token(self):
-        res = self.url_open("/api/events/ping", data=json.dumps({}).encode(), headers=self._headers())
-        payload = json.loads(res.decode())
+        payload = self._jsonrpc("/api/events/ping", {})
         self.assertTrue(payload.get("ok"))
 
     def test_upsert_event(self):
@@ -34,15 +43,71 @@ class TestEventApi(HttpCase):
             "published": True,
             "featured": True,
         }
-        res = self.url_open(
-            "/api/events/upsert",
-            data=json.dumps(payload).encode(),
-            headers=self._headers(),
-        )
-        data = json.loads(res.decode())
+        data = self._jsonrpc("/api/events/upsert", payload)
         self.assertIn("id", data)
         event = self.env["event.event"].browse(data["id"])
         self.assertTrue(event.exists())
         self.assertEqual(event.name, "API Test Event")
         self.assertTrue(event.is_featured)
         self.assertTrue(event.show_on_public_agenda)
+
+    def test_bulk_upsert_events(self):
+        Event = self.env["event.event"].sudo()
+        existing = Event.bhz_api_upsert_event(
+            {
+                "title": "Antigo",
+                "start_datetime": "2026-02-01T20:00:00",
+                "external_source": "bulk",
+                "external_id": "evt-1",
+            }
+        )
+        results = Event.bhz_api_bulk_upsert_events(
+            [
+                {
+                    "title": "Atualizado",
+                    "start_datetime": "2026-02-01T20:00:00",
+                    "external_source": "bulk",
+                    "external_id": "evt-1",
+                    "category": "Shows Bulk",
+                },
+                {
+                    "title": "Novo",
+                    "start_datetime": "2026-02-02T20:00:00",
+                    "external_source": "bulk",
+                    "external_id": "evt-2",
+                    "category": "Shows Bulk",
+                },
+                {"title": "Sem data", "external_source": "bulk", "external_id": "evt-3"},
+            ]
+        )
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "error"])
+        self.assertEqual(results[0]["id"], existing.id)
+        self.assertEqual(results[0]["action"], "updated")
+        self.assertEqual(results[1]["action"], "created")
+        self.assertEqual(existing.name, "Atualizado")
+        created = Event.browse(results[1]["id"])
+        self.assertEqual(created.promo_category_id, existing.promo_category_id)
+        self.assertEqual(created.promo_category_id.name, "Shows Bulk")
+
+    def test_bulk_update_isolates_failing_item(self):
+        Event = self.env["event.event"].sudo()
+        payloads = [
+            {
+                "title": "Item %s" % index,
+                "start_datetime": "2026-03-0%sT20:00:00" % index,
+                "external_source": "bulk-fail",
+                "external_id": "evt-%s" % index,
+            }
+            for index in (1, 2)
+        ]
+        first = Event.bhz_api_upsert_event(dict(payloads[0]))
+        Event.bhz_api_upsert_event(dict(payloads[1]))
+        payloads[0]["title"] = "Item 1 atualizado"
+        # website inexistente: o write do segundo item viola a chave estrangeira
+        payloads[1]["website_id"] = 999999999
+        with mute_logger("odoo.sql_db", "odoo.addons.bhz_event_promo.models.event"):
+            results = Event.bhz_api_bulk_upsert_events(payloads)
+        self.assertEqual([r["status"] for r in results], ["ok", "error"])
+        self.assertEqual(results[0]["action"], "updated")
+        self.assertEqual(results[0]["id"], first.id)
+        self.assertEqual(first.name, "Item 1 atualizado")
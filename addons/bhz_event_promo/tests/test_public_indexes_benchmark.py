@@ -0,0 +1,105 @@
+import json
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+@tagged("bhz_benchmark", "-standard", "-at_install", "post_install")
+class TestPublicEventIndexesBenchmark(TransactionCase):
+    """Gera 100k eventos e confere se as consultas públicas usam os índices parciais.
+
+    Fora da suíte padrão. Rodar com: ``--test-tags bhz_benchmark``.
+    """
+
+    TOTAL_EVENTS = 100_000
+    UPCOMING_EVENTS = 3_000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Event = cls.env["event.event"].sudo()
+        cls.category = cls.env["event.type"].create({"name": "Benchmark BHZ"})
+        now = fields.Datetime.now()
+        template = cls.Event.create(
+            {
+                "name": "Benchmark BHZ",
+                "date_begin": now,
+                "date_end": now + timedelta(hours=3),
+                "show_on_public_agenda": True,
+            }
+        )
+        cls._clone_events(template, now)
+        cls.env.invalidate_all()
+        cls.env.cr.execute("ANALYZE event_event")
+
+    @classmethod
+    def _clone_events(cls, template, now):
+        """Copia o evento-modelo em SQL: 97% histórico (metade ainda público), 3% futuros."""
+        cls.env.cr.execute(
+            """
+            SELECT column_name
+              FROM information_schema.columns
+             WHERE table_name = 'event_event'
+               AND table_schema = current_schema()
+               AND column_name != 'id'
+            """
+        )
+        columns = [row[0] for row in cls.env.cr.fetchall()]
+        offset = "(CASE WHEN g.n <= %(upcoming)s THEN g.n ELSE -g.n END) * INTERVAL '1 hour'"
+        overrides = {
+            "date_begin": f"%(now)s::timestamp + {offset}",
+            "date_end": f"%(now)s::timestamp + {offset} + INTERVAL '3 hours'",
+            "show_on_public_agenda": "(g.n <= %(upcoming)s OR g.n %% 2 = 0)",
+            "is_featured": "(g.n %% 50 = 0)",
+            "has_public_image": "(g.n %% 3 != 0)",
+            "promo_category_id": "CASE WHEN g.n %% 20 = 0 THEN %(category)s END",
+        }
+        column_sql = ", ".join(f'"{col}"' for col in columns)
+        select_sql = ", ".join(overrides.get(col, f'e."{col}"') for col in columns)
+        cls.env.cr.execute(
+            f"""
+            INSERT INTO event_event ({column_sql})
+            SELECT {select_sql}
+              FROM event_event e, generate_series(1, %(total)s) AS g(n)
+             WHERE e.id = %(template)s
+            """,
+            {
+                "now": now,
+                "upcoming": cls.UPCOMING_EVENTS,
+                "category": cls.category.id,
+                "total": cls.TOTAL_EVENTS,
+                "template": template.id,
+            },
+        )
+
+    def _plan(self, domain, order=None, limit=None):
+        query = self.Event._search(domain, order=order, limit=limit)
+        self.env.cr.execute(SQL("EXPLAIN (FORMAT JSON) %s", query.select()))
+        return json.dumps(self.env.cr.fetchone()[0])
+
+    def assertUsesIndex(self, plan, index_key):
+        self.assertIn(index_key, plan, "Plano não usa o índice %s:\n%s" % (index_key, plan))
+
+    def test_agenda_base_domain(self):
+        domain = self.Event._prepare_public_events_domain(require_announced=False)
+        self.assertUsesIndex(self._plan(domain, order="date_begin asc"), "bhz_public_upcoming_idx")
+
+    def test_announced_snippet(self):
+        domain = self.Event._prepare_public_events_domain(require_announced=False, require_image=True)
+        plan = self._plan(domain, order=self.Event._get_announced_events_order("recent"), limit=12)
+        self.assertRegex(plan, "bhz_public_(image_begin|upcoming)_idx")
+
+    def test_featured_carousel(self):
+        domain = self.Event._prepare_public_events_domain(
+            require_announced=False, require_featured=True, require_image=True
+        )
+        plan = self._plan(domain, order="write_date desc, date_begin asc, id desc", limit=12)
+        self.assertUsesIndex(plan, "bhz_public_featured_idx")
+
+    def test_category_filter(self):
+        domain = self.Event._prepare_public_events_domain(
+            require_announced=False, category_ids=[self.category.id]
+        )
+        self.assertUsesIndex(self._plan(domain, order="date_begin asc"), "bhz_public_category_idx")
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestVisitBuffer(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        if not self.registry.in_test_mode():
+            self.registry.enter_test_mode(self.cr)
+            self.addCleanup(self.registry.leave_test_mode)
+        now = fields.Datetime.now()
+        self.event = self.env["event.event"].create(
+            {
+                "name": "Visitas BHZ",
+                "date_begin": now,
+                "date_end": now + timedelta(hours=2),
+            }
+        )
+
+    def test_flush_writes_buffered_visits(self):
+        self.event._bhz_register_visit()
+        self.event._bhz_register_visit()
+        self.event._bhz_flush_visits()
+        self.event.invalidate_recordset()
+        self.assertEqual(self.event.bhz_website_visit_count, 2)
+        self.assertGreater(self.event.bhz_popularity_score, 0)
+
+    def test_flush_with_empty_buffer_is_noop(self):
+        self.event._bhz_flush_visits()
+        self.event._bhz_flush_visits()
+        self.event.invalidate_recordset()
+        self.assertFalse(self.event.bhz_website_visit_count)
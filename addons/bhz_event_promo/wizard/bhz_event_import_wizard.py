@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import base64
+import codecs
 import csv
+import hashlib
 import io
 from collections import defaultdict
 from datetime import datetime
@@ -10,6 +12,9 @@ import requests
 from odoo import _, fields, models
 from odoo.exceptions import UserError
 
+# Eventos por flush (uma busca de existentes + um create por lote).
+IMPORT_BATCH_SIZE = 200
+
 
 class BhzEventImportWizard(models.TransientModel):
     _name = "bhz.event.import.wizard"
@@ -35,45 +40,108 @@ class BhzEventImportWizard(models.TransientModel):
         if not (self.csv_file or self.ics_file or self.link_url):
             raise UserError(_("Envie um CSV, um ICS ou informe uma URL para importar."))
 
-        created_events = self.env["event.event"].sudo().browse()
-
+        stats = {"created": 0, "updated": 0}
+        # Categorias/locais se repetem muito nos feeds: resolvidos uma vez por importação.
+        cache = {"categories": {}, "venues": {}}
         if self.csv_file:
-            created_events |= self._import_csv_data(base64.b64decode(self.csv_file))
+            self._import_csv_data(self._iter_binary_lines(self.csv_file), stats, cache)
         if self.ics_file:
-            created_events |= self._import_ics_data(base64.b64decode(self.ics_file))
+            self._import_ics_data(self._iter_binary_lines(self.ics_file), stats, cache)
         if self.link_url:
-            payload = self._download_external_file(self.link_url)
+            lines = self._download_external_file(self.link_url)
             if self.link_format == "csv":
-                created_events |= self._import_csv_data(payload)
+                self._import_csv_data(lines, stats, cache)
             else:
-                created_events |= self._import_ics_data(payload)
+                self._import_ics_data(lines, stats, cache)
 
-        if not created_events:
+        if not (stats["created"] or stats["updated"]):
             raise UserError(_("Nenhum evento foi criado. Confira o conteúdo dos arquivos."))
 
         self.env.user.notify_success(
-            message=_("Foram importados %s eventos.", len(created_events))
+            message=_(
+                "Foram importados %(created)s eventos novos e atualizados %(updated)s.",
+                created=stats["created"],
+                updated=stats["updated"],
+            )
         )
         return {"type": "ir.actions.act_window_close"}
 
+    # Pipeline ----------------------------------------------------------------
+    def _import_vals(self, vals_iter, stats):
+        """Consome ``vals_iter`` em lotes: upsert por external_source/external_id.
+
+        Reimportar o mesmo arquivo/feed atualiza os eventos já importados em vez
+        de duplicá-los. Dentro de um lote, a última ocorrência de uma chave vence.
+        Eventos arquivados também são atualizados, mas continuam arquivados:
+        arquivar é decisão editorial e a reimportação não a desfaz.
+        """
+        batch = {}
+        for vals in vals_iter:
+            batch[(vals["external_source"], vals["external_id"])] = vals
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self._flush_batch(batch, stats)
+                batch = {}
+        if batch:
+            self._flush_batch(batch, stats)
+
+    def _flush_batch(self, batch, stats):
+        # Mesmo escopo da restrição UNIQUE(external_source, external_id, company_id):
+        # a empresa em que os eventos novos são criados, incluindo os arquivados.
+        company = self.env.company
+        Event = self.env["event.event"].with_company(company).sudo()
+        existing = {}
+        for event in Event.with_context(active_test=False).search(
+            [
+                ("external_source", "in", list({source for source, _ext_id in batch})),
+                ("external_id", "in", list({ext_id for _source, ext_id in batch})),
+                ("company_id", "=", company.id),
+            ],
+            order="id",
+        ):
+            existing.setdefault((event.external_source, event.external_id), event)
+        to_create = []
+        for key, vals in batch.items():
+            event = existing.get(key)
+            if event:
+                event.write(vals)
+                stats["updated"] += 1
+            else:
+                to_create.append(vals)
+        if to_create:
+            # Só eventos novos entram na agenda: reimportar não desfaz uma ocultação manual.
+            Event.create([dict(vals, company_id=company.id, show_on_public_agenda=True) for vals in to_create])
+            stats["created"] += len(to_create)
+
+    def _iter_binary_lines(self, data_b64):
+        """Linhas de um campo Binary, com o terminador original.
+
+        O CSV precisa dos terminadores para campos entre aspas com quebra de
+        linha; o ICS os remove em ``_unfold_ics_lines``.
+        """
+        stream = io.TextIOWrapper(
+            io.BytesIO(base64.b64decode(data_b64)), encoding="utf-8-sig", errors="ignore", newline=""
+        )
+        yield from stream
+
+    def _fallback_external_id(self, *parts):
+        raw = "|".join(str(part or "") for part in parts)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
     # CSV ---------------------------------------------------------------------
-    def _import_csv_data(self, data_bytes):
-        stream = io.StringIO(data_bytes.decode("utf-8-sig"))
-        reader = csv.DictReader(stream)
-        Event = self.env["event.event"].sudo()
-        created = Event.browse()
+    def _import_csv_data(self, lines, stats, cache=None):
+        reader = csv.DictReader(lines)
+        self._import_vals(self._iter_csv_vals(reader, {} if cache is None else cache), stats)
+
+    def _iter_csv_vals(self, reader, cache):
         for idx, row in enumerate(reader, start=1):
-            vals = self._prepare_vals_from_csv(row)
-            if not vals:
-                continue
             try:
-                new_event = Event.create(vals)
+                vals = self._prepare_vals_from_csv(row, cache)
             except Exception as err:
-                raise UserError(_("Erro ao criar evento na linha %(line)s: %(msg)s", line=idx, msg=err))
-            created |= new_event
-        return created
+                raise UserError(_("Erro ao ler o evento na linha %(line)s: %(msg)s", line=idx, msg=err))
+            if vals:
+                yield vals
 
-    def _prepare_vals_from_csv(self, row):
+    def _prepare_vals_from_csv(self, row, cache):
         name = (row.get("name") or "").strip()
         date_begin = self._parse_datetime(row.get("date_begin"))
         if not name or not date_begin:
@@ -82,8 +150,12 @@ class BhzEventImportWizard(models.TransientModel):
         date_end = self._parse_datetime(row.get("date_end")) or date_begin
         external_url = (row.get("external_url") or "").strip()
         button_label = (row.get("button_label") or self.default_button_label).strip()
-        category = self._find_category(row.get("category"))
-        venue = self._get_or_create_venue(row.get("venue"))
+        category = self._find_category(row.get("category"), cache)
+        venue = self._get_or_create_venue(row.get("venue"), cache)
+        # Coluna de id do CSV (id/external_id); sem ela, a chave é derivada do conteúdo.
+        external_id = (row.get("external_id") or row.get("id") or "").strip()
+        if not external_id:
+            external_id = self._fallback_external_id(name, date_begin, row.get("venue"))
 
         vals = self._base_event_vals()
         vals.update(
@@ -100,27 +172,19 @@ class BhzEventImportWizard(models.TransientModel):
                 "age_rating": self._map_age_rating(row.get("age_rating")),
                 "producer_name": (row.get("producer_name") or "").strip() or False,
                 "is_accessible_pcd": self._to_bool(row.get("is_accessible_pcd")),
+                "external_source": "csv_import",
+                "external_id": external_id,
             }
         )
         return vals
 
     # ICS --------------------------------------------------------------------
-    def _import_ics_data(self, data_bytes):
-        text = data_bytes.decode("utf-8", errors="ignore")
-        lines = self._unfold_ics_lines(text.splitlines())
-        blocks = self._extract_ics_blocks(lines)
-        Event = self.env["event.event"].sudo()
-        created = Event.browse()
-        for block in blocks:
-            vals = self._prepare_vals_from_ics(block)
-            if not vals:
-                continue
-            new_event = Event.create(vals)
-            created |= new_event
-        return created
+    def _import_ics_data(self, lines, stats, cache=None):
+        cache = {} if cache is None else cache
+        blocks = self._extract_ics_blocks(self._unfold_ics_lines(lines))
+        self._import_vals(filter(None, (self._prepare_vals_from_ics(block, cache) for block in blocks)), stats)
 
     def _extract_ics_blocks(self, lines):
-        blocks = []
         current = defaultdict(str)
         inside = False
         for line in lines:
@@ -130,7 +194,7 @@ class BhzEventImportWizard(models.TransientModel):
                 continue
             if line == "END:VEVENT":
                 inside = False
-                blocks.append(dict(current))
+                yield dict(current)
                 current = defaultdict(str)
                 continue
             if not inside or ":" not in line:
@@ -138,9 +202,8 @@ class BhzEventImportWizard(models.TransientModel):
             key, value = line.split(":", 1)
             key = key.split(";", 1)[0].upper()
             current[key] = value.strip()
-        return blocks
 
-    def _prepare_vals_from_ics(self, data):
+    def _prepare_vals_from_ics(self, data, cache):
         name = data.get("SUMMARY")
         start_raw = data.get("DTSTART")
         if not name or not start_raw:
@@ -156,12 +219,18 @@ class BhzEventImportWizard(models.TransientModel):
         if location:
             if "-" in location:
                 venue_name, neighborhood = [part.strip() for part in location.split("-", 1)]
-                venue = self._get_or_create_venue(venue_name)
+                venue = self._get_or_create_venue(venue_name, cache)
             else:
-                venue = self._get_or_create_venue(location)
+                venue = self._get_or_create_venue(location, cache)
         description = (data.get("DESCRIPTION") or "").strip()
         short_desc = description[:180] if description else False
-        category = self._find_category(data.get("CATEGORIES"))
+        category = self._find_category(data.get("CATEGORIES"), cache)
+        # UID identifica o evento no calendário; ocorrências de uma série repetem
+        # o UID e se diferenciam pelo RECURRENCE-ID.
+        uid = (data.get("UID") or "").strip()
+        if uid and data.get("RECURRENCE-ID"):
+            uid = "%s#%s" % (uid, data["RECURRENCE-ID"].strip())
+        external_id = uid or self._fallback_external_id(name.strip(), date_begin, location)
 
         vals = self._base_event_vals()
         vals.update(
@@ -175,6 +244,8 @@ class BhzEventImportWizard(models.TransientModel):
                 "promo_category_id": category.id if category else False,
                 "venue_partner_id": venue.id if venue else False,
                 "neighborhood": neighborhood or False,
+                "external_source": "ics_import",
+                "external_id": external_id[:255],
             }
         )
         return vals
@@ -183,7 +254,6 @@ class BhzEventImportWizard(models.TransientModel):
     def _base_event_vals(self):
         return {
             "registration_mode": "external",
-            "show_on_public_agenda": True,
         }
 
     def _parse_datetime(self, value):
@@ -213,27 +283,33 @@ class BhzEventImportWizard(models.TransientModel):
         except ValueError:
             return None
 
-    def _find_category(self, name):
+    def _find_category(self, name, cache):
         if not name:
             return False
         clean = name.strip()
-        EventType = self.env["event.type"].sudo()
-        category = EventType.search([("name", "=", clean)], limit=1)
-        if not category:
-            category = EventType.search([("name", "ilike", clean)], limit=1)
-        return category
+        cache = cache.setdefault("categories", {})
+        if clean not in cache:
+            EventType = self.env["event.type"].sudo()
+            category = EventType.search([("name", "=", clean)], limit=1)
+            if not category:
+                category = EventType.search([("name", "ilike", clean)], limit=1)
+            cache[clean] = category
+        return cache[clean]
 
-    def _get_or_create_venue(self, name):
+    def _get_or_create_venue(self, name, cache):
         if not name:
             return False
         clean = name.strip()
         if not clean:
             return False
-        Partner = self.env["res.partner"].sudo()
-        venue = Partner.search([("name", "=", clean)], limit=1)
-        if not venue:
-            venue = Partner.create({"name": clean, "company_type": "company"})
-        return venue
+        cache = cache.setdefault("venues", {})
+        if clean not in cache:
+            Partner = self.env["res.partner"].sudo()
+            venue = Partner.search([("name", "=", clean)], limit=1)
+            if not venue:
+                venue = Partner.create({"name": clean, "company_type": "company"})
+            cache[clean] = venue
+        return cache[clean]
 
     def _map_ticket_kind(self, value):
         if not value:
@@ -267,19 +343,40 @@ class BhzEventImportWizard(models.TransientModel):
         return str(value).strip().lower() in ("1", "true", "yes", "y", "sim")
 
     def _unfold_ics_lines(self, lines):
-        unfolded = []
+        previous = None
         for raw in lines:
             line = raw.rstrip("\r\n")
-            if line.startswith((" ", "\t")) and unfolded:
-                unfolded[-1] += line.lstrip()
-            else:
-                unfolded.append(line)
-        return unfolded
+            if line.startswith((" ", "\t")) and previous is not None:
+                previous += line[1:]
+                continue
+            if previous is not None:
+                yield previous
+            previous = line
+        if previous is not None:
+            yield previous
 
     def _download_external_file(self, url):
+        """Linhas do arquivo remoto, lidas conforme chegam (sem carregar tudo)."""
         try:
-            response = requests.get(url, timeout=15)
+            response = requests.get(url, timeout=15, stream=True)
             response.raise_for_status()
         except requests.RequestException as err:
             raise UserError(_("Erro ao baixar o arquivo: %s") % err)
-        return response.content
+        return self._iter_response_lines(response)
+
+    def _iter_response_lines(self, response):
+        """Linhas da resposta, com o terminador (como ``_iter_binary_lines``)."""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="ignore")
+        pending = ""
+        with response:
+            try:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    pending += decoder.decode(chunk)
+                    *lines, pending = pending.split("\n")
+                    for line in lines:
+                        yield line + "\n"
+            except requests.RequestException as err:
+                raise UserError(_("Erro ao baixar o arquivo: %s") % err)
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                yield pending
@@ -1,11 +1,11 @@
 {
     "name": "BHZ - Agenda Futebol (Cruzeiro, Atlético-MG, América-MG)",
-    "version": "1.0.1",
+    "version": "1.3.0",
     "category": "Website",
     "summary": "Página no site com agenda de jogos dos times de BH (Cruzeiro, Atlético-MG e América-MG).",
     "author": "BHZ Sistemas",
     "license": "LGPL-3",
-    "depends": ["base", "base_setup", "website"],
+    "depends": ["base", "base_setup", "website", "bhz_common"],
     "data": [
         "security/security.xml",
         "security/ir.model.access.csv",
@@ -10,11 +10,18 @@ _logger = logging.getLogger(__name__)
 
 class FootballAgendaAPI(http.Controller):
     _token_param = "bhz_football_agenda.api_token"
+    _rate_scope = "bhz_football_api"
+    _rate_limit = 60  # requests per 5 minutes per IP
+    _rate_window = 300
 
     @http.route("/bhz/football/api/matches", type="http", auth="public", csrf=False, methods=["POST"])
     def api_matches(self, **kwargs):
         if not self._is_authorized():
             return self._json_response({"error": "Unauthorized"}, status=401)
+        if not request.env["bhz.rate.limiter"].sudo()._allow_request(
+            self._rate_scope, self._rate_limit, self._rate_window
+        ):
+            return self._json_response({"error": "rate_limited"}, status=429)
 
         payload = self._parse_payload()
         if payload is None:
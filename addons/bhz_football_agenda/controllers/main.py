@@ -1,22 +1,44 @@
 from collections import OrderedDict
-import json
 from datetime import datetime, time, timedelta
 from urllib.parse import urlencode
 
 from odoo import fields, http
 from odoo.http import request
+from odoo.tools import SQL
 
 try:
     from odoo.tools.misc import format_datetime as misc_format_datetime
 except Exception:
     misc_format_datetime = None
 
+
+def sitemap_football_agenda(env, rule, qs):
+    Sitemap = env["bhz.sitemap"]
+    company = env["website"].get_current_website().company_id
+    company_domain = [("company_id", "in", [False, company.id])]
+    match_domain = [("website_published", "=", True), ("active", "=", True)] + company_domain
+    team_lastmod = env["bhz.football.match"]._bhz_sitemap_team_lastmod(match_domain)
+    entry = Sitemap._bhz_entry("/futebol/agenda", max(team_lastmod.values(), default=None), qs)
+    if entry:
+        yield entry
+    Team = env["bhz.football.team"]
+    team_domain = [("website_published", "=", True), ("active", "=", True)] + company_domain
+    columns = [SQL.identifier(Team._table, "slug"), SQL.identifier(Team._table, "write_date")]
+    for team_id, slug, write_date in Sitemap._bhz_iter_rows("bhz.football.team", team_domain, columns):
+        if not slug:
+            continue
+        lastmod = max(filter(None, (write_date, team_lastmod.get(team_id))), default=None)
+        entry = Sitemap._bhz_entry("/futebol/agenda/%s" % slug, lastmod, qs)
+        if entry:
+            yield entry
+
+
 class BhzFootballAgendaController(http.Controller):
 
     @http.route([
         "/futebol/agenda",
         "/futebol/agenda/<string:team_slug>",
-    ], type="http", auth="public", website=True, sitemap=True)
+    ], type="http", auth="public", website=True, sitemap=sitemap_football_agenda)
     def football_agenda(self, team_slug=None, **kwargs):
         website = request.website
         company = website.company_id
@@ -180,7 +202,7 @@ class BhzFootballAgendaController(http.Controller):
         def _logo_url(team):
             if not team or not team.id or not team.logo:
                 return False
-            return "/web/image/%s/%s/logo" % (team._name, team.id)
+            return team._bhz_image_url("logo") or "/web/image/%s/%s/logo" % (team._name, team.id)
 
         month_names = [
             "Janeiro",
@@ -259,53 +281,8 @@ class BhzFootballAgendaController(http.Controller):
         website=True,
     )
     def snippet_matches_data(self, team_ids=None, limit=6, order_mode="recent"):
-        limit = self._sanitize_limit(limit)
-        order_mode = self._sanitize_order_mode(order_mode)
-        parsed_team_ids = self._parse_team_ids(team_ids)
-        Match = request.env["bhz.football.match"].sudo()
-        company = request.website.company_id
-        company_id = company and company.id or False
-        matches = Match.guiabh_get_upcoming_matches(
-            team_ids=parsed_team_ids,
-            limit=limit,
-            order_mode=order_mode,
-            company_id=company_id,
+        html, has_matches = request.env["bhz.snippet.prerender"]._bhz_render_snippet(
+            "s_guiabh_football_matches",
+            {"team_ids": team_ids, "limit": limit, "order_mode": order_mode},
         )
-        cards = Match._prepare_match_card_data(matches)
-        html = request.env["ir.ui.view"]._render_template(
-            "bhz_football_agenda.guiabh_football_match_cards",
-            {"matches_data": cards},
-        )
-        return {"html": html, "has_matches": bool(cards)}
-
-    def _sanitize_limit(self, limit):
-        try:
-            limit_value = int(limit)
-        except (ValueError, TypeError):
-            limit_value = 6
-        return max(1, min(limit_value, 20))
-
-    def _sanitize_order_mode(self, order_mode):
-        if isinstance(order_mode, str):
-            lowered = order_mode.lower()
-            if lowered in ("recent", "popular"):
-                return lowered
-        return "recent"
-
-    def _parse_team_ids(self, team_ids):
-        if isinstance(team_ids, str):
-            try:
-                team_ids = json.loads(team_ids)
-            except ValueError:
-                team_ids = []
-        parsed = []
-        for entry in team_ids or []:
-            try:
-                if isinstance(entry, dict):
-                    entry = entry.get("id")
-                entry_id = int(entry)
-            except (ValueError, TypeError):
-                continue
-            if entry_id:
-                parsed.append(entry_id)
-        return parsed
+        return {"html": html, "has_matches": has_matches}
@@ -1,3 +1,4 @@
 from . import football_team
 from . import football_match
 from . import res_config_settings
+from . import snippet_prerender
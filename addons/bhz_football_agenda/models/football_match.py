@@ -3,9 +3,11 @@ from urllib.parse import urlencode
 
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 class FootballMatch(models.Model):
     _name = "bhz.football.match"
+    _inherit = ["bhz.website.visit.mixin"]
     _description = "Jogo de Futebol"
     _order = "match_datetime asc"
     _check_company_auto = True
@@ -93,10 +95,36 @@ class FootballMatch(models.Model):
         order = self._get_snippet_order(order_mode)
         return self.search(domain, order=order, limit=limit)
 
+    @api.model
+    def _bhz_sitemap_team_lastmod(self, domain):
+        """``{time_id: último write_date}`` dos jogos de ``domain`` (mandante ou visitante)."""
+        table = self._table
+        query = self.sudo()._search(domain)
+        query.order = None
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT team_id, MAX(write_date)
+                  FROM (
+                        SELECT UNNEST(ARRAY[%(home)s, %(away)s]) AS team_id, %(write_date)s AS write_date
+                          FROM %(from_clause)s
+                         WHERE %(where_clause)s
+                       ) AS teams
+                 GROUP BY team_id
+                """,
+                home=SQL.identifier(table, "home_team_id"),
+                away=SQL.identifier(table, "away_team_id"),
+                write_date=SQL.identifier(table, "write_date"),
+                from_clause=query.from_clause,
+                where_clause=query.where_clause or SQL("TRUE"),
+            )
+        )
+        return dict(self.env.cr.fetchall())
+
     def _get_snippet_order(self, order_mode):
         allowed = (order_mode or "recent").lower()
         if allowed == "popular":
-            return "website_visit_count desc, match_datetime asc, id asc"
+            return "bhz_popularity_score desc, website_visit_count desc, match_datetime asc, id asc"
         return "match_datetime asc, id asc"
 
     @api.model
@@ -122,7 +150,7 @@ class FootballMatch(models.Model):
         def _logo(team):
             if not team or not team.id or not team.logo:
                 return False
-            return f"/web/image/{team._name}/{team.id}/logo"
+            return team._bhz_image_url("logo") or f"/web/image/{team._name}/{team.id}/logo"
 
         def _gcal(match):
             start_dt = match.match_datetime
@@ -3,7 +3,9 @@ from odoo.exceptions import ValidationError
 
 class FootballTeam(models.Model):
     _name = "bhz.football.team"
+    _inherit = ["bhz.image.derivative.mixin"]
     _description = "Time de Futebol"
+    _bhz_image_derivative_fields = {"logo": (64, 128)}
     _order = "name"
 
     name = fields.Char(required=True)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class BhzSnippetPrerender(models.AbstractModel):
+    _inherit = "bhz.snippet.prerender"
+
+    @api.model
+    def _bhz_snippet_renderers(self):
+        res = super()._bhz_snippet_renderers()
+        res["s_guiabh_football_matches"] = {
+            "params": {
+                "data-team-ids": "team_ids",
+                "data-limit": "limit",
+                "data-order-mode": "order_mode",
+            },
+            "prepare": "_bhz_snippet_params_football_matches",
+            "render": "_bhz_snippet_render_football_matches",
+            "grid": "js-guiabh-football-grid",
+            "empty": "js-guiabh-football-empty",
+        }
+        return res
+
+    @api.model
+    def _bhz_snippet_params_football_matches(self, params):
+        return {
+            "team_ids": self._bhz_snippet_parse_ids(params.get("team_ids")),
+            "limit": self._bhz_snippet_parse_limit(params.get("limit"), 6, 20),
+            "order_mode": self._bhz_snippet_parse_order_mode(params.get("order_mode")),
+        }
+
+    @api.model
+    def _bhz_snippet_render_football_matches(self, params):
+        company = self.env["website"].get_current_website().company_id
+        Match = self.env["bhz.football.match"].sudo()
+        matches = Match.guiabh_get_upcoming_matches(company_id=company.id or False, **params)
+        cards = Match._prepare_match_card_data(matches)
+        html = self.env["ir.ui.view"]._render_template(
+            "bhz_football_agenda.guiabh_football_match_cards",
+            {"matches_data": cards},
+        )
+        return html, bool(cards)
@@ -4,10 +4,13 @@ import hmac
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
 from urllib.parse import quote
 
-from odoo import _, fields, models
+from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
@@ -19,6 +22,9 @@ REQUESTED_SCOPES_PARAM = "bhz_magalu.oauth_scopes"
 ALLOWED_SCOPES_PARAM = "bhz_magalu.allowed_scopes"
 STATE_SECRET_PARAM = "bhz_magalu.state_secret"
 SCOPE_MODE_PARAM = "bhz_magalu.scope_mode"
+# Configurações sincronizadas ao mesmo tempo pelo cron (cada uma em thread e transação próprias).
+SYNC_MAX_WORKERS_PARAM = "bhz_magalu.sync_max_workers"
+DEFAULT_SYNC_MAX_WORKERS = 4
 DEFAULT_SCOPES = [
     "open:portfolio:read",
     "open:order-order:read",
@@ -64,6 +70,70 @@ class BhzMagaluConfig(models.Model):
     oauth_state_nonce = fields.Char(string="Nonce OAuth", readonly=True, copy=False)
     oauth_state_expiration = fields.Datetime(string="Expiração do nonce", readonly=True, copy=False)
 
+    last_sync_orders_at = fields.Datetime("Última sincronização de pedidos", readonly=True, copy=False)
+    last_sync_orders_status = fields.Selection(
+        [("ok", "OK"), ("error", "Erro")],
+        string="Status da sincronização de pedidos",
+        readonly=True,
+        copy=False,
+    )
+    last_sync_orders_duration = fields.Float("Duração da sincronização de pedidos (s)", readonly=True, copy=False)
+    last_sync_error = fields.Text("Último erro de sincronização", readonly=True, copy=False)
+
+    # === Sincronização por configuração ===
+    @api.model
+    def _run_config_units(self, configs, model_name, method_name):
+        """Executa ``env[model_name].method_name(config)`` para cada configuração, em paralelo.
+
+        Cada configuração roda numa thread com cursor próprio, até
+        ``bhz_magalu.sync_max_workers`` ao mesmo tempo; uma falha desfaz só a
+        transação daquela empresa. Status e duração ficam na configuração;
+        ``last_sync_orders_at`` fica a cargo da unidade, que só o grava quando
+        sincronizou de fato. Uma configuração que não pode sincronizar (sem
+        token...) levanta ``UserError`` e fica com status de erro, sem traceback
+        no log. Retorna ``{config_id: resultado}`` (``None`` em erro). Mesma
+        semântica de ``meli.account._run_account_units``.
+        """
+        try:
+            max_workers = int(self._get_system_param(SYNC_MAX_WORKERS_PARAM) or DEFAULT_SYNC_MAX_WORKERS)
+        except ValueError:
+            max_workers = DEFAULT_SYNC_MAX_WORKERS
+        registry = self.env.registry
+        uid = self.env.uid
+        su = self.env.su
+        context = dict(self.env.context)
+
+        def run(config_id):
+            started = time.monotonic()
+            with registry.cursor() as cr:
+                threading.current_thread().dbname = cr.dbname
+                env = api.Environment(cr, uid, context, su=su)
+                config = env["bhz.magalu.config"].browse(config_id)
+                config = config.with_company(config.company_id)
+                result = None
+                vals = {"last_sync_orders_status": "ok", "last_sync_error": False}
+                try:
+                    result = getattr(env[model_name].with_company(config.company_id), method_name)(config)
+                except UserError as err:
+                    # Cron não deve falhar quando a configuração ainda não foi conectada.
+                    cr.rollback()
+                    _logger.warning("Cron Magalu: configuração %s não sincronizada: %s", config.display_name, err)
+                    vals = {"last_sync_orders_status": "error", "last_sync_error": str(err)}
+                except Exception as err:
+                    cr.rollback()
+                    _logger.exception("Cron Magalu: falha inesperada na configuração %s", config.display_name)
+                    vals = {"last_sync_orders_status": "error", "last_sync_error": str(err)}
+                vals["last_sync_orders_duration"] = round(time.monotonic() - started, 2)
+                config.sudo().write(vals)
+                return result
+
+        # Em testes o cursor é compartilhado: roda uma configuração por vez.
+        if registry.in_test_mode() or max_workers <= 1 or len(configs) <= 1:
+            return {config_id: run(config_id) for config_id in configs.ids}
+        workers = min(max_workers, len(configs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bhz_magalu_sync") as executor:
+            return dict(zip(configs.ids, executor.map(run, configs.ids)))
+
     # === Helpers ===
     def _get_system_param(self, key):
         return (self.env["ir.config_parameter"].sudo().get_param(key) or "").strip()
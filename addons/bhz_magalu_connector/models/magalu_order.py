@@ -24,32 +24,17 @@ class BhzMagaluOrder(models.Model):
         if not configs:
             _logger.info("Cron Magalu: nenhuma configuração encontrada.")
             return
-        for cfg in configs:
-            try:
-                self._fetch_for_config(cfg)
-            except UserError as err:
-                # Cron não deve falhar quando a configuração ainda não foi conectada.
-                _logger.warning(
-                    "Cron Magalu: configuração %s ignorada: %s",
-                    cfg.display_name,
-                    err,
-                )
-            except Exception:
-                _logger.exception(
-                    "Cron Magalu: falha inesperada na configuração %s",
-                    cfg.display_name,
-                )
+        # Uma unidade por configuração (empresa), em paralelo e em transações separadas.
+        self.env["bhz.magalu.config"]._run_config_units(configs, "bhz.magalu.order", "_fetch_for_config")
 
     def _fetch_for_config(self, config):
+        """Unidade de sincronização de pedidos de uma configuração; retorna quantos criou."""
         if not config.access_token:
-            _logger.info(
-                "Cron Magalu: configuração %s sem token, ignorando sincronização.",
-                config.display_name,
-            )
-            return
+            raise UserError(_("Configuração Magalu sem token. Conecte novamente."))
         api = self.env["bhz.magalu.api"]
         data = api.fetch_orders(config)
         orders = data.get("orders") or data.get("items") or []
+        created = 0
         for o in orders:
             order_id = o.get("id") or o.get("code")
             if not order_id:
@@ -64,6 +49,9 @@ class BhzMagaluOrder(models.Model):
                 "sale_id": sale.id,
                 "raw_json": json.dumps(o, ensure_ascii=False),
             })
+            created += 1
+        config.sudo().last_sync_orders_at = fields.Datetime.now()
+        return created
 
     def _get_or_create_partner(self, order_data, company_id):
         customer = order_data.get("customer", {})
@@ -1,9 +1,16 @@
+import hmac
+import json
 import logging
 from odoo import http
 from odoo.http import request
 
+from ..models.meli_account import PARAM_CLIENT_ID
+
 _logger = logging.getLogger(__name__)
 
+# Segredo exigido na URL de notificações (?token=...); sem ele o endpoint recusa tudo.
+PARAM_NOTIFICATIONS_TOKEN = "bhz_meli.notifications_token"
+
 
 class MeliAuthController(http.Controller):
 
@@ -42,3 +49,42 @@ class MeliAuthController(http.Controller):
             return "Erro ao autenticar: %s" % str(e)
 
         return "Conta Mercado Livre conectada com sucesso. Você já pode fechar esta aba."
+
+
+class MeliNotificationController(http.Controller):
+
+    @http.route("/meli/notifications", type="http", auth="public", methods=["POST"], csrf=False, save_session=False)
+    def meli_notifications(self, **kwargs):
+        """
+        Notificações do Mercado Livre (orders_v2, items, questions...).
+        O ML espera 200 em até 500 ms: só grava o recurso e responde; a busca
+        do recurso roda no cron "BHZ ML: Processar notificações".
+        """
+        try:
+            payload = json.loads(request.httprequest.get_data() or b"{}")
+        except ValueError:
+            return request.make_json_response({"error": "invalid payload"}, status=400)
+        if not isinstance(payload, dict):
+            return request.make_json_response({"error": "invalid payload"}, status=400)
+
+        params = request.env["ir.config_parameter"].sudo()
+        expected_token = params.get_param(PARAM_NOTIFICATIONS_TOKEN)
+        if not expected_token:
+            _logger.warning(
+                "[ML][Notif] Parâmetro %s não configurado; notificação recusada (topic=%s)",
+                PARAM_NOTIFICATIONS_TOKEN,
+                payload.get("topic"),
+            )
+            return request.make_json_response({"error": "forbidden"}, status=403)
+        if not hmac.compare_digest(str(kwargs.get("token") or ""), expected_token):
+            _logger.warning("[ML][Notif] Token inválido na notificação (topic=%s)", payload.get("topic"))
+            return request.make_json_response({"error": "forbidden"}, status=403)
+        client_id = params.get_param(PARAM_CLIENT_ID)
+        if client_id and str(payload.get("application_id") or "") != str(client_id):
+            _logger.warning(
+                "[ML][Notif] application_id %s não confere com o app configurado", payload.get("application_id")
+            )
+            return request.make_json_response({"error": "forbidden"}, status=403)
+
+        request.env["meli.notification"].sudo()._receive(payload)
+        return request.make_json_response({"status": "ok"})
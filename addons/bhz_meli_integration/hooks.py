@@ -65,3 +65,13 @@ def post_init_hook(env):
         interval_number=30,
         interval_type="minutes",
     )
+
+    _ensure_cron(
+        env=env,
+        xmlid="bhz_meli_integration.bhz_meli_cron_process_notifications",
+        name="BHZ ML: Processar notificações",
+        model_name="meli.notification",
+        method_code="model._cron_process_notifications()",
+        interval_number=1,
+        interval_type="minutes",
+    )
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Remove pedidos e anúncios duplicados antes das restrições únicas por conta.
+
+Polling e notificações podiam gravar o mesmo pedido/anúncio duas vezes. Fica o
+registro já ligado ao Odoo (pedido de venda / produto) e, entre iguais, o mais
+antigo; pedidos de venda criados em duplicidade não são apagados.
+"""
+import logging
+
+from odoo.tools.sql import column_exists, table_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    if table_exists(cr, "meli_order"):
+        cr.execute(
+            """
+            DELETE FROM meli_order
+             WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY account_id, name ORDER BY sale_order_id IS NULL, id
+                    ) AS position
+                      FROM meli_order
+                ) ranked
+                 WHERE position > 1
+             )
+            """
+        )
+        _logger.warning("[BHZ ML] %s pedidos ML duplicados removidos", cr.rowcount)
+    if table_exists(cr, "meli_product"):
+        # meli_last_updated só existe a partir da 19.0.1.1.0
+        newest_first = ""
+        if column_exists(cr, "meli_product", "meli_last_updated"):
+            newest_first = "meli_last_updated DESC NULLS LAST, "
+        cr.execute(
+            f"""
+            DELETE FROM meli_product
+             WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY account_id, meli_item_id
+                        ORDER BY product_id IS NULL, {newest_first}id
+                    ) AS position
+                      FROM meli_product
+                     WHERE meli_item_id IS NOT NULL
+                ) ranked
+                 WHERE position > 1
+             )
+            """
+        )
+        _logger.warning("[BHZ ML] %s anúncios ML duplicados removidos", cr.rowcount)
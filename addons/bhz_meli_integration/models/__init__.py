@@ -1,3 +1,4 @@
 from . import meli_account
 from . import meli_product
 from . import meli_order
+from . import meli_notification
@@ -1,10 +1,13 @@
 import datetime
 import logging
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
 import requests
-from odoo import fields, models, _
+from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
@@ -17,6 +20,10 @@ PARAM_CLIENT_ID = "bhz_meli.client_id"
 PARAM_CLIENT_SECRET = "bhz_meli.client_secret"
 PARAM_REDIRECT_URI = "bhz_meli.redirect_uri"
 TOKEN_LEEWAY_SECONDS = 60
+# Contas sincronizadas ao mesmo tempo pelos crons (cada uma em thread e transação próprias).
+PARAM_SYNC_MAX_WORKERS = "bhz_meli.sync_max_workers"
+DEFAULT_SYNC_MAX_WORKERS = 4
+SYNC_STATUS_SELECTION = [("ok", "OK"), ("error", "Erro")]
 
 
 class MeliAccount(models.Model):
@@ -42,6 +49,44 @@ class MeliAccount(models.Model):
 
     last_sync_orders_at = fields.Datetime("Última sincronização de pedidos", readonly=True)
     last_sync_products_at = fields.Datetime("Última sincronização de produtos", readonly=True)
+    # Checkpoint do scan de anúncios (scroll_id do ML), para retomar após falha.
+    items_scroll_id = fields.Char("Cursor do scan de anúncios", readonly=True, copy=False)
+    items_scan_started_at = fields.Datetime("Scan de anúncios iniciado em", readonly=True, copy=False)
+    items_scan_processed = fields.Integer("Anúncios processados no scan", readonly=True, copy=False)
+    items_scan_floor = fields.Datetime(
+        "Falha mais antiga do scan de anúncios",
+        readonly=True,
+        copy=False,
+        help="Menor last_updated (ML) de anúncio que falhou no scan em andamento: a marca d'água final não passa dele.",
+    )
+    items_scan_incomplete = fields.Boolean(
+        "Scan de anúncios com falhas",
+        readonly=True,
+        copy=False,
+        help="Algum anúncio falhou sem last_updated conhecido: o scan termina sem marca d'água e é refeito.",
+    )
+    items_scan_retries = fields.Integer(
+        "Retomadas seguidas do scan de anúncios",
+        readonly=True,
+        copy=False,
+        help="Novas tentativas agendadas desde a última página processada (limitadas, com espera crescente).",
+    )
+    items_watermark = fields.Datetime(
+        "Marca d'água dos anúncios",
+        readonly=True,
+        copy=False,
+        help="Maior last_updated (ML) já sincronizado. Vazio força um scan completo na próxima sincronização.",
+    )
+    items_force_full = fields.Boolean(
+        "Ressincronizar todos os anúncios",
+        readonly=True,
+        copy=False,
+        help="Pedido de sincronização completa: o próximo scan regrava também os anúncios sem alteração no ML.",
+    )
+    last_sync_orders_status = fields.Selection(SYNC_STATUS_SELECTION, "Status da sincronização de pedidos", readonly=True)
+    last_sync_orders_duration = fields.Float("Duração da sincronização de pedidos (s)", readonly=True)
+    last_sync_products_status = fields.Selection(SYNC_STATUS_SELECTION, "Status da sincronização de produtos", readonly=True)
+    last_sync_products_duration = fields.Float("Duração da sincronização de produtos (s)", readonly=True)
     last_error = fields.Text("Último erro", readonly=True)
     last_error_at = fields.Datetime("Data do último erro", readonly=True)
 
@@ -101,6 +146,126 @@ class MeliAccount(models.Model):
     def _clear_error(self):
         self.sudo().write({"last_error": False, "last_error_at": False})
 
+    def _record_sync_status(self, kind, status, duration, error=False):
+        """Grava status/duração da última sincronização (``kind``: ``orders`` ou ``products``)."""
+        vals = {
+            f"last_sync_{kind}_status": status,
+            f"last_sync_{kind}_duration": round(duration, 2),
+        }
+        if error:
+            vals.update({"last_error": error, "last_error_at": fields.Datetime.now()})
+        self.sudo().write(vals)
+
+    @api.model
+    def _run_account_units(self, accounts, model_name, method_name, kind):
+        """Executa ``env[model_name].method_name(conta)`` para cada conta, em paralelo.
+
+        Cada conta roda numa thread com cursor próprio (transação separada), até
+        ``bhz_meli.sync_max_workers`` ao mesmo tempo: uma conta lenta não atrasa as
+        outras e uma falha só desfaz a transação daquela conta. Status e duração
+        ficam gravados na conta; ``last_sync_*_at`` fica a cargo da unidade, que
+        só o grava quando sincronizou de fato. Uma conta que não pode sincronizar
+        (sem token, sem ``ml_user_id``...) levanta ``UserError`` e fica com status
+        de erro, sem traceback no log. Retorna ``{account_id: resultado}``
+        (``None`` em erro). Mesma semântica de ``bhz.magalu.config._run_config_units``.
+        """
+        try:
+            max_workers = int(
+                self.env["ir.config_parameter"].sudo().get_param(PARAM_SYNC_MAX_WORKERS, DEFAULT_SYNC_MAX_WORKERS)
+            )
+        except (TypeError, ValueError):
+            max_workers = DEFAULT_SYNC_MAX_WORKERS
+        registry = self.env.registry
+        uid = self.env.uid
+        su = self.env.su
+        context = dict(self.env.context)
+
+        def run(account_id):
+            started = time.monotonic()
+            with registry.cursor() as cr:
+                threading.current_thread().dbname = cr.dbname
+                env = api.Environment(cr, uid, context, su=su)
+                account = env["meli.account"].browse(account_id)
+                company = account.company_id or env.company
+                account = account.with_company(company)
+                try:
+                    result = getattr(env[model_name].with_company(company), method_name)(account)
+                except UserError as exc:
+                    cr.rollback()
+                    _logger.warning("[ML] Conta %s: sincronização de %s não executada: %s", account.name, kind, exc)
+                    account._record_sync_status(kind, "error", time.monotonic() - started, str(exc))
+                    return None
+                except Exception as exc:
+                    cr.rollback()
+                    _logger.exception("[ML] Conta %s: falha na sincronização (%s)", account.name, kind)
+                    account._record_sync_status(kind, "error", time.monotonic() - started, str(exc))
+                    return None
+                account._record_sync_status(kind, "ok", time.monotonic() - started)
+                _logger.warning(
+                    "[ML] Conta %s: sincronização de %s concluída em %.1fs",
+                    account.name,
+                    kind,
+                    time.monotonic() - started,
+                )
+                return result
+
+        # Em testes o cursor é compartilhado: roda uma conta por vez.
+        if registry.in_test_mode() or max_workers <= 1 or len(accounts) <= 1:
+            return {account_id: run(account_id) for account_id in accounts.ids}
+        workers = min(max_workers, len(accounts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bhz_meli_sync") as executor:
+            return dict(zip(accounts.ids, executor.map(run, accounts.ids)))
+
+    def _items_scan_checkpoint(self, scroll_id, processed):
+        """Grava o cursor do scan de anúncios (``False`` inicia um scan novo).
+
+        Com ``scroll_id`` uma página foi processada: zera as retomadas seguidas.
+        """
+        vals = {"items_scroll_id": scroll_id or False, "items_scan_processed": processed}
+        if scroll_id:
+            vals["items_scan_retries"] = 0
+        else:
+            vals.update(
+                {
+                    "items_scan_started_at": fields.Datetime.now(),
+                    "items_scan_floor": False,
+                    "items_scan_incomplete": False,
+                }
+            )
+        self.sudo().write(vals)
+
+    def _items_scan_failed(self, last_updated=False):
+        """Registra um anúncio que falhou no scan (``last_updated`` do ML, se conhecido)."""
+        if not last_updated:
+            self.sudo().write({"items_scan_incomplete": True})
+        elif not self.items_scan_floor or last_updated < self.items_scan_floor:
+            self.sudo().write({"items_scan_floor": last_updated})
+
+    def _items_scan_done(self, watermark=False):
+        self.sudo().write(
+            {
+                "items_scroll_id": False,
+                "items_scan_started_at": False,
+                "items_watermark": watermark,
+                "items_force_full": False,
+                "items_scan_retries": 0,
+                "items_scan_floor": False,
+                "items_scan_incomplete": False,
+                "last_sync_products_at": fields.Datetime.now(),
+            }
+        )
+
+    def action_full_items_resync(self):
+        """Pede uma sincronização completa dos anúncios, feita pelo cron logo em seguida.
+
+        Descarta a marca d'água e marca ``items_force_full``: o scan regrava
+        também os anúncios que o ML não alterou desde a última sincronização.
+        """
+        self.sudo().write({"items_watermark": False, "items_force_full": True})
+        # As contas sincronizam em transações próprias, que não enxergariam esta
+        # escrita ainda não confirmada: o scan roda no cron, logo em seguida.
+        self.env.ref("bhz_meli_integration.bhz_meli_cron_fetch_items_v2").sudo()._trigger()
+
     def _build_state_value(self):
         """Gera valor único de state (account_id:token) e salva o token."""
         token = secrets.token_urlsafe(24)
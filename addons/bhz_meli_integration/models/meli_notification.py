@@ -0,0 +1,288 @@
+import logging
+from datetime import timedelta
+
+import psycopg2
+import requests
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+from .meli_product import ML_MULTIGET_MAX_IDS
+
+_logger = logging.getLogger(__name__)
+
+# Notificações processadas ficam guardadas por alguns dias para diagnóstico.
+NOTIFICATION_RETENTION_DAYS = 7
+# Falhas temporárias (rede, 429/5xx do ML, conflito no banco) voltam para a fila
+# com espera crescente (2, 4, 8... minutos) até este número de tentativas.
+NOTIFICATION_MAX_RETRIES = 5
+
+
+class MeliNotification(models.Model):
+    """Notificação recebida do Mercado Livre em ``/meli/notifications``.
+
+    O controller só grava o recurso notificado (ex.: ``/orders/123``) e responde;
+    o cron "BHZ ML: Processar notificações" busca depois apenas aquele recurso
+    (pedido, anúncio, pergunta). Repetições do mesmo recurso enquanto a anterior
+    ainda está pendente só incrementam ``received_count``, então uma rajada de
+    avisos de um pedido vira uma única consulta à API; se o contador mudar
+    durante o processamento, a notificação volta para a fila em vez de se
+    perder a atualização.
+    """
+
+    _name = "meli.notification"
+    _description = "Notificação Mercado Livre"
+    _order = "id desc"
+
+    account_id = fields.Many2one("meli.account", string="Conta ML", required=True, index=True, ondelete="cascade")
+    company_id = fields.Many2one(
+        "res.company",
+        string="Empresa",
+        related="account_id.company_id",
+        store=True,
+        readonly=True,
+    )
+    topic = fields.Char("Tópico", required=True, index=True)
+    resource = fields.Char("Recurso", required=True)
+    resource_id = fields.Char("ID do recurso", index=True)
+    ml_notification_id = fields.Char("ID da notificação (ML)")
+    received_at = fields.Datetime("Recebida em", default=fields.Datetime.now, readonly=True)
+    received_count = fields.Integer("Avisos recebidos", default=1, readonly=True)
+    retry_count = fields.Integer("Tentativas com falha", readonly=True)
+    next_attempt_at = fields.Datetime("Próxima tentativa", readonly=True)
+    processed_at = fields.Datetime("Processada em", readonly=True)
+    state = fields.Selection(
+        [
+            ("pending", "Pendente"),
+            ("done", "Processada"),
+            ("ignored", "Ignorada"),
+            ("failed", "Falhou"),
+        ],
+        default="pending",
+        required=True,
+        index=True,
+    )
+    resource_data = fields.Json("Dados do recurso", readonly=True)
+    last_error = fields.Text("Erro", readonly=True)
+
+    # Deduplicação: um único pendente por recurso e conta.
+    _pending_resource_unique = models.UniqueIndex("(account_id, topic, resource) WHERE state = 'pending'")
+
+    # ---------------------------------------------------------------------
+    # Recebimento (controller)
+    # ---------------------------------------------------------------------
+    @api.model
+    def _receive(self, payload):
+        """Grava a notificação do ML; retorna o registro (vazio se ignorada).
+
+        Se o recurso já tem notificação pendente, só a "toca" (``received_at`` e
+        ``received_count``). O UPDATE condicionado a ``state = 'pending'`` espera
+        o cron liberar a linha: se ela acabou de ser processada, nada é tocado e
+        uma notificação nova é criada.
+        """
+        topic = payload.get("topic")
+        resource = payload.get("resource")
+        user_id = payload.get("user_id")
+        if not topic or not resource or not user_id:
+            return self.browse()
+
+        account = self.env["meli.account"].search(
+            [
+                ("ml_user_id", "=", str(user_id)),
+                ("state", "in", ["connected", "authorized"]),
+            ],
+            limit=1,
+        )
+        if not account:
+            _logger.info("[ML][Notif] Usuário ML %s sem conta conectada; notificação ignorada", user_id)
+            return self.browse()
+
+        touched = self._touch_pending(account, topic, resource)
+        if touched:
+            return touched
+
+        try:
+            with self.env.cr.savepoint():
+                notification = self.create(
+                    {
+                        "account_id": account.id,
+                        "topic": topic,
+                        "resource": resource,
+                        "resource_id": resource.rstrip("/").rsplit("/", 1)[-1],
+                        "ml_notification_id": payload.get("_id"),
+                    }
+                )
+        except psycopg2.IntegrityError:
+            # outra requisição gravou o mesmo recurso ao mesmo tempo
+            return self._touch_pending(account, topic, resource)
+
+        cron = self.env.ref("bhz_meli_integration.bhz_meli_cron_process_notifications", raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return notification
+
+    @api.model
+    def _touch_pending(self, account, topic, resource):
+        self.env.cr.execute(
+            SQL(
+                """
+                UPDATE meli_notification
+                   SET received_at = %s, received_count = received_count + 1
+                 WHERE account_id = %s AND topic = %s AND resource = %s AND state = 'pending'
+             RETURNING id
+                """,
+                fields.Datetime.now(),
+                account.id,
+                topic,
+                resource,
+            )
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    # ---------------------------------------------------------------------
+    # Processamento (cron)
+    # ---------------------------------------------------------------------
+    def _meli_notification_handlers(self):
+        """``{tópico: método}``; o método recebe (conta, notificações do tópico)."""
+        return {
+            "orders_v2": "_process_orders",
+            "orders": "_process_orders",
+            "items": "_process_items",
+            "questions": "_process_questions",
+        }
+
+    @api.model
+    def _ready_domain(self):
+        return [
+            ("state", "=", "pending"),
+            "|",
+            ("next_attempt_at", "=", False),
+            ("next_attempt_at", "<=", fields.Datetime.now()),
+        ]
+
+    @api.model
+    def _cron_process_notifications(self, limit=200):
+        self = self.sudo()
+        notifications = self.search(self._ready_domain(), order="id asc", limit=limit)
+        handlers = self._meli_notification_handlers()
+
+        for account in notifications.account_id:
+            account_ctx = account.with_company(account.company_id or self.env.company)
+            account_notifications = notifications.filtered(lambda n: n.account_id == account)
+            try:
+                account_ctx.ensure_valid_token()
+            except Exception as exc:
+                _logger.error("[ML][Notif] Conta %s: falha ao validar token (%s)", account.name, exc)
+                account_notifications._retry_later(exc)
+                self.env.cr.commit()
+                continue
+
+            for topic in set(account_notifications.mapped("topic")):
+                topic_notifications = account_notifications.filtered(lambda n: n.topic == topic)
+                handler = handlers.get(topic)
+                if not handler:
+                    topic_notifications._mark("ignored")
+                else:
+                    topic_notifications.with_company(account_ctx.company_id)._run_handler(handler, account_ctx)
+                self.env.cr.commit()
+
+        self._gc_processed()
+        if self.search_count(self._ready_domain(), limit=1):
+            self.env.ref("bhz_meli_integration.bhz_meli_cron_process_notifications")._trigger()
+
+    def _run_handler(self, handler, account):
+        """Roda o handler do tópico em savepoint; se o lote falhar, repete uma a uma.
+
+        Assim um recurso com problema não derruba as demais notificações do
+        tópico. No fim, o que recebeu aviso novo durante a busca volta a pendente.
+        """
+        received = {notification.id: notification.received_count for notification in self}
+        try:
+            with self.env.cr.savepoint():
+                getattr(self, handler)(account)
+        except Exception as exc:
+            if len(self) > 1:
+                for notification in self:
+                    notification._run_handler(handler, account)
+                return
+            _logger.warning(
+                "[ML][Notif] Conta %s: falha ao processar %s (%s)", account.name, self.resource, exc, exc_info=True
+            )
+            self._retry_later(exc)
+            return
+        self._requeue_received_again(received)
+
+    def _requeue_received_again(self, received):
+        """Volta a pendente o que foi "tocado" por ``_receive`` depois de ``received``."""
+        self.flush_recordset()
+        self.env.cr.execute(
+            SQL("SELECT id, received_count FROM meli_notification WHERE id IN %s FOR UPDATE", tuple(self.ids))
+        )
+        again = self.browse([row_id for row_id, count in self.env.cr.fetchall() if count != received.get(row_id)])
+        if again:
+            again.write({"state": "pending", "processed_at": False, "last_error": False, "next_attempt_at": False})
+
+    def _retry_later(self, error):
+        """Falha temporária: volta para a fila com espera crescente; as demais falham de vez."""
+        transient = isinstance(error, (requests.RequestException, psycopg2.OperationalError))
+        for notification in self:
+            retry_count = notification.retry_count + 1
+            if not transient or retry_count >= NOTIFICATION_MAX_RETRIES:
+                notification.retry_count = retry_count
+                notification._mark("failed", str(error))
+                continue
+            notification.write(
+                {
+                    "retry_count": retry_count,
+                    "last_error": str(error),
+                    "next_attempt_at": fields.Datetime.now() + timedelta(minutes=2 ** retry_count),
+                }
+            )
+
+    def _mark(self, state, error=False):
+        self.write({"state": state, "processed_at": fields.Datetime.now(), "last_error": error})
+
+    def _process_orders(self, account):
+        Order = self.env["meli.order"]
+        for notification in self:
+            ml_order = Order._ml_get_resource(account, f"/orders/{notification.resource_id}")
+            if ml_order is None:
+                notification._mark("failed", "Pedido não encontrado no Mercado Livre")
+                continue
+            Order._upsert_ml_order(account, ml_order)
+            notification._mark("done")
+
+    def _process_items(self, account):
+        Product = self.env["meli.product"]
+        item_ids = self.mapped("resource_id")
+        items = {}
+        failed = set()
+        # 429/5xx do lote inteiro sobe como requests.HTTPError: o lote volta para a fila.
+        for start in range(0, len(item_ids), ML_MULTIGET_MAX_IDS):
+            items.update(
+                Product._ml_multiget_items(account, item_ids[start:start + ML_MULTIGET_MAX_IDS], failed=failed)
+            )
+        Product._sync_items_batch(account, items)
+        for notification in self:
+            if notification.resource_id in items:
+                notification._mark("done")
+            elif notification.resource_id in failed:
+                notification._retry_later(requests.HTTPError("Anúncio com erro temporário no multiget"))
+            else:
+                notification._mark("failed", "Anúncio não retornado pelo multiget")
+
+    def _process_questions(self, account):
+        # Não há modelo de perguntas no Odoo: guarda o conteúdo buscado na própria notificação.
+        Order = self.env["meli.order"]
+        for notification in self:
+            question = Order._ml_get_resource(account, f"/questions/{notification.resource_id}")
+            if question is None:
+                notification._mark("failed", "Pergunta não encontrada no Mercado Livre")
+                continue
+            notification.resource_data = question
+            notification._mark("done")
+
+    @api.model
+    def _gc_processed(self):
+        limit_date = fields.Datetime.now() - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+        self.search([("state", "!=", "pending"), ("received_at", "<", limit_date)]).unlink()
@@ -1,6 +1,7 @@
 import logging
 from datetime import timedelta
 
+import psycopg2
 import requests
 import pytz
 
@@ -38,6 +39,12 @@ class MeliOrder(models.Model):
 
     sale_order_id = fields.Many2one("sale.order", string="Pedido de Venda Odoo")
 
+    # Polling e notificações podem trazer o mesmo pedido ao mesmo tempo.
+    _account_name_unique = models.Constraint(
+        "UNIQUE(account_id, name)",
+        "Este pedido do Mercado Livre já foi importado para a conta.",
+    )
+
     # ---------------------------------------------------------
     # Helpers de data / formatação
     # ---------------------------------------------------------
@@ -258,26 +265,9 @@ class MeliOrder(models.Model):
                     if exists:
                         continue
 
-                    buyer = ml_order.get("buyer") or {}
-                    buyer_name = (
-                        buyer.get("nickname")
-                        or " ".join(filter(None, [buyer.get("first_name"), buyer.get("last_name")]))
-                        or "Comprador Mercado Livre"
-                    )
-
-                    vals = {
-                        "name": order_id,
-                        "account_id": account.id,
-                        "buyer_name": buyer_name,
-                        "buyer_email": buyer.get("email"),
-                        # ✅ CORREÇÃO: converte ISO com timezone -> formato Odoo
-                        "date_created": self._ml_datetime_to_odoo(ml_order.get("date_created")),
-                        "total_amount": ml_order.get("total_amount") or 0.0,
-                        "status": ml_order.get("status"),
-                        "raw_data": ml_order,
-                    }
-
-                    rec = self.create(vals)
+                    rec = self._create_ml_order(account, ml_order)
+                    if not rec:
+                        continue
                     imported += 1
                     imported_this_candidate += 1
 
@@ -295,6 +285,78 @@ class MeliOrder(models.Model):
 
         return imported
 
+    def _prepare_ml_order_vals(self, account, ml_order):
+        buyer = ml_order.get("buyer") or {}
+        buyer_name = (
+            buyer.get("nickname")
+            or " ".join(filter(None, [buyer.get("first_name"), buyer.get("last_name")]))
+            or "Comprador Mercado Livre"
+        )
+        return {
+            "name": str(ml_order.get("id")),
+            "account_id": account.id,
+            "buyer_name": buyer_name,
+            "buyer_email": buyer.get("email"),
+            # ✅ CORREÇÃO: converte ISO com timezone -> formato Odoo
+            "date_created": self._ml_datetime_to_odoo(ml_order.get("date_created")),
+            "total_amount": ml_order.get("total_amount") or 0.0,
+            "status": ml_order.get("status"),
+            "raw_data": ml_order,
+        }
+
+    def _create_ml_order(self, account, ml_order):
+        """Cria o ``meli.order``; vazio se outra transação acabou de criar o mesmo pedido."""
+        try:
+            with self.env.cr.savepoint():
+                return self.create(self._prepare_ml_order_vals(account, ml_order))
+        except psycopg2.IntegrityError:
+            _logger.info("[ML] Pedido ML %s já importado em paralelo (conta %s)", ml_order.get("id"), account.name)
+            return self.browse()
+
+    def _ml_get_resource(self, account, path):
+        """GET de um recurso do ML (ex.: ``/orders/123``); ``None`` se não encontrado.
+
+        Erros temporários (429/5xx) sobem como ``requests.HTTPError``, para quem
+        chama poder tentar de novo; os demais, como ``UserError``.
+        """
+        resp = self._ml_get(f"https://api.mercadolibre.com{path}", account, timeout=15)
+        if resp.status_code == 404:
+            return None
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise requests.HTTPError(
+                "Erro HTTP %s ao buscar %s no Mercado Livre" % (resp.status_code, path), response=resp
+            )
+        if resp.status_code != 200:
+            raise UserError(
+                "Erro HTTP %s ao buscar %s no Mercado Livre: %s"
+                % (resp.status_code, path, (resp.text or "")[:500])
+            )
+        return resp.json() if resp.text else None
+
+    def _upsert_ml_order(self, account, ml_order):
+        """Cria o pedido (e o sale.order) ou atualiza status/total de um pedido já importado."""
+        order_id = str(ml_order.get("id"))
+        domain = [("name", "=", order_id), ("account_id", "=", account.id)]
+        rec = self.search(domain, limit=1)
+        if not rec:
+            rec = self._create_ml_order(account, ml_order)
+            if rec:
+                try:
+                    self._create_sale_order_from_meli(rec)
+                except Exception:
+                    _logger.exception("[ML] Falha ao criar sale.order para pedido ML %s", order_id)
+                return rec
+            # o polling criou o mesmo pedido agora há pouco: segue como atualização
+            rec = self.search(domain, limit=1)
+        rec.write(
+            {
+                "status": ml_order.get("status"),
+                "total_amount": ml_order.get("total_amount") or 0.0,
+                "raw_data": ml_order,
+            }
+        )
+        return rec
+
     # ---------------------------------------------------------
     # Cron
     # ---------------------------------------------------------
@@ -302,6 +364,8 @@ class MeliOrder(models.Model):
     def cron_fetch_orders(self):
         """
         Cron que busca pedidos em todas as contas conectadas.
+        Cada conta é uma unidade independente, executada em paralelo (ver
+        ``meli.account._run_account_units``).
         Usa WARNING para garantir visibilidade no odoo.sh.
         """
         self = self.sudo()
@@ -317,29 +381,22 @@ class MeliOrder(models.Model):
             _logger.warning("[ML] (CRON) Nenhuma conta conectada encontrada para importar pedidos")
             return
 
-        total_imported = 0
-
-        for account in accounts:
-            company = account.company_id or self.env.company
-            order_model = self.with_company(company)
-            account_ctx = account.with_company(company)
-
-            try:
-                account_ctx.ensure_valid_token()
-            except Exception as exc:
-                _logger.error("[ML] Conta %s: falha ao validar token: %s", account.name, exc)
-                continue
-
-            try:
-                imported = order_model._import_orders_for_account(account_ctx)
-                total_imported += imported
-                _logger.warning("[ML] Conta %s: %s pedidos importados", account.name, imported)
-            except Exception as exc:
-                _logger.exception("[ML] Erro inesperado ao importar pedidos da conta %s", account.name)
-                account_ctx._record_error(str(exc))
-
+        results = self.env["meli.account"]._run_account_units(
+            accounts, "meli.order", "_sync_account_orders", "orders"
+        )
+        total_imported = sum(imported for imported in results.values() if imported)
         _logger.warning("[ML] (CRON) Importação finalizada. Total importado: %s", total_imported)
 
+    def _sync_account_orders(self, account):
+        """Unidade de sincronização de pedidos de uma conta (roda em transação própria)."""
+        account.ensure_valid_token()
+        if not account.ml_user_id:
+            raise UserError("Conta Mercado Livre sem ml_user_id. Conecte novamente.")
+        imported = self._import_orders_for_account(account)
+        account.sudo().write({"last_sync_orders_at": fields.Datetime.now()})
+        _logger.warning("[ML] Conta %s: %s pedidos importados", account.name, imported)
+        return imported
+
     # ---------------------------------------------------------
     # Sale Order básico
     # ---------------------------------------------------------
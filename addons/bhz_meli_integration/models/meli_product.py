@@ -1,4 +1,7 @@
 import logging
+from datetime import timedelta
+
+import psycopg2
 import requests
 
 from odoo import api, fields, models, _
@@ -6,6 +9,22 @@ from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+ML_ITEMS_URL = "https://api.mercadolibre.com/items"
+# Limite do multiget do ML: GET /items?ids=ID1,ID2,... (até 20 por chamada).
+ML_MULTIGET_MAX_IDS = 20
+# Itens por página do scan (/users/{id}/items/search?search_type=scan; máx. 100).
+ML_SCAN_PAGE_SIZE = 100
+# Busca incremental (orders=last_updated_desc): página e teto de offset da busca comum do ML.
+ML_SEARCH_PAGE_SIZE = 50
+ML_SEARCH_MAX_OFFSET = 1000
+# A busca incremental volta alguns minutos antes da marca d'água: o índice de
+# busca do ML demora a refletir as alterações e pode trazê-las fora de ordem.
+ML_WATERMARK_MARGIN_MINUTES = 15
+# Scan interrompido: nova tentativa logo em seguida, antes de o scroll_id expirar no ML;
+# a espera dobra a cada retomada seguida sem progresso, até ML_SCAN_MAX_RETRIES.
+ML_SCAN_RETRY_MINUTES = 1
+ML_SCAN_MAX_RETRIES = 5
+
 
 class MeliProduct(models.Model):
     _name = "meli.product"
@@ -26,12 +45,19 @@ class MeliProduct(models.Model):
     meli_item_id = fields.Char("ID Anúncio ML", help="Ex.: MLB123456789", index=True)
     meli_permalink = fields.Char("Link do anúncio")
     sale_price = fields.Float("Preço de venda no ML")
+    meli_last_updated = fields.Datetime("Última alteração no ML", readonly=True, copy=False)
     currency_id = fields.Many2one(
         "res.currency",
         string="Moeda",
         default=lambda self: self.env.company.currency_id.id,
     )
 
+    # Scan, busca incremental e notificações podem trazer o mesmo anúncio ao mesmo tempo.
+    _account_item_unique = models.Constraint(
+        "UNIQUE(account_id, meli_item_id)",
+        "Este anúncio do Mercado Livre já foi importado para a conta.",
+    )
+
     # ---------------------------------------------------------
     # HTTP helpers
     # ---------------------------------------------------------
@@ -48,6 +74,55 @@ class MeliProduct(models.Model):
             resp = requests.get(url, headers=headers, params=params, timeout=timeout)
         return resp
 
+    def _ml_multiget_items(self, account, item_ids, timeout=30, failed=None):
+        """Detalhes de até ``ML_MULTIGET_MAX_IDS`` anúncios numa única chamada.
+
+        Retorna ``{item_id: item_data}`` só com os itens que vieram com código 200;
+        erros (do lote inteiro ou de itens isolados) são registrados no log.
+        Erro temporário do lote inteiro (429/5xx) sobe como ``requests.HTTPError``,
+        para quem chama tentar de novo (mesmo contrato de
+        ``meli.order._ml_get_resource``). Os ids que falharam por outro erro do
+        lote ou por 429/5xx do próprio item entram em ``failed``, quando
+        informado; os demais (anúncio inexistente...) não.
+        """
+        item_ids = list(item_ids)[:ML_MULTIGET_MAX_IDS]
+        if not item_ids:
+            return {}
+        resp = self._ml_get(ML_ITEMS_URL, account, params={"ids": ",".join(item_ids)}, timeout=timeout)
+        if resp.status_code != 200:
+            _logger.error(
+                "[ML] Conta %s: erro HTTP %s no multiget de %s itens: %s",
+                account.name,
+                resp.status_code,
+                len(item_ids),
+                (resp.text or "")[:2000],
+            )
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise requests.HTTPError(
+                    "Erro HTTP %s no multiget de anúncios do Mercado Livre" % resp.status_code, response=resp
+                )
+            if failed is not None:
+                failed.update(item_ids)
+            return {}
+
+        items = {}
+        for requested_id, entry in zip(item_ids, resp.json() or []):
+            body = entry.get("body") or {}
+            item_id = body.get("id")
+            code = entry.get("code")
+            if code != 200 or not item_id:
+                _logger.error(
+                    "[ML] Conta %s: erro ao buscar item %s no multiget: %s",
+                    account.name,
+                    item_id or requested_id,
+                    str(body)[:2000],
+                )
+                if failed is not None and (code == 429 or (code or 500) >= 500):
+                    failed.add(item_id or requested_id)
+                continue
+            items[item_id] = body
+        return items
+
     # ---------------------------------------------------------
     # Produto Odoo (criação compatível com Odoo 19)
     # ---------------------------------------------------------
@@ -61,6 +136,19 @@ class MeliProduct(models.Model):
 
         return Product.search(domain, limit=1)
 
+    def _find_product_variants(self, account, codes):
+        """``{default_code: produto}`` da empresa da conta para vários códigos, numa busca."""
+        codes = [code for code in codes if code]
+        if not codes:
+            return {}
+        Product = self.env["product.product"].sudo().with_company(account.company_id)
+        found = {}
+        for product in Product.search(
+            [("company_id", "=", account.company_id.id), ("default_code", "in", codes)]
+        ):
+            found.setdefault(product.default_code, product)
+        return found
+
     def _create_product_variant(self, account, item_data):
         """
         Cria produto no Odoo de forma compatível com Odoo 19:
@@ -115,7 +203,7 @@ class MeliProduct(models.Model):
             account = rec.account_id
             account.ensure_valid_token()
 
-            url = f"https://api.mercadolibre.com/items/{rec.meli_item_id}"
+            url = f"{ML_ITEMS_URL}/{rec.meli_item_id}"
             resp = self._ml_get(url, account, timeout=30)
             if resp.status_code != 200:
                 raise UserError(_("Erro ao buscar item no ML: %s") % (resp.text or resp.status_code))
@@ -126,6 +214,7 @@ class MeliProduct(models.Model):
                     "name": data.get("title") or rec.name,
                     "meli_permalink": data.get("permalink"),
                     "sale_price": data.get("price") or 0.0,
+                    "meli_last_updated": self._ml_last_updated(data),
                 }
             )
 
@@ -144,124 +233,424 @@ class MeliProduct(models.Model):
             _logger.warning("[ML] (CRON) Nenhuma conta conectada encontrada para importar anúncios")
             return
 
-        Currency = self.env["res.currency"].sudo()
-        total_imported = 0
-        total_updated = 0
-
-        for account in accounts:
-            company = account.company_id or self.env.company
-            account_ctx = account.with_company(company)
-
-            try:
-                account_ctx.ensure_valid_token()
-            except Exception as exc:
-                _logger.error("[ML] Conta %s: falha ao validar token (%s)", account_ctx.name, exc)
-                account_ctx._record_error(str(exc))
-                continue
-
-            if not account_ctx.ml_user_id:
-                _logger.warning("[ML] Conta %s sem ml_user_id. Pulei importação de itens.", account_ctx.name)
-                continue
+        results = self.env["meli.account"]._run_account_units(
+            accounts, "meli.product", "_sync_account_items_unit", "products"
+        )
+        total_imported = sum(result[0] for result in results.values() if result)
+        total_updated = sum(result[1] for result in results.values() if result)
+        _logger.warning(
+            "[ML] (CRON) Importação de anúncios finalizada. Criados: %s | Atualizados: %s",
+            total_imported,
+            total_updated,
+        )
 
-            account_imported = 0
-            account_updated = 0
+    def _sync_account_items_unit(self, account):
+        """Unidade de sincronização de anúncios de uma conta (roda em transação própria)."""
+        account.ensure_valid_token()
+        if not account.ml_user_id:
+            raise UserError(_("Conta Mercado Livre sem ml_user_id. Conecte novamente."))
+        return self._sync_account_items(account)
 
-            limit = 50
-            offset = 0
+    def _sync_account_items(self, account, full=False):
+        """Sincroniza os anúncios da conta: incremental por padrão, scan completo quando preciso.
 
-            search_url = f"https://api.mercadolibre.com/users/{account_ctx.ml_user_id}/items/search"
-            while True:
-                params = {"search_type": "scan", "offset": offset, "limit": limit}
-                resp = self._ml_get(search_url, account_ctx, params=params, timeout=30)
+        O scan completo roda na primeira sincronização (sem marca d'água), quando
+        há um scan interrompido para retomar ou quando forçado (``full=True`` ou
+        ``items_force_full`` na conta); forçado, regrava inclusive os anúncios
+        sem alteração no ML. Retorna ``(criados, atualizados)``.
+        """
+        force = full or account.items_force_full
+        if force or account.items_scroll_id or not account.items_watermark:
+            return self._sync_account_items_scan(account, force=force)
+        return self._sync_account_items_incremental(account)
+
+    def _sync_account_items_incremental(self, account):
+        """Só os anúncios alterados desde ``items_watermark`` (``last_updated`` do ML).
+
+        Percorre a busca ordenada por ``last_updated`` decrescente e para no
+        primeiro lote que já contém itens anteriores à marca d'água menos
+        ``ML_WATERMARK_MARGIN_MINUTES``; o custo acompanha o que mudou, e não o
+        tamanho do catálogo. A nova marca d'água não passa do anúncio mais antigo
+        que falhou (multiget ou criação do produto), para ele voltar na próxima.
+        """
+        account_imported = 0
+        account_updated = 0
+        watermark = account.items_watermark
+        since = watermark - timedelta(minutes=ML_WATERMARK_MARGIN_MINUTES)
+        newest = watermark
+        # Teto da nova marca d'água; ``unknown_failure``: falha de multiget ainda
+        # sem item mais antigo conhecido depois dela na ordem da busca.
+        ceiling = None
+        unknown_failure = False
+        search_url = f"https://api.mercadolibre.com/users/{account.ml_user_id}/items/search"
+        offset = 0
+        reached_watermark = False
+        while not reached_watermark:
+            if offset >= ML_SEARCH_MAX_OFFSET:
+                _logger.warning(
+                    "[ML] Conta %s: mais de %s anúncios alterados; próximo ciclo fará scan completo",
+                    account.name,
+                    ML_SEARCH_MAX_OFFSET,
+                )
+                account.sudo().write({"items_watermark": False})
+                break
+            params = {"orders": "last_updated_desc", "offset": offset, "limit": ML_SEARCH_PAGE_SIZE}
+            resp = self._ml_get(search_url, account, params=params, timeout=30)
+            if resp.status_code != 200:
+                _logger.error(
+                    "[ML] Conta %s: erro HTTP %s na busca incremental de anúncios: %s",
+                    account.name,
+                    resp.status_code,
+                    (resp.text or "")[:2000],
+                )
+                raise UserError(
+                    _("Erro HTTP %s na busca incremental de anúncios do Mercado Livre.") % resp.status_code
+                )
+            item_ids = (resp.json() if resp.text else {}).get("results") or []
+            changed = {}
+            for start in range(0, len(item_ids), ML_MULTIGET_MAX_IDS):
+                batch_ids = item_ids[start:start + ML_MULTIGET_MAX_IDS]
+                failed = set()
+                items = self._ml_multiget_items(account, batch_ids, failed=failed)
+                for item_id in batch_ids:
+                    if item_id in failed:
+                        unknown_failure = True
+                        continue
+                    item_data = items.get(item_id)
+                    if item_data is None:
+                        continue
+                    last_updated = self._ml_last_updated(item_data)
+                    if last_updated and unknown_failure:
+                        # busca em ordem decrescente: o item que falhou não é mais antigo que este
+                        ceiling = min(ceiling or last_updated, last_updated)
+                        unknown_failure = False
+                    if last_updated and last_updated <= since:
+                        reached_watermark = True
+                        break
+                    changed[item_id] = item_data
+                    if last_updated and last_updated > newest:
+                        newest = last_updated
+                if reached_watermark:
+                    break
+            failed = set()
+            created, updated = self._sync_items_batch(account, changed, failed=failed)
+            for item_id in failed:
+                last_updated = self._ml_last_updated(changed[item_id])
+                if last_updated:
+                    ceiling = min(ceiling or last_updated, last_updated)
+                else:
+                    unknown_failure = True
+            account_imported += created
+            account_updated += updated
+            if len(item_ids) < ML_SEARCH_PAGE_SIZE:
+                break
+            offset += ML_SEARCH_PAGE_SIZE
+
+        if unknown_failure:
+            # falha sem item mais antigo conhecido: a marca d'água fica onde estava
+            ceiling = watermark
+        if ceiling and ceiling < newest:
+            _logger.warning(
+                "[ML] Conta %s: anúncios com falha; marca d'água limitada a %s",
+                account.name,
+                ceiling,
+            )
+            newest = max(watermark, ceiling)
+        vals = {"last_sync_products_at": fields.Datetime.now()}
+        if account.items_watermark and newest:
+            vals["items_watermark"] = newest
+        account.sudo().write(vals)
+        _logger.warning(
+            "[ML] Conta %s (incremental): %s anúncios criados, %s atualizados",
+            account.name,
+            account_imported,
+            account_updated,
+        )
+        return account_imported, account_updated
+
+    def _sync_account_items_scan(self, account, force=False):
+        """Scan completo dos anúncios da conta, paginado por ``scroll_id``.
+
+        O cursor do scan fica em ``meli.account`` e o progresso é confirmado
+        (commit) a cada página: se a execução cair no meio, a próxima retoma do
+        último ``scroll_id`` enquanto ele for válido no ML (expira poucos minutos
+        após a última chamada); expirado, o scan recomeça do início. Como o
+        intervalo do cron passa da validade do ``scroll_id``, um scan interrompido
+        agenda uma nova execução para logo em seguida (``_items_scan_retry_soon``). Um erro HTTP
+        do ML levanta ``UserError`` para a conta ficar com status de erro.
+
+        Anúncios que falham não avançam a marca d'água final: o menor
+        ``last_updated`` com falha limita a marca (``items_scan_floor``) e uma
+        falha sem ``last_updated`` conhecido (``items_scan_incomplete``) termina o
+        scan sem marca, para o próximo ciclo refazê-lo.
+        Retorna ``(criados, atualizados)``.
+        """
+        account_imported = 0
+        account_updated = 0
+        search_url = f"https://api.mercadolibre.com/users/{account.ml_user_id}/items/search"
+        scroll_id = account.items_scroll_id
+        if scroll_id:
+            _logger.warning(
+                "[ML] Conta %s: retomando scan de anúncios (%s itens já processados)",
+                account.name,
+                account.items_scan_processed,
+            )
+        else:
+            account._items_scan_checkpoint(False, processed=0)
+
+        while True:
+            item_ids = []
+            params = {"search_type": "scan", "limit": ML_SCAN_PAGE_SIZE}
+            if scroll_id:
+                params["scroll_id"] = scroll_id
+            try:
+                resp = self._ml_get(search_url, account, params=params, timeout=30)
 
                 if resp.status_code != 200:
                     _logger.error(
                         "[ML] Conta %s: erro HTTP %s ao buscar anúncios: %s",
-                        account_ctx.name,
+                        account.name,
                         resp.status_code,
                         (resp.text or "")[:2000],
                     )
-                    break
+                    if scroll_id and resp.status_code in (400, 404):
+                        # scroll_id expirado: descarta o checkpoint; a nova tentativa recomeça.
+                        account._items_scan_checkpoint(False, processed=0)
+                    self._items_scan_retry_soon(account)
+                    self.env.cr.commit()
+                    raise UserError(_("Erro HTTP %s ao buscar anúncios no Mercado Livre.") % resp.status_code)
 
                 payload = resp.json() if resp.text else {}
                 item_ids = payload.get("results") or []
                 if not item_ids:
+                    account._items_scan_done(self._items_scan_final_watermark(account))
+                    self.env.cr.commit()
                     break
 
-                for item_id in item_ids:
-                    item_url = f"https://api.mercadolibre.com/items/{item_id}"
-                    item_resp = self._ml_get(item_url, account_ctx, timeout=30)
-
-                    if item_resp.status_code != 200:
-                        _logger.error(
-                            "[ML] Conta %s: erro ao buscar item %s: %s",
-                            account_ctx.name,
-                            item_id,
-                            (item_resp.text or "")[:2000],
-                        )
-                        continue
+                items = {}
+                failed = set()
+                for start in range(0, len(item_ids), ML_MULTIGET_MAX_IDS):
+                    batch_ids = item_ids[start:start + ML_MULTIGET_MAX_IDS]
+                    items.update(self._ml_multiget_items(account, batch_ids, failed=failed))
+                if failed:
+                    account._items_scan_failed()
+                failed = set()
+                created, updated = self._sync_items_batch(account, items, force=force, failed=failed)
+                for item_id in failed:
+                    account._items_scan_failed(self._ml_last_updated(items[item_id]))
+            except UserError:
+                raise
+            except Exception:
+                # Desfaz só a página atual (as anteriores já foram confirmadas) e
+                # agenda a retomada enquanto o scroll_id ainda vale. O scroll_id já
+                # avançou no ML: os itens desta página não voltam nesta passada.
+                self.env.cr.rollback()
+                if item_ids:
+                    account._items_scan_failed()
+                self._items_scan_retry_soon(account)
+                self.env.cr.commit()
+                raise
+            account_imported += created
+            account_updated += updated
+
+            scroll_id = payload.get("scroll_id") or scroll_id
+            account._items_scan_checkpoint(scroll_id, processed=account.items_scan_processed + len(item_ids))
+            self.env.cr.commit()
 
-                    item_data = item_resp.json()
-                    item_data["id"] = item_id  # garante
-
-                    # moeda
-                    currency_id = company.currency_id.id
-                    currency_code = item_data.get("currency_id")
-                    if currency_code:
-                        currency = Currency.search([("name", "=", currency_code)], limit=1)
-                        if currency:
-                            currency_id = currency.id
-
-                    # produto odoo (VARIANTE)
-                    try:
-                        product_variant = self._get_or_create_product_variant(account_ctx, item_data)
-                    except Exception:
-                        _logger.exception(
-                            "[ML] Conta %s: falha ao criar/obter produto Odoo do item %s",
-                            account_ctx.name,
-                            item_id,
-                        )
-                        continue
+        _logger.warning(
+            "[ML] Conta %s: %s anúncios criados, %s atualizados",
+            account.name,
+            account_imported,
+            account_updated,
+        )
+        return account_imported, account_updated
 
-                    vals = {
-                        "name": item_data.get("title") or item_id,
-                        "account_id": account_ctx.id,
-                        "product_id": product_variant.id,
-                        "meli_item_id": item_id,
-                        "meli_permalink": item_data.get("permalink"),
-                        "sale_price": item_data.get("price") or 0.0,
-                        "currency_id": currency_id,
-                    }
-
-                    record = self.search(
-                        [("account_id", "=", account_ctx.id), ("meli_item_id", "=", item_id)],
-                        limit=1,
-                    )
-                    if record:
-                        record.write(vals)
-                        account_updated += 1
-                        total_updated += 1
-                    else:
-                        self.create(vals)
-                        account_imported += 1
-                        total_imported += 1
-
-                if len(item_ids) < limit:
-                    break
-                offset += limit
+    def _items_scan_retry_soon(self, account):
+        """Agenda o cron de anúncios para uma nova tentativa do scan da conta.
 
+        A espera começa em ``ML_SCAN_RETRY_MINUTES`` e dobra a cada retomada
+        seguida sem progresso; depois de ``ML_SCAN_MAX_RETRIES`` o scan fica para
+        a execução regular do cron.
+        """
+        retries = account.items_scan_retries
+        if retries >= ML_SCAN_MAX_RETRIES:
             _logger.warning(
-                "[ML] Conta %s: %s anúncios criados, %s atualizados",
-                account_ctx.name,
-                account_imported,
-                account_updated,
+                "[ML] Conta %s: scan de anúncios falhou %s vezes seguidas; fica para a próxima execução do cron",
+                account.name,
+                retries,
             )
+            account.sudo().write({"items_scan_retries": 0})
+            return
+        account.sudo().write({"items_scan_retries": retries + 1})
+        cron = self.env.ref("bhz_meli_integration.bhz_meli_cron_fetch_items_v2", raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger(fields.Datetime.now() + timedelta(minutes=ML_SCAN_RETRY_MINUTES * 2 ** retries))
+
+    def _sync_items_batch(self, account, items, force=False, failed=None):
+        """Cria/atualiza os ``meli.product`` de uma página de itens ``{item_id: item_data}``.
+
+        As consultas são feitas por página, e não por item: anúncios já
+        importados, moedas e produtos por ``default_code`` vêm em uma busca
+        cada; os novos anúncios são criados num único ``create``. Só a criação
+        de produtos Odoo ainda inexistentes continua item a item. Anúncios sem
+        alteração no ML são pulados, exceto com ``force``. Os itens não gravados
+        por falha na criação do produto entram em ``failed``, quando informado.
+        Retorna ``(criados, atualizados)``.
+        """
+        if not items:
+            return 0, 0
+        company = account.company_id or self.env.company
 
-        _logger.warning(
-            "[ML] (CRON) Importação de anúncios finalizada. Criados: %s | Atualizados: %s",
-            total_imported,
-            total_updated,
+        existing = {
+            rec.meli_item_id: rec
+            for rec in self.search([("account_id", "=", account.id), ("meli_item_id", "in", list(items))])
+        }
+        pending = {}
+        for item_id, item_data in items.items():
+            last_updated = self._ml_last_updated(item_data)
+            record = existing.get(item_id)
+            # anúncio sem alteração no ML desde a última sincronização: nada a fazer
+            if (
+                not force
+                and record
+                and record.product_id
+                and last_updated
+                and record.meli_last_updated == last_updated
+            ):
+                continue
+            pending[item_id] = (item_data, last_updated)
+        if not pending:
+            return 0, 0
+
+        currency_codes = {data.get("currency_id") for data, _last in pending.values() if data.get("currency_id")}
+        currencies = {}
+        if currency_codes:
+            currencies = {
+                currency.name: currency.id
+                for currency in self.env["res.currency"].sudo().search([("name", "in", list(currency_codes))])
+            }
+        products = self._find_product_variants(
+            account, {data.get("seller_sku") or item_id for item_id, (data, _last) in pending.items()}
+        )
+
+        created = updated = 0
+        vals_list = []
+        for item_id, (item_data, last_updated) in pending.items():
+            # produto odoo (VARIANTE)
+            code = item_data.get("seller_sku") or item_id
+            product_variant = products.get(code)
+            if not product_variant:
+                try:
+                    product_variant = self._create_product_variant(account, item_data)
+                except Exception:
+                    _logger.exception(
+                        "[ML] Conta %s: falha ao criar/obter produto Odoo do item %s",
+                        account.name,
+                        item_id,
+                    )
+                    if failed is not None:
+                        failed.add(item_id)
+                    continue
+                products[code] = product_variant
+
+            vals = {
+                "name": item_data.get("title") or item_id,
+                "account_id": account.id,
+                "product_id": product_variant.id,
+                "meli_item_id": item_id,
+                "meli_permalink": item_data.get("permalink"),
+                "sale_price": item_data.get("price") or 0.0,
+                "currency_id": currencies.get(item_data.get("currency_id"), company.currency_id.id),
+                "meli_last_updated": last_updated,
+            }
+
+            record = existing.get(item_id)
+            if record:
+                changed_vals = record._meli_changed_vals(vals)
+                if changed_vals:
+                    record.write(changed_vals)
+                    updated += 1
+            else:
+                vals_list.append(vals)
+
+        if vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    self.create(vals_list)
+                created = len(vals_list)
+            except psycopg2.IntegrityError:
+                # outra sincronização criou parte destes anúncios agora há pouco
+                for vals in vals_list:
+                    is_new, changed = self._create_or_update_item(vals)
+                    created += is_new
+                    updated += changed
+        return created, updated
+
+    def _create_or_update_item(self, vals):
+        """Cria um anúncio ou, se já existir na conta, grava só o que mudou.
+
+        Retorna ``(criado, atualizado)`` como 0/1.
+        """
+        try:
+            with self.env.cr.savepoint():
+                self.create(vals)
+            return 1, 0
+        except psycopg2.IntegrityError:
+            record = self.search(
+                [("account_id", "=", vals["account_id"]), ("meli_item_id", "=", vals["meli_item_id"])], limit=1
+            )
+            if not record:
+                _logger.warning("[ML] Não foi possível gravar o anúncio %s", vals["meli_item_id"])
+                return 0, 0
+            changed_vals = record._meli_changed_vals(vals)
+            if changed_vals:
+                record.write(changed_vals)
+            return 0, int(bool(changed_vals))
+
+    def _ml_last_updated(self, item_data):
+        """``last_updated`` do item do ML como datetime UTC (ou ``False``)."""
+        value = self.env["meli.order"]._ml_datetime_to_odoo(item_data.get("last_updated"))
+        return fields.Datetime.to_datetime(value) if value else False
+
+    def _meli_changed_vals(self, vals):
+        """Somente os valores de ``vals`` que diferem do registro (evita writes vazios)."""
+        self.ensure_one()
+        changed = {}
+        for name, value in vals.items():
+            field = self._fields[name]
+            current = self[name]
+            if field.type == "many2one":
+                current = current.id
+            elif field.type == "float":
+                current = current or 0.0
+                value = value or 0.0
+            elif field.type == "datetime":
+                value = fields.Datetime.to_datetime(value) if value else False
+            if (current or False) != (value or False):
+                changed[name] = value
+        return changed
+
+    def _account_items_watermark(self, account):
+        """Maior ``meli_last_updated`` já sincronizado da conta."""
+        record = self.search(
+            [("account_id", "=", account.id), ("meli_last_updated", "!=", False)],
+            order="meli_last_updated desc",
+            limit=1,
         )
+        return record.meli_last_updated or False
+
+    def _items_scan_final_watermark(self, account):
+        """Marca d'água ao fim do scan, limitada pelos anúncios que falharam nele."""
+        if account.items_scan_incomplete:
+            _logger.warning(
+                "[ML] Conta %s: anúncios com falha no scan; próximo ciclo fará scan completo",
+                account.name,
+            )
+            return False
+        watermark = self._account_items_watermark(account)
+        if watermark and account.items_scan_floor:
+            return min(watermark, account.items_scan_floor)
+        return watermark
 
     @api.model
     def cron_fetch_items(self):
@@ -273,6 +662,22 @@ class MeliProduct(models.Model):
         """Compatibilidade com ações/cron antigas."""
         return self._cron_fetch_items_impl()
 
+    def action_full_resync_products(self):
+        """Força um scan completo dos anúncios (sem pular os inalterados) em todas as contas."""
+        self.env["meli.account"].sudo().search(
+            [("state", "in", ["connected", "authorized"])]
+        ).action_full_items_resync()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Mercado Livre",
+                "message": "Sincronização completa de anúncios agendada para os próximos instantes.",
+                "type": "success",
+                "sticky": False,
+            },
+        }
+
     def action_manual_sync_products(self):
         """Botão manual para sincronizar anúncios do Mercado Livre."""
         self.env["meli.product"].sudo().cron_fetch_products()